@@ -0,0 +1,148 @@
+"""Backward chaining: prove a goal by working back from it to the axioms.
+
+To prove B, look for axioms (A -> B) and prove A, then apply ModusPonens.
+To prove (A -> C), look for axioms (X -> C) and prove (A -> X), then apply
+HypSyll. And, Or and Equiv goals are split into their parts, and a proof of
+_False proves anything by Explosion.
+
+Every subgoal is tabled by its _key:
+- proven subgoals keep their proof, so shared subgoals are solved once;
+- failed subgoals are remembered, so they are not searched again;
+- a subgoal that is already being proven higher up counts as failed on
+  that path, so cycles such as A -> B -> A terminate. Failures that
+  relied on such an assumption are only tabled once the goal they
+  depended on has failed too, since it may still succeed another way.
+
+The search keeps its own stack, one generator per open subgoal, so long
+chains of implications are not limited by Python's recursion limit.
+"""
+from propositional import (Implies, And, Or, Equiv, _False, _is_compound,
+	ModusPonens, HypSyll, Conjunction, Disjunction, CommuteOr, EquivIntro, Explosion)
+
+
+class _Open:
+	"""A subgoal whose search is in progress."""
+	__slots__ = ('key', 'gen', 'low', 'dependents')
+
+	def __init__(self, key, gen, depth):
+		self.key = key
+		self.gen = gen
+		self.low = depth # shallowest open subgoal this search assumed false
+		self.dependents = [] # subgoals that failed only under that assumption
+
+
+class BackwardChainer:
+	"""Goal-directed prover over a set of axioms (proofs)."""
+	def __init__(self, axioms=()):
+		self.facts = {} # _key -> axiom proof
+		self.by_consequent = {} # _key of B -> axiom proofs of (_ -> B)
+		self.proven = {} # answer table: _key -> proof
+		self.failed = set() # _keys of subgoals with no proof
+		self.expanded = 0
+		for pp in axioms:
+			self.add_axiom(pp)
+
+	def add_axiom(self, pp):
+		P = pp.__class__
+		self.facts.setdefault(P._key, pp)
+		if _is_compound(P, Implies):
+			self.by_consequent.setdefault(P.consequent._key, []).append(pp)
+		# a new axiom may make failed subgoals provable
+		self.failed.clear()
+
+	def _known(self, key):
+		pp = self.facts.get(key)
+		return pp if pp is not None else self.proven.get(key)
+
+	def _alternatives(self, goal):
+		"""Ways to prove goal, as (subgoals, build) where build(proofs of the
+		subgoals) gives the proof of goal."""
+		for pp in self.by_consequent.get(goal._key, ()):
+			yield [pp.antecedent], lambda ps, pp=pp: ModusPonens(pp, ps[0])
+		if _is_compound(goal, Implies):
+			A, C = goal.antecedent, goal.consequent
+			for pp in self.by_consequent.get(C._key, ()):
+				if pp.antecedent._key is not A._key:
+					yield [Implies.of(A, pp.antecedent)], lambda ps, pp=pp: HypSyll(ps[0], pp)
+		elif _is_compound(goal, And):
+			yield [goal.left_prop, goal.right_prop], lambda ps: Conjunction(ps[0], ps[1])
+		elif _is_compound(goal, Or):
+			L, R = goal.left_prop, goal.right_prop
+			yield [L], lambda ps: Disjunction(ps[0], R)
+			yield [R], lambda ps: CommuteOr(Disjunction(ps[0], L))
+		elif _is_compound(goal, Equiv):
+			L, R = goal.left_prop, goal.right_prop
+			yield [Implies.of(L, R), Implies.of(R, L)], lambda ps: EquivIntro(ps[0], ps[1])
+		if goal._key is not _False and (_False in self.facts or _False in self.by_consequent):
+			yield [_False], lambda ps: Explosion(ps[0], goal)
+
+	def _solve(self, goal):
+		"""Generator that yields subgoals, is sent their proofs (or None), and
+		returns a proof of goal or None."""
+		for subgoals, build in self._alternatives(goal):
+			proofs = []
+			for sub in subgoals:
+				pp = yield sub
+				if pp is None:
+					break
+				proofs.append(pp)
+			else:
+				return build(proofs)
+		return None
+
+	def prove(self, goal):
+		"""Return a proof of the Prop goal, or None if there is none."""
+		pp = self._known(goal._key)
+		if pp is not None or goal._key in self.failed:
+			return pp
+
+		stack = []
+		depth_of = {} # _key -> position on stack of the open subgoals
+		def open_(P):
+			depth_of[P._key] = len(stack)
+			stack.append(_Open(P._key, self._solve(P), len(stack)))
+			self.expanded += 1
+
+		open_(goal)
+		sent = None
+		while stack:
+			top = stack[-1]
+			try:
+				sub = top.gen.send(sent)
+			except StopIteration as done:
+				pp = done.value
+				stack.pop()
+				del depth_of[top.key]
+				if pp is not None:
+					self.proven[top.key] = pp
+				elif top.low >= len(stack):
+					# failed without assuming anything about open subgoals
+					self.failed.add(top.key)
+					self.failed.update(top.dependents)
+				else:
+					parent = stack[-1]
+					parent.low = min(parent.low, top.low)
+					parent.dependents.append(top.key)
+					parent.dependents += top.dependents
+				sent = pp
+				continue
+
+			key = sub._key
+			sent = self._known(key)
+			if sent is not None or key in self.failed:
+				continue
+			if key in depth_of:
+				# cycle: assume false on this path
+				top.low = min(top.low, depth_of[key])
+				continue
+			open_(sub)
+		return self._known(goal._key)
+
+	def stats(self):
+		return {'proven': len(self.proven), 'failed': len(self.failed),
+			'expanded': self.expanded}
+
+
+def prove(axioms, goal):
+	"""Backward chain from the proofs in axioms. Returns a proof of goal or None."""
+	return BackwardChainer(axioms).prove(goal)
@@ -0,0 +1,814 @@
+"""Benchmarks for pyprover.
+
+python benchmarks.py reports on the proof engines. python benchmarks.py
+--suite runs the workload suite, which can save its results with --output
+and check them against a baseline saved earlier with --baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from propositional import (Prop, Implies, And, Or, Not, HypSyll, ModusPonens, Conjunction,
+	_produce_a_proof)
+from truth_tables import is_tautology
+from sat import PropSolver
+from saturation import Saturation
+from backward_chaining import BackwardChainer
+from serialize import dumps, loads
+from proof_cache import ProofCache
+from checker import ProofChecker
+from predicate import (Object, Membership, MembershipProofs, LessThan, GreaterThan, P_Implies,
+	And_P, ForAll, Exists, Func, Prod, Set, Term, createSet, Domain, BitSet, Subset, SubsetProof)
+from sets import N, Q, R, contains_many
+from rewriting import Rewriter
+from linear_arithmetic import LinearSolver
+from model_checking import ModelChecker
+import parallel
+import tracing
+
+
+def _timeit(fn, reps):
+	"""Seconds per call of fn, averaged over reps calls."""
+	start = time.perf_counter()
+	for _ in range(reps):
+		fn()
+	return (time.perf_counter() - start) / reps
+
+
+def deep_implication(atom, depth):
+	"""Build (((atom -> atom) -> atom) -> ...) with the given nesting depth."""
+	prop = atom
+	for _ in range(depth):
+		prop = Implies.of(prop, atom)
+	return prop
+
+
+def bench_rule_step_vs_depth(depths=(10, 100, 1000, 10000), reps=10000):
+	"""Cost of one HypSyll/ModusPonens step as the formulas involved get deeper.
+	The checks compare structural keys, so the per-step cost should stay flat."""
+	class A(Prop):
+		pass
+
+	results = []
+	for depth in depths:
+		P = deep_implication(A, depth)
+		Q = Implies.of(P, A)
+		pp_p_imp_q = _produce_a_proof(Implies.of(P, Q))
+		pp_q_imp_a = _produce_a_proof(Implies.of(Q, A))
+		pp_p = _produce_a_proof(P)
+		results.append({
+			'depth': depth,
+			'hypsyll_us': _timeit(lambda: HypSyll(pp_p_imp_q, pp_q_imp_a), reps) * 1e6,
+			'modus_ponens_us': _timeit(lambda: ModusPonens(pp_p_imp_q, pp_p), reps) * 1e6,
+		})
+	return results
+
+
+def _legacy_hypsyll(ppa_imp_b, ppb_imp_c):
+	"""HypSyll as it used to be written: one new class per proof step."""
+	class A_implies_C(Implies):
+		antecedent = ppa_imp_b.antecedent
+		consequent = ppb_imp_c.consequent
+
+		def __new__(cls):
+			return object.__new__(cls)
+	return A_implies_C()
+
+
+def _measure_bytes(build):
+	"""Bytes allocated by build() and still alive while its result is."""
+	tracemalloc.start()
+	before = tracemalloc.get_traced_memory()[0]
+	result = build()
+	after = tracemalloc.get_traced_memory()[0]
+	tracemalloc.stop()
+	del result
+	return after - before
+
+
+def bench_proof_memory(steps=10 ** 5, atoms=100):
+	"""Bytes per proof step for a chain of HypSyll steps around a cycle of
+	axioms A0 -> A1 -> ... -> A0, with every step kept alive."""
+	props = [type(f"A{i}", (Prop,), {}) for i in range(atoms)]
+	axioms = [_produce_a_proof(Implies.of(props[i], props[(i + 1) % atoms]))
+		for i in range(atoms)]
+
+	def chain(rule):
+		proofs = [axioms[0]]
+		for i in range(1, steps + 1):
+			proofs.append(rule(proofs[-1], axioms[i % atoms]))
+		return proofs
+
+	results = {}
+	for name, rule in (('proof_dag', HypSyll), ('class_per_step', _legacy_hypsyll)):
+		results[name] = _measure_bytes(lambda: chain(rule)) / steps
+	return results
+
+
+def random_formula(atoms, size, rng):
+	"""A random formula over atoms with size connectives."""
+	if size == 0:
+		return rng.choice(atoms)
+	left = rng.randrange(size)
+	A = random_formula(atoms, left, rng)
+	B = random_formula(atoms, size - 1 - left, rng)
+	connective = rng.choice((Implies.of, And.of, Or.of, lambda A, B: Not(A)))
+	return connective(A, B)
+
+
+def bench_tautology_screen(count=1000, n_atoms=12, size=30, seed=0):
+	"""Formulas screened per second by the truth-table checker."""
+	rng = random.Random(seed)
+	atoms = [type(f"P{i}", (Prop,), {}) for i in range(n_atoms)]
+	formulas = [random_formula(atoms, size, rng) for _ in range(count)]
+	start = time.perf_counter()
+	valid = sum(is_tautology(A) for A in formulas)
+	elapsed = time.perf_counter() - start
+	return {'formulas_per_s': count / elapsed, 'valid': valid}
+
+
+def _disjunction(props):
+	result = props[0]
+	for A in props[1:]:
+		result = Or.of(result, A)
+	return result
+
+
+def pigeonhole(holes):
+	"""Axioms saying holes+1 pigeons sit in holes holes, at most one per hole.
+	They are unsatisfiable."""
+	p = [[type(f"p{i}_{j}", (Prop,), {}) for j in range(holes)]
+		for i in range(holes + 1)]
+	axioms = [_disjunction(row) for row in p]
+	for j in range(holes):
+		for i in range(holes + 1):
+			for k in range(i + 1, holes + 1):
+				axioms.append(Not(And.of(p[i][j], p[k][j])))
+	return axioms
+
+
+def random_3sat(n_vars, ratio=4.26, seed=0):
+	"""Random 3-SAT axioms with ratio*n_vars clauses, near the hardest ratio."""
+	rng = random.Random(seed)
+	atoms = [type(f"x{i}", (Prop,), {}) for i in range(n_vars)]
+	axioms = []
+	for _ in range(int(ratio * n_vars)):
+		lits = [A if rng.random() < 0.5 else Not(A) for A in rng.sample(atoms, 3)]
+		axioms.append(_disjunction(lits))
+	return axioms
+
+
+def bench_sat(axioms):
+	"""Time to decide whether axioms are consistent, with solver counters."""
+	start = time.perf_counter()
+	solver = PropSolver(axioms)
+	satisfiable = solver.satisfiable()
+	elapsed = time.perf_counter() - start
+	return {'seconds': elapsed, 'satisfiable': satisfiable,
+		'vars': solver.solver.num_vars, 'conflicts': solver.solver.conflicts}
+
+
+def implication_chain(n):
+	"""Atoms B0..Bn, proofs of the axioms B0 and Bi -> Bi+1."""
+	atoms = [type(f"B{i}", (Prop,), {}) for i in range(n + 1)]
+	axioms = [_produce_a_proof(Implies.of(atoms[i], atoms[i + 1])) for i in range(n)]
+	axioms.append(_produce_a_proof(atoms[0]))
+	return atoms, axioms
+
+
+def bench_saturation(n=10 ** 5):
+	"""Forward chaining over a knowledge base of n implications, to the last
+	atom (ModusPonens) and to B0 -> Bn (HypSyll)."""
+	atoms, axioms = implication_chain(n)
+	results = {}
+	for name, goal in (('modus_ponens', atoms[n]), ('hypsyll', Implies.of(atoms[0], atoms[n]))):
+		engine = Saturation(axioms, goal)
+		assert engine.run() is not None
+		results[name] = engine.stats()
+	return results
+
+
+def bench_backward(n=10 ** 4, queries=1000, seed=0):
+	"""Mean time per query of random atoms on an implication chain of length
+	n, answered by one tabled backward chainer."""
+	rng = random.Random(seed)
+	atoms, axioms = implication_chain(n)
+	chainer = BackwardChainer(axioms)
+	start = time.perf_counter()
+	for _ in range(queries):
+		assert chainer.prove(rng.choice(atoms)) is not None
+	elapsed = time.perf_counter() - start
+	return dict(chainer.stats(), ms_per_query=elapsed / queries * 1e3)
+
+
+def bench_serialize(steps=10 ** 5, atoms=100):
+	"""Encode/decode throughput, in MB/s of the binary encoding, for a proof
+	DAG of steps HypSyll steps."""
+	props = [type(f"A{i}", (Prop,), {}) for i in range(atoms)]
+	axioms = [_produce_a_proof(Implies.of(props[i], props[(i + 1) % atoms]))
+		for i in range(atoms)]
+	proof = axioms[0]
+	for i in range(1, steps + 1):
+		proof = HypSyll(proof, axioms[i % atoms])
+
+	start = time.perf_counter()
+	data = dumps(proof)
+	encode = time.perf_counter() - start
+	start = time.perf_counter()
+	loads(data)
+	decode = time.perf_counter() - start
+	mb = len(data) / 1e6
+	return {'bytes': len(data), 'encode_mb_s': mb / encode, 'decode_mb_s': mb / decode}
+
+
+def bench_proof_cache(n=10 ** 4):
+	"""Proving the end of an n-implication chain from scratch vs loading the
+	proof from an on-disk cache, as a later run would."""
+	atoms, axioms = implication_chain(n)
+	goal = atoms[-1]
+	prover = lambda axioms, goal: Saturation(axioms, goal).run()
+	with tempfile.TemporaryDirectory() as tmp:
+		path = os.path.join(tmp, 'proofs.db')
+		with ProofCache(path) as cache:
+			start = time.perf_counter()
+			cache.prove(goal, axioms, prover)
+			cold = time.perf_counter() - start
+		with ProofCache(path) as cache:
+			start = time.perf_counter()
+			proof = cache.prove(goal, axioms, prover)
+			warm = time.perf_counter() - start
+			stats = cache.stats()
+	assert proof.__class__._key is goal._key and stats['hits'] == 1
+	return {'cold_s': cold, 'warm_s': warm, 'bytes': stats['bytes'], 'hits': stats['hits']}
+
+
+def bench_checker(n=10 ** 4):
+	"""A library of n lemmas, lemma i proving (B0 -> Bi+1) from lemma i-1:
+	time to check all of it, then to check it again after the last axiom
+	changes."""
+	atoms, axioms = implication_chain(n)
+	lemmas = [axioms[0]]
+	for pp in axioms[1:n]:
+		lemmas.append(HypSyll(lemmas[-1], pp))
+	checker = ProofChecker(axioms)
+	start = time.perf_counter()
+	for lemma in lemmas:
+		checker.check(lemma)
+	full = time.perf_counter() - start
+	start = time.perf_counter()
+	checker.invalidate(axioms[n - 1])
+	rechecked = checker.recheck()
+	incremental = time.perf_counter() - start
+	return {'full_s': full, 'incremental_s': incremental, 'nodes': checker.stats()['nodes'],
+		'rechecked': rechecked}
+
+
+def bench_predicate_instantiation(n=10 ** 6):
+	"""Instantiations per second of the binary predicates x < y and x ∈ S,
+	each over n pairs of arguments."""
+	objects = [Object(str(i)) for i in range(1000)]
+	sets = [createSet(f"S{i}") for i in range(1000)]
+	lt, member = LessThan('lt'), Membership('member')
+	rng = random.Random(0)
+	pairs = [(rng.randrange(1000), rng.randrange(1000)) for _ in range(n)]
+	results = {}
+	start = time.perf_counter()
+	for i, j in pairs:
+		lt(x=objects[i], y=objects[j])
+	results['ordering_per_s'] = n / (time.perf_counter() - start)
+	start = time.perf_counter()
+	for i, j in pairs:
+		member(x=objects[i], set_=sets[j])
+	results['membership_per_s'] = n / (time.perf_counter() - start)
+	return results
+
+
+def bench_tracing_overhead(reps=10 ** 6):
+	"""Cost of a ModusPonens step, in us: the bare rule, through its tracing
+	wrapper with tracing disabled, and with a Stats sink enabled."""
+	A, B = type('A', (Prop,), {}), type('B', (Prop,), {})
+	ppa_imp_b, ppa = _produce_a_proof(Implies.of(A, B)), _produce_a_proof(A)
+	bare = ModusPonens.__wrapped__
+	results = {
+		'bare_us': _timeit(lambda: bare(ppa_imp_b, ppa), reps) * 1e6,
+		'disabled_us': _timeit(lambda: ModusPonens(ppa_imp_b, ppa), reps) * 1e6,
+	}
+	with tracing.trace(tracing.Stats()):
+		results['enabled_us'] = _timeit(lambda: ModusPonens(ppa_imp_b, ppa), reps) * 1e6
+	return results
+
+
+
+# The suite: synthetic workloads of parameterized size, reporting ops/s and
+# peak memory, saved as JSON and compared against a stored baseline.
+# Each workload takes a size and returns a function that does the work and
+# returns the number of operations it did, so setup is not timed.
+
+def _hypsyll_chain(n):
+	"""HypSyll along a chain of n implications."""
+	_, axioms = implication_chain(n)
+	def run():
+		proof = axioms[0]
+		for pp in axioms[1:n]:
+			proof = HypSyll(proof, pp)
+		return n - 1
+	return run
+
+
+def _conjunction_tree(n):
+	"""A balanced tree of Conjunctions over n proofs."""
+	proofs = [_produce_a_proof(type(f"C{i}", (Prop,), {})) for i in range(n)]
+	def run():
+		level = proofs
+		while len(level) > 1:
+			pairs = [Conjunction(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+			level = pairs + level[len(pairs) * 2:]
+		return n - 1
+	return run
+
+
+def _predicate_instantiation(n):
+	"""x < y for n pairs of Objects."""
+	objects = [Object(str(i)) for i in range(1000)]
+	rng = random.Random(0)
+	pairs = [(objects[rng.randrange(1000)], objects[rng.randrange(1000)]) for _ in range(n)]
+	def run():
+		lt = LessThan('lt')
+		for x, y in pairs:
+			lt(x=x, y=y)
+		return n
+	return run
+
+
+def continuity():
+	"""The continuity of f at c, nested ForAll/Exists as in theorems.py."""
+	zero, eps, delta = Object('0', set_=R), Object('eps', set_=R), Object('del', set_=R)
+	c, x = Object('c', set_=R), Object('x', set_=R)
+	f = createSet('f', superclass=Func, domain=R, range_=R)
+	e_g_0 = GreaterThan('e>0')(y=zero)
+	dis_xc_imp_dis_fxfc = P_Implies('Imp', antecedent=LessThan('Lt')(x=(x - c), y=delta),
+		consequent=LessThan('Lt2')(x=(f(x) - f(c)), y=eps))
+	exists_delta = Exists('existsdel', predicate=And_P('d>0andDis',
+		left_pred=GreaterThan('delGt0')(x=delta, y=zero),
+		right_pred=dis_xc_imp_dis_fxfc))(x=delta)
+	eg0_imp_exists = P_Implies('eg0ImpExists', antecedent=e_g_0, consequent=exists_delta)
+	for_all_e = ForAll('ForAllE', predicate=eg0_imp_exists)(x=eps)
+	return ForAll('ForAllX', predicate=for_all_e)(x=x)
+
+
+def _quantifier_nesting(n):
+	"""Build the continuity formula n times."""
+	def run():
+		for _ in range(n):
+			continuity()
+		return n
+	return run
+
+
+def _membership(n):
+	"""Test n Objects, of every kind, for membership in N, Q and R."""
+	kinds = [Object('3'), Object('1/2', set_=Q), Object('1.5'), Object('x', set_=R), Object('y')]
+	objects = [kinds[i % len(kinds)] for i in range(n)]
+	def run():
+		for obj in objects:
+			obj in N
+			obj in Q
+			obj in R
+		return 3 * n
+	return run
+
+
+def _membership_population(n):
+	"""Test n distinct Objects for membership in R, Q and N, then check the
+	same n Objects against the three sets in one contains_many call."""
+	names = ['3', '1/2', '1.5', 'x']
+	objects = [Object(names[i % 4] if i % 4 == 3 else f"{i}{names[i % 4][1:]}",
+		set_=(None, Q, R)[i % 3]) for i in range(n)]
+	pairs = [(obj, s) for obj in objects for s in (N, Q, R)]
+	def run():
+		for obj in objects:
+			obj in R
+			obj in Q
+			obj in N
+		contains_many(pairs)
+		return 6 * n
+	return run
+
+
+def _membership_proofs(n):
+	"""Prove x ∈ R for n distinct Objects with one MembershipProofs call."""
+	props = [Membership('m')(x=Object(f"{i}.5"), set_=R) for i in range(n)]
+	def run():
+		MembershipProofs(props)
+		return n
+	return run
+
+
+def _func_evaluation(n):
+	"""Evaluate a function without a definition (a table) at n inputs,
+	half of them seen before."""
+	inputs = [Object(f"{i}/7", set_=Q) for i in range(n // 2)]
+	inputs += inputs
+	def run():
+		f = createSet('f', superclass=Func, domain=Q, range_=createSet('image'))
+		for a in inputs:
+			f(a)
+		return len(inputs)
+	return run
+
+
+def _func_map(n):
+	"""The same as func_evaluation, with one f.map call, and a table bounded
+	to a tenth of the inputs."""
+	inputs = [Object(f"{i}/7", set_=Q) for i in range(n // 2)]
+	inputs += inputs
+	def run():
+		f = createSet('f', superclass=Func, domain=Q, range_=createSet('image'),
+			cache_size=n // 10)
+		f.map(inputs)
+		return len(inputs)
+	return run
+
+
+def _q_add(n):
+	"""a + b for n pairs of rationals."""
+	rng = random.Random(0)
+	pairs = [(Object(f"{rng.randrange(1, 100)}/{rng.randrange(1, 100)}", set_=Q),
+		Object(f"{rng.randrange(1, 100)}/{rng.randrange(1, 100)}", set_=Q)) for _ in range(n)]
+	def run():
+		for a, b in pairs:
+			a + b
+		return n
+	return run
+
+
+def _q_add_many(n):
+	"""The pairs of q_add, added with one Q.add_many call."""
+	rng = random.Random(0)
+	pairs = [(Object(f"{rng.randrange(1, 100)}/{rng.randrange(1, 100)}", set_=Q),
+		Object(f"{rng.randrange(1, 100)}/{rng.randrange(1, 100)}", set_=Q)) for _ in range(n)]
+	left, right = [a for a, _ in pairs], [b for _, b in pairs]
+	def run():
+		Q.add_many(left, right)
+		return n
+	return run
+
+
+def _q_add_chain(n):
+	"""Sum n rationals one + at a time, as in repeated epsilon-delta steps."""
+	rng = random.Random(0)
+	terms = [Object(f"{rng.randrange(1, 100)}/{rng.randrange(1, 100)}", set_=Q) for _ in range(n)]
+	def run():
+		total = Q('0/1')
+		for term in terms:
+			total = total + term
+		return n
+	return run
+
+
+def _shared_terms(n):
+	"""Build f(x) - f(c) n times, from the same x and c, and compare the
+	results, as instantiating a quantified formula again does."""
+	x, c = Object('x', set_=R), Object('c', set_=R)
+	f = createSet('f', superclass=Func, domain=R, range_=R)
+	def run():
+		first = f(x) - f(c)
+		kept = [f(x) - f(c) for _ in range(n)]
+		return sum(term is first for term in kept)
+	return run
+
+
+def _normalization(n):
+	"""Normalize a sum of n terms, f(x_i) - f(x_i) + 1, then ask for it
+	again 100 times."""
+	f = createSet('f', superclass=Func, domain=R, range_=R)
+	xs = [Object(f"x{i}", set_=R) for i in range(n // 3 + 1)]
+	one = Object('1', set_=Q)
+	term = one
+	for x in xs:
+		term = term + f(x) - f(x)
+	def run():
+		rewriter = Rewriter()
+		for _ in range(101):
+			rewriter.normalize(term)
+		return n
+	return run
+
+
+def _linear_obligations(n):
+	"""Discharge n small inequality goals against a fixed chain of facts
+	x_0 < x_1 < ... < x_9, each with one extra fact pushed and popped."""
+	xs = [Object(f"x{i}", set_=R) for i in range(10)]
+	one = Object('1', set_=Q)
+	solver = LinearSolver([LessThan('l')(x=a, y=b) for a, b in zip(xs, xs[1:])])
+	rng = random.Random(0)
+	obligations = []
+	for _ in range(n):
+		i, j, k = sorted(rng.sample(range(10), 3))
+		obligations.append((LessThan('l')(x=xs[j], y=xs[k] + one),
+			LessThan('l')(x=xs[i] - xs[k], y=one)))
+	def run():
+		proven = 0
+		for extra, goal in obligations:
+			solver.push()
+			solver.add(extra)
+			proven += solver.entails(goal)
+			solver.pop()
+		return n
+	return run
+
+
+def _numbers(n):
+	"""A set of the n rationals 0/1 ... n-1/1."""
+	A = createSet('A', Set)
+	for i in range(n):
+		A.add(Object(f"{i}/1", set_=Q))
+	return A
+
+
+def _model_check(n):
+	"""Check ∀x(x ∈ E -> x < n) over a domain of n numbers, E the even ones."""
+	A = _numbers(n)
+	E = createSet('E', Set)
+	for e in A:
+		if e.value.numerator % 2 == 0:
+			E.add(e)
+	x = Object('x', set_=A)
+	formula = ForAll('all', predicate=P_Implies('imp', antecedent=Membership('in')(x=x, set_=E),
+		consequent=LessThan('lt')(x=x, y=Object(str(n), set_=Q))))(x=x)
+	def run():
+		assert ModelChecker().check(formula)[0]
+		return n
+	return run
+
+
+def _model_check_nested(n):
+	"""Check ∀x∃y(x < y + 1) over a domain of n numbers for both, n^2 pairs."""
+	A = _numbers(n)
+	x, y = Object('x', set_=A), Object('y', set_=A)
+	exists = Exists('ey', predicate=LessThan('lt')(x=x, y=Term('+', (y, Object('1', set_=Q)), Q)))(x=y)
+	formula = ForAll('ax', predicate=exists)(x=x)
+	def run():
+		assert ModelChecker().check(formula)[0]
+		return n * n
+	return run
+
+
+def _parallel_model_check(n):
+	"""Check ∀x∃y(x < y + 1) as _model_check_nested, with the x domain
+	sharded over a process per core."""
+	A = _numbers(n)
+	x, y = Object('x', set_=A), Object('y', set_=A)
+	exists = Exists('ey', predicate=LessThan('lt')(x=x, y=Term('+', (y, Object('1', set_=Q)), Q)))(x=y)
+	formula = ForAll('ax', predicate=exists)(x=x)
+	def run():
+		assert parallel.check(formula, chunk=256)[0]
+		return n * n
+	return run
+
+
+def _numerals(n):
+	"""Keep n rational constants, from a pool of 100 distinct values."""
+	def run():
+		kept = [Q(f"{i % 100}/7") for i in range(n)]
+		return len(kept)
+	return run
+
+
+def _bitsets(n):
+	"""Two BitSets over a Domain of n Objects, a third and two thirds of it."""
+	domain = Domain(Object(f"e{i}") for i in range(n))
+	A = createSet('A', BitSet, domain=domain)
+	B = createSet('B', BitSet, domain=domain)
+	A.add_many(domain.objects[:n // 3])
+	B.add_many(domain.objects[:2 * n // 3])
+	return A, B
+
+
+def _bitset_algebra(n):
+	"""Union, intersection, difference and cardinality of sets over a
+	domain of n Objects."""
+	A, B = _bitsets(n)
+	def run():
+		return len(A | B) + len(A & B) + len(B - A)
+	return run
+
+
+def _bitset_subset(n):
+	"""Prove A ⊆ B, for BitSets over a domain of n Objects."""
+	A, B = _bitsets(n)
+	A_sub_B = Subset('s')(A, B)(x=Object('x'))
+	def run():
+		SubsetProof(A_sub_B)
+		return n
+	return run
+
+
+def _product_indexing(n):
+	"""Map n elements of a product of three 1000 element sets, 10^9
+	elements in all, to their numbers and back."""
+	A = createSet('A', Set)
+	for i in range(1000):
+		A.add(Object(f"a{i}"))
+	AAA = createSet('AAA', Prod, sets=[A, A, A])
+	step = len(AAA) // n
+	def run():
+		for i in range(0, n * step, step):
+			AAA.index(AAA[i])
+		return n
+	return run
+
+
+def _product_chunks(n):
+	"""Iterate over n elements of a product, as chunks of 1000."""
+	A = createSet('A', Set)
+	for i in range(1000):
+		A.add(Object(f"a{i}"))
+	AAA = createSet('AAA', Prod, sets=[A, A, A])
+	def run():
+		count = 0
+		for chunk in AAA.chunks(1000):
+			count += len(chunk)
+			if count >= n:
+				break
+		return count
+	return run
+
+
+SUITE = {
+	'hypsyll_chain': (_hypsyll_chain, 2 * 10 ** 4),
+	'conjunction_tree': (_conjunction_tree, 2 ** 14),
+	'predicate_instantiation': (_predicate_instantiation, 2 * 10 ** 4),
+	'quantifier_nesting': (_quantifier_nesting, 1000),
+	'membership': (_membership, 10 ** 5),
+	'membership_population': (_membership_population, 5 * 10 ** 4),
+	'membership_proofs': (_membership_proofs, 10 ** 4),
+	'func_evaluation': (_func_evaluation, 5 * 10 ** 4),
+	'func_map': (_func_map, 5 * 10 ** 4),
+	'q_add': (_q_add, 5 * 10 ** 4),
+	'q_add_many': (_q_add_many, 5 * 10 ** 4),
+	'q_add_chain': (_q_add_chain, 2000),
+	'numerals': (_numerals, 10 ** 5),
+	'shared_terms': (_shared_terms, 10 ** 5),
+	'normalization': (_normalization, 3 * 10 ** 4),
+	'linear_obligations': (_linear_obligations, 1000),
+	'model_check': (_model_check, 10 ** 5),
+	'model_check_nested': (_model_check_nested, 10 ** 4),
+	'parallel_model_check': (_parallel_model_check, 10 ** 4),
+	'bitset_algebra': (_bitset_algebra, 10 ** 6),
+	'bitset_subset': (_bitset_subset, 10 ** 6),
+	'product_indexing': (_product_indexing, 10 ** 4),
+	'product_chunks': (_product_chunks, 10 ** 5),
+}
+
+_MEMORY_SLACK_KB = 64
+
+
+def run_workload(name, scale=1.0, repeat=3):
+	"""ops/s (best of repeat runs) and peak memory of one workload of SUITE."""
+	workload, size = SUITE[name]
+	size = max(1, int(size * scale))
+	best = None
+	for _ in range(repeat):
+		run = workload(size)
+		start = time.perf_counter()
+		ops = run()
+		seconds = time.perf_counter() - start
+		if best is None or seconds < best:
+			best = seconds
+	run = workload(size)
+	tracemalloc.start()
+	try:
+		run()
+		peak = tracemalloc.get_traced_memory()[1]
+	finally:
+		tracemalloc.stop()
+	return {'size': size, 'ops': ops, 'seconds': best, 'ops_per_s': ops / best,
+		'peak_kb': peak / 1024}
+
+
+def run_suite(names=None, scale=1.0, repeat=3):
+	"""Run the workloads in names (all of SUITE by default)."""
+	results = {name: run_workload(name, scale, repeat) for name in (names or SUITE)}
+	return {
+		'python': platform.python_version(),
+		'platform': platform.platform(),
+		'scale': scale,
+		'results': results,
+	}
+
+
+def compare(results, baseline, tolerance=0.2):
+	"""Compare results to baseline, both from run_suite. Returns a row per
+	workload in both: (name, ops/s ratio, peak memory ratio, regressed).
+	A workload regressed if it got more than tolerance slower, or used more
+	than tolerance more memory."""
+	rows = []
+	for name, row in results['results'].items():
+		base = baseline['results'].get(name)
+		if base is None:
+			continue
+		if base['size'] != row['size']:
+			raise ValueError(f"{name}: size {row['size']} but the baseline has {base['size']}.")
+		speed = row['ops_per_s'] / base['ops_per_s']
+		memory = row['peak_kb'] / base['peak_kb'] if base['peak_kb'] else 1.0
+		# a few kB either way is noise, not growth
+		grew = row['peak_kb'] > base['peak_kb'] * (1 + tolerance) + _MEMORY_SLACK_KB
+		rows.append((name, speed, memory, speed < 1 - tolerance or grew))
+	return rows
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description=__doc__)
+	parser.add_argument('--suite', action='store_true',
+		help="run the workload suite instead of the engine benchmarks")
+	parser.add_argument('--only', nargs='+', choices=sorted(SUITE), help="workloads to run")
+	parser.add_argument('--scale', type=float, default=1.0, help="multiplier for the workload sizes")
+	parser.add_argument('--repeat', type=int, default=3, help="runs per workload, the best is kept")
+	parser.add_argument('--output', help="save the results to this JSON file")
+	parser.add_argument('--baseline', help="compare with the results saved in this JSON file")
+	parser.add_argument('--tolerance', type=float, default=0.2,
+		help="slowdown or memory growth (fraction) that counts as a regression")
+	args = parser.parse_args(argv)
+	if not args.suite:
+		report()
+		return 0
+
+	results = run_suite(args.only, args.scale, args.repeat)
+	print(f"{'workload':<24} {'size':>8} {'ops/s':>12} {'peak kB':>10}")
+	for name, row in results['results'].items():
+		print(f"{name:<24} {row['size']:>8} {row['ops_per_s']:>12.0f} {row['peak_kb']:>10.0f}")
+	if args.output:
+		with open(args.output, 'w') as f:
+			json.dump(results, f, indent=1)
+	if not args.baseline:
+		return 0
+	with open(args.baseline) as f:
+		baseline = json.load(f)
+	rows = compare(results, baseline, args.tolerance)
+	print(f"\nAgainst {args.baseline}:")
+	for name, speed, memory, regressed in rows:
+		print(f"{name:<24} speed x{speed:.2f}  memory x{memory:.2f}"
+			+ ("  REGRESSION" if regressed else ""))
+	return 1 if any(row[3] for row in rows) else 0
+
+
+def report():
+	print("Rule step cost vs formula depth")
+	for row in bench_rule_step_vs_depth():
+		print(f"  depth={row['depth']:>6}  HypSyll {row['hypsyll_us']:.2f}us"
+			f"  ModusPonens {row['modus_ponens_us']:.2f}us")
+
+	print("Bytes per proof step (10^5 HypSyll steps)")
+	for name, per_step in bench_proof_memory().items():
+		print(f"  {name:<15} {per_step:.0f} B")
+
+	screen = bench_tautology_screen()
+	print(f"Truth-table screening: {screen['formulas_per_s']:.0f} formulas/s"
+		f" ({screen['valid']} valid)")
+
+	print("SAT backend")
+	for name, axioms in ([(f"pigeonhole({n})", pigeonhole(n)) for n in (5, 6, 7)]
+			+ [(f"random 3-SAT({n})", random_3sat(n, seed=n)) for n in (100, 150, 200)]):
+		row = bench_sat(axioms)
+		print(f"  {name:<18} {row['seconds']:.3f}s  sat={row['satisfiable']}"
+			f"  vars={row['vars']}  conflicts={row['conflicts']}")
+
+	print("Forward chaining over 10^5 implications")
+	for name, row in bench_saturation().items():
+		print(f"  {name:<13} {row['seconds']:.2f}s  {row['derivations_per_s']:.0f} derivations/s"
+			f"  facts={row['facts']}")
+
+	row = bench_backward()
+	print(f"Backward chaining: {row['ms_per_query']:.3f} ms/query"
+		f"  (tabled {row['proven']} subgoals)")
+
+	row = bench_serialize()
+	print(f"Serialization of a 10^5-step proof: {row['bytes'] / 1e6:.1f} MB,"
+		f" encode {row['encode_mb_s']:.1f} MB/s, decode {row['decode_mb_s']:.1f} MB/s")
+
+	row = bench_proof_cache()
+	print(f"Proof cache, 10^4-step chain: cold {row['cold_s']:.3f}s, warm {row['warm_s']:.3f}s"
+		f" ({row['bytes'] / 1e3:.0f} kB on disk)")
+
+	row = bench_checker()
+	print(f"Checking a library of 10^4 lemmas: {row['full_s']:.3f}s ({row['nodes']} nodes),"
+		f" after an axiom change {row['incremental_s'] * 1e3:.2f}ms ({row['rechecked']} nodes)")
+
+	row = bench_predicate_instantiation()
+	print(f"Predicate instantiation over 10^6 pairs: x < y {row['ordering_per_s']:.0f}/s,"
+		f" x ∈ S {row['membership_per_s']:.0f}/s")
+
+	row = bench_tracing_overhead()
+	print(f"ModusPonens: {row['bare_us']:.3f}us bare, {row['disabled_us']:.3f}us with tracing off,"
+		f" {row['enabled_us']:.3f}us with tracing on")
+
+
+if __name__ == '__main__':
+	sys.exit(main())
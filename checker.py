@@ -0,0 +1,203 @@
+"""Standalone checking of proof DAGs.
+
+The rules check their premises with asserts as a proof is built. A
+ProofChecker checks a proof that already exists, eg one loaded from a file
+or a cache: every node is verified against the rule it names, premises
+before conclusions, and every shared subproof once.
+
+The checker remembers what it has verified, so checking a library of
+proofs that share lemmas only does the new work. When an axiom or a lemma
+changes, invalidate() forgets the results that depend on it, and recheck()
+verifies just those nodes again.
+"""
+from propositional import (Meta, Prop, ProofNode, Implies, And, Or, Equiv, _False,
+	_is_compound, _find_prop)
+from predicate import _subset_sets, _is_subset
+from rewriting import holds_by_normalization
+import linear_arithmetic
+
+
+def _is(P, base, left, right):
+	"""Whether P is the formula base(left, right)."""
+	Q = _find_prop(base, left, right)
+	return Q is not None and P._key is Q._key
+
+
+def _negation(A):
+	"""The formula (not A), as Not(A) builds it."""
+	if _is_compound(A, Implies) and A.consequent._key is _False:
+		return A.antecedent
+	return Implies.of(A, _False)
+
+
+def _check_ordering(C):
+	x, y = C.x.value, C.y.value
+	return {'lt': x < y, 'le': x <= y, 'gt': x > y, 'ge': x >= y, 'eq': x == y}[C.order_symbol]
+
+
+# rule name -> check(premises (Props), conclusion) for the rules of
+# propositional.py, tautologies.py, predicate.py, rewriting.py and
+# linear_arithmetic.py
+_rules = {
+	'Conjunction': lambda ps, C: _is(C, And, ps[0], ps[1]),
+	'Disjunction': lambda ps, C: _is_compound(C, Or) and C.left_prop._key is ps[0]._key,
+	'EquivIntro': lambda ps, C: (_is_compound(ps[0], Implies) and _is_compound(C, Equiv)
+		and _is(ps[1], Implies, ps[0].consequent, ps[0].antecedent)
+		and _is(C, Equiv, ps[0].antecedent, ps[0].consequent)),
+	'CommuteOr': lambda ps, C: _is_compound(ps[0], Or)
+		and _is(C, Or, ps[0].right_prop, ps[0].left_prop),
+	'CommuteAnd': lambda ps, C: _is_compound(ps[0], And)
+		and _is(C, And, ps[0].right_prop, ps[0].left_prop),
+	'ModusPonens': lambda ps, C: (_is_compound(ps[0], Implies)
+		and ps[0].antecedent._key is ps[1]._key and ps[0].consequent._key is C._key),
+	'HypSyll': lambda ps, C: (_is_compound(ps[0], Implies) and _is_compound(ps[1], Implies)
+		and ps[0].consequent._key is ps[1].antecedent._key
+		and _is(C, Implies, ps[0].antecedent, ps[1].consequent)),
+	'ImplicationToOr': lambda ps, C: _is_compound(ps[0], Implies)
+		and _is(C, Or, _negation(ps[0].antecedent), ps[0].consequent),
+	'OrToImplication': lambda ps, C: _is_compound(ps[0], Or)
+		and _is(C, Implies, _negation(ps[0].left_prop), ps[0].right_prop),
+	'Explosion': lambda ps, C: ps[0]._key is _False,
+	'ExcludedMiddle': lambda ps, C: _is_compound(C, Or)
+		and C.right_prop._key is _negation(C.left_prop)._key,
+	'NonContradiction': lambda ps, C: (_is_compound(C, Implies) and C.consequent._key is _False
+		and _is_compound(C.antecedent, And)
+		and C.antecedent.right_prop._key is _negation(C.antecedent.left_prop)._key),
+	'Trivial': lambda ps, C: _is_compound(C, Implies) and C.antecedent._key is C.consequent._key,
+	'MembershipProof': lambda ps, C: C.x in C.set_,
+	'OrderingProof': lambda ps, C: _check_ordering(C),
+	'SubsetProof': lambda ps, C: _is_subset(*_subset_sets(C)),
+	'NormalizationProof': lambda ps, C: holds_by_normalization(C),
+	'LinearArithmetic': lambda ps, C: linear_arithmetic.entails(ps, C),
+	# UniversalResolve and ExistentialResolve are left out, so their nodes
+	# fail as unknown rules: checking them needs the inner Prop instantiated
+	# at the resolved Object, which a node does not record
+}
+
+
+class ProofChecker:
+	"""Checks proofs, remembering the result for each node.
+	axioms: the axiom proofs (or Props) a proof may start from. If None, any
+	instance of a Prop class is accepted as an axiom.
+	"""
+	def __init__(self, axioms=None):
+		self.axioms = None if axioms is None else {self._prop(a)._key for a in axioms}
+		self.status = {} # id of a node -> True, or the reason it failed
+		self.nodes = {} # id -> node, for every node seen, so their ids stay valid
+		self.dependents = {} # id -> nodes that have it as a premise
+		self.by_conclusion = {} # _key -> nodes with that conclusion
+		self.dirty = {} # id -> node, invalidated and not checked again yet
+		self.checked = 0
+
+	@staticmethod
+	def _prop(a):
+		return a if isinstance(a, Meta) else a.__class__
+
+	def _check_node(self, node):
+		"""True if node is a correct step, given that its premises are, else
+		the reason it is not."""
+		if type(node) is not ProofNode:
+			if not isinstance(node, Prop):
+				return f"{node!r} is not a proof."
+			P = node.__class__
+			if self.axioms is None or P._key in self.axioms:
+				return True
+			return f"{P} is not an axiom."
+		for premise in node.premises:
+			if self.status[id(premise)] is not True:
+				return f"depends on {premise.__class__}, which failed."
+		check = _rules.get(node.rule)
+		if check is None:
+			return f"unknown rule {node.rule}."
+		try:
+			valid = check([p.__class__ for p in node.premises], node.conclusion)
+		except Exception: # the rules raise plain Exceptions too
+			valid = False
+		return True if valid else f"{node.rule} does not give {node.conclusion}."
+
+	def _register(self, node):
+		key = id(node)
+		if key in self.nodes:
+			return
+		self.nodes[key] = node
+		self.by_conclusion.setdefault(node.__class__._key, []).append(node)
+		if type(node) is not ProofNode:
+			return
+		for premise in node.premises:
+			self.dependents.setdefault(id(premise), []).append(node)
+
+	def _verify(self, proof):
+		"""Check every node of proof not checked yet, premises first."""
+		stack = [(proof, False)]
+		while stack:
+			node, expanded = stack.pop()
+			if id(node) in self.status:
+				continue
+			premises = node.premises if type(node) is ProofNode else ()
+			if not expanded:
+				stack.append((node, True))
+				stack += [(p, False) for p in premises if id(p) not in self.status]
+				continue
+			self._register(node)
+			self.status[id(node)] = self._check_node(node)
+			self.dirty.pop(id(node), None)
+			self.checked += 1
+		return self.status[id(proof)]
+
+	def check(self, proof):
+		"""True if proof is correct, else the reason it is not."""
+		return self._verify(proof)
+
+	def errors(self):
+		"""The nodes that failed and why, innermost failures only."""
+		return [(self.nodes[k], reason) for k, reason in self.status.items()
+			if reason is not True and not reason.startswith('depends on')]
+
+	def invalidate(self, changed):
+		"""Forget the results for changed, a proof or a Prop (every node
+		concluding it), and for everything that depends on it. Returns the
+		number of nodes to check again."""
+		if isinstance(changed, Meta):
+			stack = list(self.by_conclusion.get(changed._key, ()))
+		else:
+			stack = [changed]
+		count = 0
+		while stack:
+			node = stack.pop()
+			key = id(node)
+			if key not in self.status:
+				continue
+			del self.status[key]
+			self.dirty[key] = node
+			count += 1
+			stack += self.dependents.get(key, ())
+		return count
+
+	def add_axiom(self, axiom):
+		if self.axioms is not None:
+			P = self._prop(axiom)
+			self.axioms.add(P._key)
+			self.invalidate(P)
+
+	def remove_axiom(self, axiom):
+		if self.axioms is not None:
+			P = self._prop(axiom)
+			self.axioms.discard(P._key)
+			self.invalidate(P)
+
+	def recheck(self):
+		"""Check the invalidated nodes again. Returns the number checked."""
+		before = self.checked
+		for node in list(self.dirty.values()):
+			self._verify(node)
+		return self.checked - before
+
+	def stats(self):
+		failed = sum(1 for s in self.status.values() if s is not True)
+		return {'nodes': len(self.status), 'failed': failed, 'dirty': len(self.dirty),
+			'checked': self.checked}
+
+
+def check(proof, axioms=None):
+	"""True if proof is correct, else the reason it is not."""
+	return ProofChecker(axioms).check(proof)
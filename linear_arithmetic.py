@@ -0,0 +1,349 @@
+"""Linear arithmetic over Q and R, by Fourier-Motzkin elimination.
+
+The facts are orderings x < y, x ≤ y, x > y, x ≥ y and x = y (Props made by
+LessThan, GreaterThan... or proofs of them), where x and y are sums of
+Objects (see rewriting.py). Each fact becomes rows
+
+	a1*v1 + ... + an*vn + c < 0   (or ≤ 0)
+
+over the atoms v of the sums, and the rows are decided by eliminating one
+atom at a time. Every row remembers the facts it was derived from, with
+their multipliers, so a contradiction comes with the facts that give it.
+A satisfiable system gets a model, by choosing the atoms back in the
+reverse order of elimination.
+
+A LinearSolver is incremental: it keeps the rows derived so far, so
+adding a fact only combines the rows of that fact with them, and facts
+added since a push() are retracted with pop() by dropping the rows derived
+since. entails(goal) checks the facts together with the negation of goal,
+in a push()/pop(): if they contradict each other, prove(goal) gives a
+proof of goal from the facts used, else model() is a counterexample.
+"""
+from fractions import Fraction
+
+from propositional import Meta, _proof_node
+from rewriting import linear_form
+import tracing
+
+_GOAL = -1 # origin of the rows of a negated goal
+_negations = {'lt': 'ge', 'le': 'gt', 'gt': 'le', 'ge': 'lt'}
+
+
+def _ordering(fact):
+	"""(x - y as ({atom: coefficient}, constant), symbol) for the ordering fact."""
+	P = fact if isinstance(fact, Meta) else fact.__class__
+	(cx, kx), (cy, ky) = linear_form(P.x), linear_form(P.y)
+	coefficients = dict(cx)
+	for atom, k in cy.items():
+		coefficients[atom] = coefficients.get(atom, 0) - k
+	return {a: k for a, k in coefficients.items() if k}, kx - ky, P.order_symbol
+
+
+def _rows(coefficients, constant, symbol, origin):
+	"""The rows (coefficients, constant, strict, origin) of
+	sum + constant symbol 0. The two rows of an equality have opposite
+	multipliers, so that their uses can cancel out."""
+	negated = {a: -k for a, k in coefficients.items()}
+	return {
+		'lt': [(coefficients, constant, True, origin)],
+		'le': [(coefficients, constant, False, origin)],
+		'gt': [(negated, -constant, True, origin)],
+		'ge': [(negated, -constant, False, origin)],
+		'eq': [(coefficients, constant, False, origin),
+			(negated, -constant, False, {f: -m for f, m in origin.items()})],
+	}[symbol]
+
+
+def _scaled(row, atom):
+	"""row, scaled so that atom has coefficient ±1."""
+	coefficients, constant, strict, origin = row
+	scale = Fraction(1, abs(coefficients[atom]))
+	if scale == 1:
+		return row
+	return ({a: k * scale for a, k in coefficients.items()}, constant * scale, strict,
+		{f: m * scale for f, m in origin.items()})
+
+
+def _simplify(rows):
+	"""Scale each row so that its first atom has coefficient ±1 and keep only
+	the tightest row for each left-hand side."""
+	best = {}
+	for row in rows:
+		row = _scaled(row, min(row[0], key=lambda atom: atom._id))
+		coefficients, constant, strict, origin = row
+		key = frozenset(coefficients.items())
+		kept = best.get(key)
+		if kept is None or constant > kept[1] or (constant == kept[1] and strict and not kept[2]):
+			best[key] = row
+	return list(best.values())
+
+
+def _combine(a, b, origin1, origin2):
+	origin = {f: a * m for f, m in origin1.items()}
+	for f, m in origin2.items():
+		origin[f] = origin.get(f, 0) + b * m
+	return origin
+
+
+def _eliminate(upper, lower, atom):
+	"""The row without atom combining upper (a positive coefficient of atom)
+	and lower (a negative one)."""
+	cu, ku, su, ou = upper
+	cl, kl, sl, ol = lower
+	a, b = cu[atom], -cl[atom]
+	coefficients = {v: b * k for v, k in cu.items() if v is not atom}
+	for v, k in cl.items():
+		if v is not atom:
+			coefficients[v] = coefficients.get(v, 0) + a * k
+	coefficients = {v: k for v, k in coefficients.items() if k}
+	return (coefficients, b * ku + a * kl, su or sl, _combine(b, a, ou, ol))
+
+
+def _contradicts(row):
+	coefficients, constant, strict, _ = row
+	return not coefficients and (constant > 0 or (strict and constant == 0))
+
+
+def _solve(eliminated):
+	"""A model {atom: Fraction} of rows from which the atoms were eliminated,
+	given as (atom, the rows bounding it when it was eliminated), by choosing
+	the atoms back in the reverse order."""
+	model = {}
+	for atom, bounding in reversed(eliminated):
+		low = high = None
+		low_strict = high_strict = False
+		for coefficients, constant, strict, _ in bounding:
+			a = coefficients[atom]
+			rest = constant
+			for v, k in coefficients.items():
+				if v is not atom:
+					# atoms only bounded along with atom are free
+					rest += k * model.setdefault(v, Fraction(0))
+			bound = -rest / a
+			if a > 0:
+				if high is None or bound < high or (bound == high and strict):
+					high, high_strict = bound, strict
+			elif low is None or bound > low or (bound == low and strict):
+				low, low_strict = bound, strict
+		if low is None:
+			value = Fraction(0) if high is None else (high - 1 if high_strict else high)
+		elif high is None:
+			value = low + 1 if low_strict else low
+		elif not low_strict:
+			value = low
+		elif not high_strict:
+			value = high
+		else:
+			value = (low + high) / 2
+		model[atom] = value
+	return model
+
+
+def decide(rows):
+	"""(True, model) if the rows can hold at once, model giving a Fraction
+	for each atom, else (False, origin) for a contradiction: the facts
+	combined, with their multipliers."""
+	eliminated = [] # (atom, the rows bounding it when it was eliminated)
+	while True:
+		live = []
+		for row in rows:
+			if _contradicts(row):
+				return False, row[3]
+			if row[0]:
+				live.append(row)
+		if not live:
+			break
+		live = _simplify(live)
+		counts = {}
+		for coefficients, *_ in live:
+			for atom, k in coefficients.items():
+				upper, lower = counts.get(atom, (0, 0))
+				counts[atom] = (upper + 1, lower) if k > 0 else (upper, lower + 1)
+		# the atom adding the fewest rows
+		atom = min(counts, key=lambda v: counts[v][0] * counts[v][1] - sum(counts[v]))
+		uppers = [row for row in live if row[0].get(atom, 0) > 0]
+		lowers = [row for row in live if row[0].get(atom, 0) < 0]
+		rows = [row for row in live if atom not in row[0]]
+		eliminated.append((atom, uppers + lowers))
+		rows += [_eliminate(upper, lower, atom) for upper in uppers for lower in lowers]
+	return True, _solve(eliminated)
+
+
+class _Level:
+	"""The stored rows in which atom is eliminated, uppers with coefficient 1
+	and lowers with -1. Every upper has been combined with every lower."""
+	__slots__ = ('atom', 'uppers', 'lowers', 'best')
+
+	def __init__(self, atom):
+		self.atom = atom
+		self.uppers = []
+		self.lowers = []
+		self.best = {} # left-hand side -> the tightest row with it
+
+	def add(self, row):
+		"""Store row, unless a row as tight with the same left-hand side is
+		stored already. Returns whether it was stored."""
+		coefficients, constant, strict, _ = row
+		key = frozenset(coefficients.items())
+		kept = self.best.get(key)
+		if kept is not None and (kept[1] > constant or (kept[1] == constant and (kept[2] or not strict))):
+			return False
+		self.best[key] = row
+		(self.uppers if coefficients[self.atom] > 0 else self.lowers).append(row)
+		return True
+
+	def truncate(self, uppers, lowers):
+		"""Drop the rows stored after the first uppers uppers and lowers lowers."""
+		for row in self.uppers[uppers:] + self.lowers[lowers:]:
+			key = frozenset(row[0].items())
+			if self.best.get(key) is row:
+				del self.best[key]
+		del self.uppers[uppers:]
+		del self.lowers[lowers:]
+
+
+class LinearSolver:
+	"""Decides conjunctions of orderings, incrementally.
+	The atoms are eliminated in a fixed order, the order they first appear
+	in. Each new row is combined with the rows stored for its first atom in
+	that order, and what remains goes on to the next atom, so adding a fact
+	only does the work that fact brings, and pop() just drops the rows
+	stored since the matching push().
+	"""
+	def __init__(self, facts=()):
+		self.facts = []
+		self.frames = [] # sizes of facts, levels, their rows and conflicts at each push
+		self.levels = [] # _Level for each atom, in the order of elimination
+		self.conflicts = [] # origins of the contradictions derived
+		self.checks = 0
+		self._model = None
+		self.conflict = None
+		self.certificate = None
+		self.goal_multiplier = None
+		for fact in facts:
+			self.add(fact)
+
+	def add(self, fact):
+		"""Assert fact, an ordering Prop or a proof of one."""
+		index = len(self.facts)
+		coefficients, constant, symbol = _ordering(fact)
+		self.facts.append(fact)
+		self._model = None
+		self._insert(_rows(coefficients, constant, symbol, {index: Fraction(1)}))
+
+	def _insert(self, rows):
+		if self.conflicts:
+			# nothing more is needed while the facts contradict each other,
+			# and these rows go with the contradiction on pop()
+			return
+		levels = self.levels
+		work = [(row, 0) for row in rows]
+		while work:
+			row, i = work.pop()
+			coefficients = row[0]
+			if not coefficients:
+				if _contradicts(row):
+					self.conflicts.append(row[3])
+				continue
+			while i < len(levels) and levels[i].atom not in coefficients:
+				i += 1
+			if i == len(levels):
+				levels.append(_Level(min(coefficients, key=lambda atom: atom._id)))
+			level = levels[i]
+			atom = level.atom
+			row = _scaled(row, atom)
+			if not level.add(row):
+				continue
+			if row[0][atom] > 0:
+				work += [(_eliminate(row, lower, atom), i + 1) for lower in level.lowers]
+			else:
+				work += [(_eliminate(upper, row, atom), i + 1) for upper in level.uppers]
+
+	def push(self):
+		self.frames.append((len(self.facts), len(self.levels),
+			[(len(level.uppers), len(level.lowers)) for level in self.levels], len(self.conflicts)))
+
+	def pop(self):
+		"""Retract the facts added since the matching push()."""
+		facts, levels, sizes, conflicts = self.frames.pop()
+		del self.facts[facts:]
+		del self.levels[levels:]
+		for level, (uppers, lowers) in zip(self.levels, sizes):
+			level.truncate(uppers, lowers)
+		del self.conflicts[conflicts:]
+		self._model = None
+
+	def _used(self, origin):
+		"""The facts with a multiplier in origin that is not 0."""
+		return [self.facts[i] for i in sorted(origin) if i != _GOAL and origin[i]]
+
+	def satisfiable(self):
+		"""Whether the facts can all hold at once. If not, conflict is the
+		list of facts that contradict each other, and certificate the list
+		of (fact, multiplier) that add up to a false ordering of constants,
+		eg 1 ≤ 0 (the multiplier of an equality can be negative). Inside
+		entails(), the negated goal takes part too, with goal_multiplier."""
+		self.checks += 1
+		tracing.count('linear_checks')
+		if self.conflicts:
+			origin = self.conflicts[0]
+			self.conflict = self._used(origin)
+			self.certificate = [(self.facts[i], origin[i]) for i in sorted(origin)
+				if i != _GOAL and origin[i]]
+			self.goal_multiplier = origin.get(_GOAL, 0)
+			return False
+		return True
+
+	def entails(self, goal):
+		"""Whether the facts entail the ordering goal. If they do, conflict
+		is the list of facts it follows from, and certificate with
+		goal_multiplier gives the contradiction with the negation of goal
+		(the last one checked, for an equality). Else model() is a
+		counterexample."""
+		coefficients, constant, symbol = _ordering(goal)
+		used = set()
+		for negation in (('lt', 'gt') if symbol == 'eq' else (_negations[symbol],)):
+			self.push()
+			self._insert(_rows(coefficients, constant, negation, {_GOAL: Fraction(1)}))
+			sat = self.satisfiable()
+			model = self._solution() if sat else None
+			if not sat:
+				used.update(f for f, m in self.conflicts[0].items() if m)
+			self.pop()
+			if sat:
+				self._model = model
+				return False
+		self.conflict = [self.facts[i] for i in sorted(used) if i != _GOAL]
+		return True
+
+	def _solution(self):
+		return _solve([(level.atom, level.uppers + level.lowers) for level in self.levels])
+
+	def model(self):
+		"""After a satisfiable check or a failed entails(): {atom: Fraction}."""
+		if self._model is None and not self.conflicts:
+			self._model = self._solution()
+		return self._model
+
+	def prove(self, goal):
+		"""A proof of the ordering goal from the proofs among the facts."""
+		if not self.entails(goal):
+			raise Exception(f"Proposition {goal} does not follow, eg {self.model()}.")
+		for fact in self.conflict:
+			if isinstance(fact, Meta):
+				raise Exception(f"Proposition {goal} follows from {fact}, which is not proven.")
+		return _proof_node('LinearArithmetic', tuple(self.conflict), goal)
+
+
+def entails(facts, goal):
+	"""Whether the orderings facts entail the ordering goal."""
+	return LinearSolver(facts).entails(goal)
+
+
+@tracing.rule
+def LinearArithmetic(goal, *proofs):
+	"""Given an ordering goal and proofs of orderings it follows from, eg
+	(x < y) and (y < z + 1) for (x - z < 1), produce a proof of goal, else,
+	throw an error.
+	"""
+	return LinearSolver(proofs).prove(goal)
@@ -0,0 +1,64 @@
+"""Bounded memo tables.
+
+A Memo is a dict holding at most maxsize entries: when it is full, storing
+a new entry drops the least recently used one. lookup() counts hits and
+misses, and the counts are also sent to the tracer as '<name>_hits' and
+'<name>_misses'.
+
+With weak=True, an entry that was dropped is still found while its value
+is in use elsewhere. A table of Objects can then be bounded and still give
+back the very same Object for a key, as long as anyone can tell.
+"""
+import collections
+import weakref
+
+import tracing
+
+
+class Memo(collections.OrderedDict):
+	"""maxsize: the most entries kept, None for no bound."""
+	def __init__(self, maxsize=None, weak=False, name='memo'):
+		super().__init__()
+		self.maxsize = maxsize
+		self.name = name
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+		self._dropped = weakref.WeakValueDictionary() if weak and maxsize is not None else None
+
+	def lookup(self, key, default=None):
+		"""The value for key, or default."""
+		value = self.get(key, self)
+		if value is self and self._dropped is not None:
+			value = self._dropped.pop(key, self)
+			if value is not self:
+				self.store(key, value)
+		if value is self:
+			self.misses += 1
+			if tracing._tracer is not None:
+				tracing.count(self.name + '_misses')
+			return default
+		if self.maxsize is not None:
+			self.move_to_end(key)
+		self.hits += 1
+		if tracing._tracer is not None:
+			tracing.count(self.name + '_hits')
+		return value
+
+	def store(self, key, value):
+		self[key] = value
+		if self.maxsize is None:
+			return
+		self.move_to_end(key)
+		while len(self) > self.maxsize:
+			old_key, old = self.popitem(last=False)
+			self.evictions += 1
+			if self._dropped is not None:
+				try:
+					self._dropped[old_key] = old
+				except TypeError: # no weak references to old
+					pass
+
+	def stats(self):
+		return {'size': len(self), 'maxsize': self.maxsize, 'hits': self.hits,
+			'misses': self.misses, 'evictions': self.evictions}
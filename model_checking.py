@@ -0,0 +1,423 @@
+"""Model checking of quantified formulas over finite domains.
+
+A ForAll or Exists Prop (see Quantified) is evaluated by letting its bound
+variable range over a finite set: the set given for it in domains, or by
+default the set_ of the variable, eg x = Object('x', set_=A).
+
+The inner formula is compiled once into a kernel that evaluates it for a
+whole range of elements of the domain at a time, giving a bitmask (an int,
+bit i for the i-th element): connectives are &, | and ~ on the masks,
+membership of the variable is a slice of a mask computed once per set,
+and an ordering that is linear in the variable, eg x + 1 < y, is a slice
+of the domain, which is sorted by value. A term about the variable, eg
+f(x), is evaluated once per element of the domain, as a column of values
+that atoms about it are then compared with. A nested quantifier, eg ∃y
+in ∀x∃y(x < y + 1), is a matrix of masks: one mask over the x chunk for
+each element y of its domain, reduced with & for a ForAll and | for an
+Exists, stopping as soon as the result is known. ForAll then checks that
+a mask is full, Exists that it is not 0, one chunk of the domain at a
+time, stopping at the first chunk that decides. What cannot be done this
+way, eg an atom about x and f(y), is evaluated element by element.
+
+check(prop) gives (holds, assignment): for a ForAll that fails, the
+assignment is a counterexample, for an Exists that holds, a witness. It
+is followed into directly nested quantifiers of the same kind, eg for
+∀x∀y(...) both x and y.
+"""
+from bisect import bisect_left, bisect_right
+import operator
+
+from propositional import Implies, And, Or, _False, _connective, _children, _is_compound
+from predicate import (Object, Term, SetMeta, BitSetMeta, Membership, OrderingOfReals)
+from sets import Q
+from rewriting import linear_form
+
+_flipped = {'lt': 'gt', 'le': 'ge', 'gt': 'lt', 'ge': 'le', 'eq': 'eq'}
+_operators = {'lt': operator.lt, 'le': operator.le, 'gt': operator.gt, 'ge': operator.ge,
+	'eq': operator.eq}
+
+
+def _mask(bits):
+	"""The bitmask of a list of bools, bit i for bits[i]."""
+	if not bits:
+		return 0
+	return int(''.join(['01'[b] for b in reversed(bits)]), 2)
+
+
+class _Axis:
+	"""The elements of the domain of a variable, sorted by value if they all
+	have one, with the masks of the sets they were tested against and the
+	columns of the terms evaluated on them."""
+	def __init__(self, set_):
+		elements = list(set_)
+		values = [e.value if isinstance(e, Object) else None for e in elements]
+		self.sorted = bool(elements) and None not in values
+		if self.sorted:
+			order = sorted(range(len(elements)), key=values.__getitem__)
+			elements = [elements[i] for i in order]
+			values = [values[i] for i in order]
+		self.elements = elements
+		self.values = values
+		self.masks = {} # set, or (term, set) -> mask of the elements in it
+		self.columns = {} # key -> a value for each element
+
+	def __len__(self):
+		return len(self.elements)
+
+	def column(self, key, value):
+		"""[value(e) for each element e], computed once for key."""
+		found = self.columns.get(key)
+		if found is None:
+			found = self.columns[key] = [value(e) for e in self.elements]
+		return found
+
+	def members(self, set_, t=None, images=None):
+		"""The mask of the elements in set_, or with t the mask of the
+		elements whose images (a column) are in set_."""
+		key = set_ if t is None else (t, set_)
+		mask = self.masks.get(key)
+		if mask is None:
+			items = self.elements if t is None else images
+			if hasattr(set_, 'contains_many'):
+				mask = _mask(set_.contains_many(items))
+			else:
+				mask = _mask([e in set_ for e in items])
+			self.masks[key] = mask
+		return mask
+
+	def ordered(self, symbol, value):
+		"""The mask of the elements e with e symbol value, eg e < value."""
+		values = self.values
+		if symbol in ('lt', 'ge'):
+			cut = bisect_left(values, value)
+			low, high = (0, cut) if symbol == 'lt' else (cut, len(values))
+		elif symbol in ('le', 'gt'):
+			cut = bisect_right(values, value)
+			low, high = (0, cut) if symbol == 'le' else (cut, len(values))
+		else:
+			low, high = bisect_left(values, value), bisect_right(values, value)
+		return ((1 << high) - 1) ^ ((1 << low) - 1)
+
+
+def _compare(symbol, a, b):
+	if a is None or b is None:
+		raise ValueError(f"Cannot compare {a} and {b}: not both constants.")
+	return {'lt': a < b, 'le': a <= b, 'gt': a > b, 'ge': a >= b, 'eq': a == b}[symbol]
+
+
+def _kind(P):
+	key = P.__dict__.get('_leaf_key')
+	if getattr(P, 'quantifier', None) in ('A', 'E') and 'inner_prop' in P.__dict__:
+		return 'quantified'
+	if isinstance(key, tuple) and isinstance(key[0], type):
+		if issubclass(key[0], Membership):
+			return 'membership'
+		if issubclass(key[0], OrderingOfReals):
+			return 'ordering'
+	return None
+
+
+class Interrupted(Exception):
+	"""Raised by search() once the stop Event of the checker is set."""
+
+
+class ModelChecker:
+	"""Evaluates quantified Props over finite domains.
+	domains: {bound variable: finite set, or list of elements} for the
+	variables whose set_ is not the domain to use.
+	chunk: number of elements evaluated at a time before early exit.
+	stop: an Event (threading or multiprocessing), checked between chunks.
+	"""
+	def __init__(self, domains=None, chunk=4096, stop=None):
+		self.chunk = chunk
+		self.stop = stop
+		self.axes = {var: _Axis(set_) for var, set_ in (domains or {}).items()}
+		self._objects = {} # Prop or term -> the Objects in it
+		self._kernels = {} # (Prop, variable) -> (kernel, whether it is vectorized)
+		self.evaluations = 0 # elements the kernels were run on
+
+	def axis(self, var):
+		axis = self.axes.get(var)
+		if axis is None:
+			set_ = var.set_
+			if not isinstance(set_, (SetMeta, BitSetMeta)):
+				raise TypeError(f"No finite domain for {var}: give one in domains.")
+			axis = self.axes[var] = _Axis(set_)
+		return axis
+
+	def objects(self, P):
+		"""The Objects a Prop or a term is built from."""
+		found = self._objects.get(P)
+		if found is not None:
+			return found
+		if isinstance(P, Object):
+			found = frozenset().union(*(self.objects(a) for a in P.args)) \
+				if isinstance(P, Term) else frozenset((P,))
+		elif _is_compound(P):
+			found = frozenset().union(*(self.objects(c) for c in _children(P)))
+		else:
+			kind = _kind(P)
+			if kind == 'quantified':
+				found = self.objects(P.inner_prop) | {P.x}
+			elif kind == 'membership':
+				found = self.objects(P.x)
+			elif kind == 'ordering':
+				found = self.objects(P.x) | self.objects(P.y)
+			else:
+				found = frozenset()
+		self._objects[P] = found
+		return found
+
+	def term(self, t, env):
+		"""The Object t stands for, once the variables in env are replaced."""
+		found = env.get(t)
+		if found is not None:
+			return found
+		if not isinstance(t, Term):
+			return t
+		args = [self.term(a, env) for a in t.args]
+		if not isinstance(t.op, str):
+			return t.op(*args)
+		a, b = args
+		x, y = a.value, b.value
+		if x is None or y is None:
+			return Term(t.op, (a, b), t.set_)
+		return Object.constant(x + y if t.op == '+' else x - y, set_=Q)
+
+	def truth(self, P, env):
+		"""Whether P holds, with the variables in env replaced."""
+		if P._key is _False:
+			return False
+		if _is_compound(P):
+			base = _connective(P)
+			left, right = _children(P)
+			if base is And:
+				return self.truth(left, env) and self.truth(right, env)
+			if base is Or:
+				return self.truth(left, env) or self.truth(right, env)
+			if base is Implies:
+				return not self.truth(left, env) or self.truth(right, env)
+			return self.truth(left, env) == self.truth(right, env)
+		kind = _kind(P)
+		if kind == 'quantified':
+			return self.search(P, env)[0]
+		if kind == 'membership':
+			return self.term(P.x, env) in P.set_
+		if kind == 'ordering':
+			return _compare(P.order_symbol, self.term(P.x, env).value, self.term(P.y, env).value)
+		raise TypeError(f"Cannot evaluate {P}: not a quantified, membership or ordering Prop.")
+
+	def search(self, P, env):
+		"""(whether the quantified P holds, the index of the first element
+		of its domain that decided it, or None)."""
+		var = P.x
+		axis = self.axis(var)
+		kernel = self.kernel(P.inner_prop, var)
+		universal = P.quantifier == 'A'
+		n = len(axis)
+		for low in range(0, n, self.chunk):
+			if self.stop is not None and self.stop.is_set():
+				raise Interrupted()
+			high = min(low + self.chunk, n)
+			mask = kernel(env, axis, low, high)
+			self.evaluations += high - low
+			if universal:
+				failed = ~mask & ((1 << (high - low)) - 1)
+				if failed:
+					return False, low + (failed & -failed).bit_length() - 1
+			elif mask:
+				return True, low + (mask & -mask).bit_length() - 1
+		return universal, None
+
+	def kernel(self, P, var):
+		"""A function (env, axis, low, high) giving the mask of the elements
+		number low to high - 1 of the domain of var for which P holds."""
+		return self._entry(P, var)[0]
+
+	def vectorized(self, P, var):
+		"""Whether the kernel of P for var works on whole chunks, rather than
+		element by element."""
+		return self._entry(P, var)[1]
+
+	def _entry(self, P, var):
+		key = (P, var)
+		entry = self._kernels.get(key)
+		if entry is None:
+			entry = self._kernels[key] = self._compile(P, var)
+		return entry
+
+	def _compile(self, P, var):
+		"""(kernel, whether it is vectorized) for P and var."""
+		if var not in self.objects(P):
+			truth = self.truth
+			return (lambda env, axis, low, high: ((1 << (high - low)) - 1) if truth(P, env) else 0), True
+		if _is_compound(P):
+			base = _connective(P)
+			children = [self._entry(c, var) for c in _children(P)]
+			(left, left_vectorized), (right, right_vectorized) = children
+			if base is And:
+				def kernel(env, axis, low, high):
+					mask = left(env, axis, low, high)
+					return mask and mask & right(env, axis, low, high)
+			elif base is Or:
+				def kernel(env, axis, low, high):
+					full = (1 << (high - low)) - 1
+					mask = left(env, axis, low, high)
+					return mask if mask == full else mask | right(env, axis, low, high)
+			elif base is Implies:
+				def kernel(env, axis, low, high):
+					full = (1 << (high - low)) - 1
+					mask = ~left(env, axis, low, high) & full
+					return mask if mask == full else mask | right(env, axis, low, high)
+			else:
+				def kernel(env, axis, low, high):
+					full = (1 << (high - low)) - 1
+					return ~(left(env, axis, low, high) ^ right(env, axis, low, high)) & full
+			return kernel, left_vectorized and right_vectorized
+		kind = _kind(P)
+		if kind == 'membership':
+			set_ = P.set_
+			if P.x is var:
+				return (lambda env, axis, low, high:
+					(axis.members(set_) >> low) & ((1 << (high - low)) - 1)), True
+			if self.objects(P.x) == {var}:
+				# eg f(x) ∈ S: the images of the domain, tested once
+				t = P.x
+				term = self.term
+				def kernel(env, axis, low, high):
+					images = axis.column(t, lambda e: term(t, {var: e}))
+					return (axis.members(set_, t, images) >> low) & ((1 << (high - low)) - 1)
+				return kernel, True
+		if kind == 'quantified':
+			inner, vectorized = self._entry(P.inner_prop, var)
+			if vectorized:
+				return self._broadcast(P, inner), True
+		if kind == 'ordering':
+			kernel = self._compile_ordering(P, var)
+			if kernel is not None:
+				return kernel, True
+		return self._per_element(P, var), False
+
+	def _broadcast(self, P, inner):
+		"""The kernel of the quantified P for var, given inner, the kernel of
+		its inner Prop for var: the masks of inner over the chunk of var for
+		each element of the domain of P.x, the rows of a var × P.x matrix,
+		reduced with & for a ForAll and | for an Exists."""
+		bound = P.x
+		universal = P.quantifier == 'A'
+		def kernel(env, axis, low, high):
+			full = (1 << (high - low)) - 1
+			stop = 0 if universal else full
+			mask = full ^ stop
+			env = dict(env)
+			rows = 0
+			for rows, element in enumerate(self.axis(bound).elements, 1):
+				env[bound] = element
+				if universal:
+					mask &= inner(env, axis, low, high)
+				else:
+					mask |= inner(env, axis, low, high)
+				if mask == stop:
+					break
+			self.evaluations += rows * (high - low)
+			return mask
+		return kernel
+
+	def _compile_ordering(self, P, var):
+		"""For an ordering linear in var, eg x + 1 < y + c with var y, the
+		kernel slicing the sorted domain at the bound on var. For one about
+		terms of var alone, eg f(x) < y, the kernel comparing the column of
+		their values with the bound. Else None."""
+		(cx, kx), (cy, ky) = linear_form(P.x), linear_form(P.y)
+		# x - y = a * var + the sum of k * atom + constant
+		coefficients = dict(cx)
+		for atom, k in cy.items():
+			coefficients[atom] = coefficients.get(atom, 0) - k
+		a = coefficients.pop(var, 0)
+		moving = sorted(((atom, k) for atom, k in coefficients.items()
+			if k and var in self.objects(atom)), key=lambda item: item[0]._id)
+		if any(self.objects(atom) != {var} for atom, _ in moving):
+			return None
+		constant = kx - ky
+		rest = [(atom, k) for atom, k in coefficients.items() if k and var not in self.objects(atom)]
+		term = self.term
+		def offset(env):
+			value = constant
+			for atom, k in rest:
+				v = term(atom, env).value
+				if v is None:
+					raise ValueError(f"Cannot evaluate {P}: {atom} is not a constant.")
+				value += k * v
+			return value
+		per_element = self._per_element(P, var)
+		if moving:
+			def value(e):
+				"""The part about var for the element e, or None if it is not
+				a number, eg for an element that is not a constant."""
+				total = 0
+				if a:
+					v = e.value if isinstance(e, Object) else None
+					if v is None:
+						return None
+					total = a * v
+				for atom, k in moving:
+					v = term(atom, {var: e}).value
+					if v is None:
+						return None
+					total += k * v
+				return total
+			key = (a,) + tuple(moving)
+			compare = _operators[P.order_symbol]
+			def kernel(env, axis, low, high):
+				# the part about var symbol -(the rest)
+				column = axis.column(key, value)[low:high]
+				if None in column:
+					return per_element(env, axis, low, high)
+				bound = -offset(env)
+				return _mask([compare(v, bound) for v in column])
+			return kernel
+		if not a:
+			return None
+		symbol = P.order_symbol if a > 0 else _flipped[P.order_symbol]
+		def kernel(env, axis, low, high):
+			if not axis.sorted:
+				return per_element(env, axis, low, high)
+			bound = -offset(env) / a
+			return (axis.ordered(symbol, bound) >> low) & ((1 << (high - low)) - 1)
+		return kernel
+
+	def _per_element(self, P, var):
+		"""The kernel evaluating P element by element, eg for a nested
+		quantifier or an atom about f(x)."""
+		truth = self.truth
+		def kernel(env, axis, low, high):
+			env = dict(env)
+			bits = []
+			for element in axis.elements[low:high]:
+				env[var] = element
+				bits.append(truth(P, env))
+			return _mask(bits)
+		return kernel
+
+	def check(self, P, env=None):
+		"""(whether P holds, a witness or counterexample {variable: element}
+		or None). See the module docstring."""
+		env = dict(env or {})
+		if _kind(P) != 'quantified':
+			return self.truth(P, env), None
+		holds, index = self.search(P, env)
+		decisive = 'E' if holds else 'A'
+		assignment = {}
+		while index is not None and P.quantifier == decisive:
+			assignment[P.x] = env[P.x] = self.axis(P.x).elements[index]
+			P = P.inner_prop
+			if _kind(P) != 'quantified':
+				break
+			index = self.search(P, env)[1]
+		return holds, assignment or None
+
+
+def check(P, domains=None):
+	"""(whether the quantified Prop P holds over the finite domains, a
+	witness or counterexample). See ModelChecker."""
+	return ModelChecker(domains).check(P)
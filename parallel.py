@@ -0,0 +1,109 @@
+"""Model checking of quantified Props over sharded domains, in parallel.
+
+The domain of the outermost bound variable is split into shards, ranges of
+consecutive elements, and each shard is checked by a ModelChecker (see
+model_checking.py) in one of a pool of processes. The Prop, the elements
+and the other domains are sent once to each process, encoded with
+serialize.py: the Prop classes made on the fly by the predicates cannot be
+pickled by name.
+
+A ForAll holds if it holds on every shard, an Exists if it holds on one.
+As soon as a shard gives a ForAll counterexample or an Exists witness, the
+shards not started yet are cancelled and the running ones stop at their
+next chunk, through an Event shared with the pool.
+
+	holds, assignment = parallel.check(formula, workers=8)
+
+The domain can also be the first limit elements of an infinite set, eg N.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import itertools
+import multiprocessing
+import os
+
+from predicate import SetMeta, BitSetMeta
+from model_checking import ModelChecker, Interrupted, _kind
+import serialize
+
+# in a worker: the Prop, the elements of the domain of its variable, the
+# other domains, the position of each element by id, and the stop Event
+_job = None
+_positions = None
+_stop = None
+
+
+def _start_worker(data, stop):
+	global _job, _positions, _stop
+	_job = serialize.loads(data)
+	_positions = {id(e): i for i, e in enumerate(_job[1])}
+	_stop = stop
+
+
+def _check_shard(low, high, chunk):
+	"""(whether the Prop holds on the elements low to high - 1, the position
+	of the element that decided it or None), or None if stopped."""
+	P, elements, domains = _job
+	checker = ModelChecker({**domains, P.x: elements[low:high]}, chunk, _stop)
+	try:
+		holds, index = checker.search(P, {})
+	except Interrupted:
+		return None
+	if index is None:
+		return holds, None
+	return holds, _positions[id(checker.axis(P.x).elements[index])]
+
+
+def elements(var, domains=None, limit=None):
+	"""The elements var ranges over: its domain in domains, else its set_,
+	cut to the first limit elements if given (needed for infinite sets)."""
+	set_ = (domains or {}).get(var, var.set_)
+	if limit is not None:
+		return list(itertools.islice(iter(set_), limit))
+	if not isinstance(set_, (SetMeta, BitSetMeta, list)):
+		raise TypeError(f"No finite domain for {var}: give one in domains, or a limit.")
+	return list(set_)
+
+
+def check(P, domains=None, workers=None, shards=None, limit=None, chunk=4096, context=None):
+	"""(whether the quantified Prop P holds, a witness or counterexample),
+	as model_checking.check, with the domain of the outermost variable
+	split into shards (by default 4 per worker) checked by workers
+	processes (by default one per core). A domain of at most chunk
+	elements is checked in this process.
+	limit: check only the first limit elements of that domain.
+	context: the multiprocessing context of the pool.
+	"""
+	domains = dict(domains or {})
+	if _kind(P) != 'quantified':
+		return ModelChecker(domains, chunk).check(P)
+	var = P.x
+	found = elements(var, domains, limit)
+	workers = workers or os.cpu_count() or 1
+	if workers == 1 or len(found) <= chunk:
+		return ModelChecker({**domains, var: found}, chunk).check(P)
+	shards = shards or 4 * workers
+	size = -(-len(found) // shards)
+	inner = {v: s for v, s in domains.items() if v is not var}
+	data = serialize.dumps((P, found, inner))
+	context = context or multiprocessing.get_context()
+	stop = context.Event()
+	universal = P.quantifier == 'A'
+	holds, position = universal, None
+	pool = ProcessPoolExecutor(min(workers, shards), context, _start_worker, (data, stop))
+	try:
+		futures = [pool.submit(_check_shard, low, min(low + size, len(found)), chunk)
+			for low in range(0, len(found), size)]
+		for future in as_completed(futures):
+			result = future.result()
+			if result is not None and result[0] != universal:
+				holds, position = result
+				break
+	finally:
+		stop.set()
+		pool.shutdown(wait=True, cancel_futures=True)
+	if position is None:
+		return holds, None
+	# the rest of the assignment, for a nested quantifier of the same kind
+	element = found[position]
+	rest = ModelChecker(inner, chunk).check(P.inner_prop, {var: element})[1]
+	return holds, {var: element, **(rest or {})}
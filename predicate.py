@@ -1,9 +1,17 @@
-from propositional import Prop, default_new, _produce_a_proof, Implies, ModusPonens
+from propositional import (Prop, default_new, _proof_node, Implies, And,
+	ModusPonens, equal_type)
 from functools import partial
 from typing import Union
 import logging
 import itertools
 import fractions
+import math
+import re
+import threading
+import weakref
+
+import tracing
+from memo import Memo
 
 debug = logging.debug
 info = logging.info
@@ -11,7 +19,6 @@ warn = logging.warning
 err = logging.error
 crit = logging.critical
 
-logging.basicConfig(level=logging.WARNING)
 # Predicate takes an object and returns a Prop (a class)
 # I believe we will not need to create a Python object of type Set,
 # since we use predicates which give Props, and the obj attribute
@@ -25,17 +32,105 @@ def remove_useless_keys(kwargs, required_kwargs):
 	return kwargs_
 
 
+# constants, eg '5', '1/2' or '1.5': Objects with the same value (or, for a
+# name not written as constant() renders it, the same name) and Set are one
+# Object while it is alive, see Object
+_numeral = re.compile(r'-?\d+(\.\d*)?|-?\d+/\d+')
+# a fraction as constant() names it, keyed on its value
+_fraction = re.compile(r'(-?[1-9]\d*|0)/([1-9]\d*)')
+_constants = weakref.WeakValueDictionary()
+# compound terms, see Term
+_terms = weakref.WeakValueDictionary()
+_constants_lock = threading.Lock()
+
 class Object:
-	"""Represents an object in our universe."""
-	_num_objects = 0
-	def __init__(self, name='', set_=None):
+	"""Represents an object in our universe.
+	Objects named by a numeral are constants: while intern_constants is True,
+	Object('1/2', set_=Q) always gives the same Object, as does
+	Object.constant(Fraction(1, 2), set_=Q). Other names, eg 'x', make a new
+	Object each time.
+	"""
+	# _level caches where the Object sits in the number tower, see sets.py
+	__slots__ = ('_name', 'set_', '_id', '_value', '_level', 'numerator', 'denominator',
+		'__weakref__')
+	intern_constants = True
+	_ids = itertools.count(1) # next() on a count is atomic
+
+	def __new__(cls, name='', set_=None):
 		assert isinstance(name, str), "name must be str"
 		if set_ is not None:
-			assert type(set_) in [SetMeta, SetMetaMeta, ProdMeta]
-		self.name = name
-		Object._num_objects += 1
-		self._id = Object._num_objects
+			assert type(set_) in [SetMeta, SetMetaMeta, BitSetMeta, ProdMeta]
+		if cls.intern_constants:
+			# '1/2' is the constant 1/2, while '0.5' and '2/4' keep their own Object
+			match = _fraction.fullmatch(name)
+			if match:
+				n, d = int(match[1]), int(match[2])
+				if math.gcd(n, d) == 1:
+					return cls._interned((cls, n, d, set_), set_, name)
+			if _numeral.fullmatch(name):
+				return cls._interned((cls, name, set_), set_, name)
+		return cls._make(name, set_)
+
+	@classmethod
+	def _interned(cls, key, set_, name=None, value=None):
+		obj = _constants.get(key)
+		if obj is None:
+			with _constants_lock:
+				obj = _constants.get(key)
+				if obj is None:
+					obj = cls._make(name, set_)
+					if value is not None:
+						obj._value = value
+					_constants[key] = obj
+		return obj
+
+	@classmethod
+	def _make(cls, name, set_):
+		self = object.__new__(cls)
+		if name is not None:
+			self._name = name
 		self.set_ = set_
+		self._id = next(Object._ids)
+		return self
+
+	@classmethod
+	def constant(cls, value, set_=None):
+		"""The constant Object with the exact value value (a Fraction or int),
+		named 'numerator/denominator' once the name is asked for."""
+		if not isinstance(value, fractions.Fraction):
+			value = fractions.Fraction(value)
+		if cls.intern_constants:
+			return cls._interned((cls, value.numerator, value.denominator, set_), set_,
+				value=value)
+		obj = cls._make(None, set_)
+		obj._value = value
+		return obj
+
+	@property
+	def name(self):
+		try:
+			return self._name
+		except AttributeError:
+			pass
+		value = self._value
+		self._name = name = f"{value.numerator}/{value.denominator}"
+		return name
+
+	@property
+	def value(self):
+		"""The exact value (a Fraction) of a constant, or None. The name is
+		parsed once, on first use."""
+		try:
+			return self._value
+		except AttributeError:
+			pass
+		try:
+			value = fractions.Fraction(self.name)
+		except ValueError:
+			value = None
+		self._value = value
+		return value
+
 	def __repr__(self):
 		if self.name:
 			return self.name
@@ -58,6 +153,61 @@ class Object:
 			return self.set_.__sub__(self, other)
 
 
+
+class Term(Object):
+	"""An Object built from others: a + b and a - b (op '+' or '-', args
+	(a, b)), or f(a) for a Func f (op f, args (a,)).
+	Terms are hash-consed: while a term is alive, building it again gives
+	the same Object, so equal terms are the same Object (compare them with
+	is), and a term repeated in many formulas is stored once. The name is
+	only rendered when it is asked for.
+	"""
+	__slots__ = ('op', 'args')
+
+	def __new__(cls, op, args, set_=None):
+		key = (op, args, set_)
+		term = _terms.get(key)
+		if term is None:
+			with _constants_lock:
+				term = _terms.get(key)
+				if term is None:
+					term = object.__new__(cls)
+					term.op = op
+					term.args = args
+					term.set_ = set_
+					term._id = next(Object._ids)
+					term._value = None
+					_terms[key] = term
+		return term
+
+	@property
+	def name(self):
+		try:
+			return self._name
+		except AttributeError:
+			pass
+		# render the subterms without names first, so deep terms do not recurse
+		stack = [self]
+		while stack:
+			term = stack[-1]
+			pending = [a for a in term.args if isinstance(a, Term) and not hasattr(a, '_name')]
+			if pending:
+				stack += pending
+				continue
+			stack.pop()
+			term._name = term._render()
+		return self._name
+
+	def _render(self):
+		if not isinstance(self.op, str):
+			return f"{self.op.__name__}({', '.join(a.name for a in self.args)})"
+		left, right = self.args
+		right_name = right.name
+		if isinstance(right, Term) and right.op in ('+', '-'):
+			right_name = f"({right_name})"
+		return f"{left.name} {self.op} {right_name}"
+
+
 class SetMetaMeta(type):
 	def __repr__(cls):
 		return cls.__name__
@@ -68,43 +218,307 @@ class SetMetaMeta(type):
 	def __iter__(cls):
 		return cls.__iter__()
 
+	def contains_many(cls, items):
+		"""[item in cls for item in items]"""
+		return [item in cls for item in items]
+
+	def _is_image(cls, item):
+		"""Whether item is f(x) for a Func f with range cls. Such images are
+		members without being added, so the set keeps no reference to them."""
+		return type(item) is Term and isinstance(item.op, FuncMeta) and item.set_ is cls
+
 
 class SetMeta(SetMetaMeta):
 	def add(cls, item):
 		cls._items.add(item)
 
 	def __contains__(cls, item):
-		return item in cls._items
+		return item in cls._items or cls._is_image(item)
 
 	def __iter__(cls):
 		return (x for x in cls._items)
 
+	def contains_many(cls, items):
+		items_ = cls._items
+		return [item in items_ or cls._is_image(item) for item in items]
+
+
+class Domain:
+	"""A numbering of Objects, so that sets of them can be stored as bitsets
+	(see BitSet). An Object gets the next bit the first time it is added to
+	a set over the domain."""
+	def __init__(self, objects=()):
+		self.objects = [] # bit -> Object
+		self.index = {} # Object -> bit
+		for obj in objects:
+			self.bit(obj)
+
+	def __len__(self):
+		return len(self.objects)
+
+	def bit(self, obj):
+		"""The bit of obj, giving it one if it has none yet."""
+		i = self.index.get(obj)
+		if i is None:
+			i = self.index[obj] = len(self.objects)
+			self.objects.append(obj)
+		return i
+
+	def bits(self, objs):
+		"""The bitset (an int) of objs."""
+		buf = bytearray((len(self.objects) + len(objs)) // 8 + 1)
+		for obj in objs:
+			i = self.bit(obj)
+			buf[i >> 3] |= 1 << (i & 7)
+		return int.from_bytes(buf, 'little')
+
+	def members(self, bits):
+		"""The Objects in the bitset bits, in bit order."""
+		objects = self.objects
+		for byte_index, byte in enumerate(bits.to_bytes((bits.bit_length() + 7) // 8, 'little')):
+			while byte:
+				low = byte & -byte
+				yield objects[byte_index * 8 + low.bit_length() - 1]
+				byte ^= low
+
+
+class BitSetMeta(SetMetaMeta):
+	"""Finite sets stored as a bitset over a Domain. _bits is the bitset, an
+	int, so union, intersection, difference and cardinality of sets over the
+	same domain are single int operations."""
+	def add(cls, item):
+		cls._bits |= 1 << cls.domain.bit(item)
+
+	def add_many(cls, items):
+		cls._bits |= cls.domain.bits(items)
+
+	def _bytes(cls):
+		"""_bits as bytes, kept until _bits changes, so testing a bit does
+		not shift the whole int."""
+		bits = cls._bits
+		view = cls.__dict__.get('_view')
+		if view is None or view[0] is not bits:
+			view = cls._view = (bits, bits.to_bytes((bits.bit_length() + 7) // 8, 'little'))
+		return view[1]
+
+	def __contains__(cls, item):
+		i = cls.domain.index.get(item)
+		if i is None:
+			return cls._is_image(item)
+		buf = cls._bytes()
+		return (i >> 3) < len(buf) and (buf[i >> 3] >> (i & 7)) & 1 == 1
+
+	def contains_many(cls, items):
+		index, buf = cls.domain.index, cls._bytes()
+		found = []
+		for item in items:
+			i = index.get(item)
+			if i is None:
+				found.append(cls._is_image(item))
+			else:
+				found.append((i >> 3) < len(buf) and (buf[i >> 3] >> (i & 7)) & 1 == 1)
+		return found
+
+	def __iter__(cls):
+		return cls.domain.members(cls._bits)
+
+	def __len__(cls):
+		return cls._bits.bit_count()
+
+	def _same_domain(cls, other):
+		if not isinstance(other, BitSetMeta) or other.domain is not cls.domain:
+			raise TypeError(f"{cls} and {other} are not bitsets over the same Domain.")
+
+	def __or__(cls, other):
+		cls._same_domain(other)
+		return createSet(f"({cls} ∪ {other})", BitSet, domain=cls.domain, _bits=cls._bits | other._bits)
+
+	def __and__(cls, other):
+		cls._same_domain(other)
+		return createSet(f"({cls} ∩ {other})", BitSet, domain=cls.domain, _bits=cls._bits & other._bits)
+
+	def __sub__(cls, other):
+		cls._same_domain(other)
+		return createSet(f"({cls} \\ {other})", BitSet, domain=cls.domain, _bits=cls._bits & ~other._bits)
+
+	def issubset(cls, other):
+		cls._same_domain(other)
+		return cls._bits & ~other._bits == 0
+
 
 class ProdMeta(type):
+	"""Cartesian products of sets, kept lazy: the elements (tuples) are never
+	stored. The elements of a product of finite sets are numbered in the
+	order itertools.product gives them, ie an element is a number in mixed
+	radix whose digits are the positions of its parts in their sets, so
+	len, cls[i] and cls.index(t) do not enumerate the product."""
 	def __repr__(cls):
-		st = ''
-		for s in cls.sets:
-			st += str(s) + '×'
-		st = st[:-1]
-
-		return f"{self.name}:{st}"
+		return f"{cls.__name__}:{'×'.join(s.__name__ for s in cls.sets)}"
 
 	def __contains__(cls, item):
-		assert isinstance(item, tuple), "Product set contains only Python tuples."
-		
-		for i, obj in enumerate(items):
-			if not obj in cls.sets[i]:
-				return False
-		return True
+		if not isinstance(item, tuple) or len(item) != len(cls.sets):
+			return False
+		return all(obj in s for obj, s in zip(item, cls.sets))
+
+	def _axes(cls):
+		"""(axes, size). An axis is (elements of a component set in a fixed
+		order, position of an element or None). Rebuilt when a component set
+		has changed."""
+		token = tuple(_version(s) for s in cls.sets)
+		cached = cls.__dict__.get('_axes_cache')
+		if cached is not None and cached[0] == token:
+			return cached[1], cached[2]
+		axes = []
+		size = 1
+		for s in cls.sets:
+			if isinstance(s, ProdMeta):
+				axes.append((s, s._position))
+				size *= len(s)
+				continue
+			if not isinstance(s, (SetMeta, BitSetMeta)):
+				raise TypeError(f"{s} is not a finite set, so {cls} cannot be enumerated.")
+			elements = list(s)
+			axes.append((elements, {x: i for i, x in enumerate(elements)}.get))
+			size *= len(elements)
+		cls._axes_cache = (token, axes, size)
+		return axes, size
+
+	def __len__(cls):
+		return cls._axes()[1]
+
+	def _digits(cls, axes, i):
+		digits = [0] * len(axes)
+		for k in range(len(axes) - 1, -1, -1):
+			i, digits[k] = divmod(i, len(axes[k][0]))
+		return digits
+
+	def __getitem__(cls, i):
+		"""The element number i."""
+		axes, size = cls._axes()
+		if i < 0:
+			i += size
+		if not 0 <= i < size:
+			raise IndexError(f"{cls} has no element number {i}.")
+		return tuple(seq[d] for (seq, _), d in zip(axes, cls._digits(axes, i)))
+
+	def _position(cls, item):
+		if not isinstance(item, tuple) or len(item) != len(cls.sets):
+			return None
+		i = 0
+		for (seq, position), obj in zip(cls._axes()[0], item):
+			d = position(obj)
+			if d is None:
+				return None
+			i = i * len(seq) + d
+		return i
+
+	def index(cls, item):
+		"""The number of the element item."""
+		i = cls._position(item)
+		if i is None:
+			raise ValueError(f"{item} is not in {cls}.")
+		return i
+
+	def contains_many(cls, items):
+		return [item in cls for item in items]
 
 	def __iter__(cls):
-		act_sets = [s._items for s in cls.sets]
-		return itertools.product(*act_sets)
+		return itertools.product(*(seq for seq, _ in cls._axes()[0]))
+
+	def iter_range(cls, start=0, stop=None):
+		"""The elements numbered start to stop - 1, in order."""
+		axes, size = cls._axes()
+		start, stop, _ = slice(start, stop).indices(size)
+		if start >= stop:
+			return
+		seqs = [seq for seq, _ in axes]
+		radices = [len(seq) for seq in seqs]
+		digits = cls._digits(axes, start)
+		current = [seq[d] for seq, d in zip(seqs, digits)]
+		for _ in range(stop - start):
+			yield tuple(current)
+			k = len(digits) - 1
+			while k >= 0:
+				digits[k] += 1
+				if digits[k] < radices[k]:
+					current[k] = seqs[k][digits[k]]
+					break
+				digits[k] = 0
+				current[k] = seqs[k][0]
+				k -= 1
+
+	def chunks(cls, size, shard=0, shards=1):
+		"""The elements in lists of at most size. With shards > 1, only the
+		chunks of shard number shard: chunk c goes to shard c % shards, so
+		each of shards workers can take its own without the others."""
+		length = len(cls)
+		for start in range(shard * size, length, shards * size):
+			yield list(cls.iter_range(start, start + size))
+
+
+def _version(s):
+	"""Changes when the finite set s does: sets here only grow."""
+	if isinstance(s, BitSetMeta):
+		return s._bits
+	if isinstance(s, ProdMeta):
+		return tuple(_version(c) for c in s.sets)
+	items = getattr(s, '_items', None)
+	return None if items is None else (id(items), len(items))
 
 class FuncMeta(type):
 	def __repr__(cls):
 		return f"{cls.__name__}:{cls.domain}->{cls.range_}"
 
+	def _new_table(cls):
+		return Memo(cls.cache_size, weak=True, name='func')
+
+	def _memoized(cls):
+		return not cls.definition or cls.cache_definition
+
+	def _image(cls, obj):
+		"""The image of obj, which is not in the table."""
+		if cls.definition:
+			return cls.definition(obj)
+		# the range counts the image as a member by its set_, without keeping it
+		return Term(cls, (obj,), set_=cls.range_)
+
+	def map(cls, objects):
+		"""[cls(obj) for obj in objects]: the inputs not in the table are
+		checked against the domain in one batch, and each distinct one is
+		applied once."""
+		objects = list(objects)
+		images = [None] * len(objects)
+		memo = cls.dict_ if cls._memoized() else None
+		pending = {} # new input -> its positions in objects
+		for i, obj in enumerate(objects):
+			positions = pending.get(obj)
+			if positions is not None:
+				positions.append(i)
+				continue
+			image = None if memo is None else memo.lookup(obj)
+			if image is None:
+				pending[obj] = [i]
+			else:
+				images[i] = image
+		new = list(pending)
+		if not cls.definition:
+			for obj, member in zip(new, cls.domain.contains_many(new)):
+				assert member, f"Input {obj} is not an element of the domain '{cls.domain}'"
+		for obj in new:
+			image = cls._image(obj)
+			for i in pending[obj]:
+				images[i] = image
+			if memo is not None:
+				memo.store(obj, image)
+		return images
+
+	def cache_info(cls):
+		"""Size, bound, hits, misses and evictions of the table."""
+		return cls.dict_.stats()
+
+	def cache_clear(cls):
+		cls.dict_ = cls._new_table()
+
 reprs = {
 	
 }
@@ -123,10 +537,23 @@ class Set(metaclass=SetMeta):
 		return obj
 
 
+class BitSet(metaclass=BitSetMeta):
+	"""A finite set stored as a bitset, for large domains. Create one with
+	createSet(name, BitSet, domain=D), D a Domain shared by the sets that are
+	combined with |, & and -."""
+	domain = None
+	_bits = 0
+	def __new__(cls, name=''):
+		obj = Object(name)
+		cls.add(obj)
+		return obj
+
+
 class Prod(metaclass=ProdMeta):
 	"""Implements Cartesian Product of sets.
 	Cartesian product is associative but not commutative.
-	Note that _items is always empty for this set, iterate over it instead.
+	It has no _items: iterate over it, or index it, instead.
+	Create one with createSet(name, Prod, sets=[A, B...]).
 	"""
 	sets = [] # list of Set subclasses.
 	def __new__(self):
@@ -135,37 +562,44 @@ class Prod(metaclass=ProdMeta):
 
 
 class Func(metaclass=FuncMeta):
-	"""f(a) = b means that f._dict[a] = b.
+	"""f(a) = b means that f.dict_[a] = b.
 	Represents an onto function.
+	Images are kept in the table dict_, a Memo of at most cache_size entries
+	(None for no bound). The images computed by a definition are only kept
+	if cache_definition is True. Without a definition, an image dropped from
+	the table is still the same Object while it is in use, and is freed once
+	it is not: a finite range_ counts the images as members but does not
+	store them, so iterating over it does not give them.
 	"""
-	dict_ = {} # should be reset for each new subclass
+	dict_ = Memo(weak=True, name='func') # should be reset for each new subclass
 	domain = None # subclass of Set. This is the set of ALL POSSIBLE inputs.
 	range_ = None # Set of ALL POSSIBLE outputs. So the function is onto.
 	definition = None
+	cache_size = None
+	cache_definition = False
 
 
 	def __new__(cls, obj):
-		if not cls.definition:
-			assert obj in cls.domain, f"Input {obj} is not an element of the domain '{cls.domain}'"
-
-			if obj in cls.dict_:
-				return cls.dict_[obj]
-
-			image = Object(f"{cls.__name__}({obj})",set_=cls.range_)
-			cls.dict_[obj] = image
-			if hasattr(cls.range_, 'add'):
-				cls.range_.add(image)
-			return image
-		else:
+		if cls.definition and not cls.cache_definition:
 			return cls.definition(obj)
+		image = cls.dict_.lookup(obj)
+		if image is None:
+			if not cls.definition:
+				assert obj in cls.domain, f"Input {obj} is not an element of the domain '{cls.domain}'"
+			image = cls._image(obj)
+			cls.dict_.store(obj, image)
+		return image
 
 
 def createSet(name, superclass=Set,**kwargs):
-	if superclass not in [Prod, Func]:
+	if isinstance(superclass, BitSetMeta):
+		assert isinstance(kwargs.get('domain'), Domain), "A BitSet needs a Domain."
+		kwargs.setdefault('_bits', 0)
+	elif superclass not in [Prod, Func]:
 		kwargs.update({'_items': set()})
 	cls = type(name, (superclass,), kwargs)
 	if superclass == Func:
-		cls.dict_ = {}
+		cls.dict_ = cls._new_table()
 	return cls
 
 
@@ -214,6 +648,14 @@ class Predicate(metaclass=Meta):
 		for arg, val in self._completed_args.items():
 			s += f"{arg}={val},"
 		return f"{self.name}({s})"
+	def _prop_key(self):
+		"""Structural key of the atom this predicate builds once all its
+		arguments are bound. Atoms with equal keys are the same Prop (see
+		propositional.Meta)."""
+		name = self.name if type(self) is Predicate else None
+		return (type(self), name, tuple(sorted(self._completed_args.items(),
+			key=lambda kv: kv[0])))
+
 	def _check_call_arguments(self,kwargs):
 		if isinstance(self.args, dict):
 			for arg in kwargs:
@@ -224,6 +666,7 @@ class Predicate(metaclass=Meta):
 						assert issubclass(kwargs[arg], self.args[arg]), f"Argument {arg} must be a {self.args[arg]}"
 					
 
+	@tracing.traced('predicate', name=lambda self, *args, **kwargs: type(self).__name__)
 	def __call__(self, axiom=False,
 		predicate=None,
 		**kwargs):
@@ -239,72 +682,36 @@ class Predicate(metaclass=Meta):
 		prop_kwargs: Dict
 			The attributes to set in the proposition class.
 		"""
-		kwargs = remove_useless_keys(kwargs, self.args)
-
-		info("A "+str(self))
-		info("B "+str(self.args))
-		info("C "+str(self._completed_args))
-		info("D "+str(kwargs))
 		if self.arity == 0:
-			self.prop_kwargs['children'] = [v for k,v in self.prop_kwargs.items()]
-			cls = type(str(self), (self._superclass,), self.prop_kwargs)
+			attrs = {k: v for k, v in self.prop_kwargs.items() if k != 'children'}
+			attrs['children'] = list(attrs.values())
+			attrs['_leaf_key'] = self._prop_key()
+			cls = type(str(self), (self._superclass,), attrs)
 			if axiom:
 				cls.__new__ = lambda _cls: object.__new__(_cls)
 			return cls # object of Prop
-		else:
-			# if you pass an already completed argument, remove it
-			keys_to_pop = set()
-			for key in kwargs:
-				if key in self._completed_args or not(key in self.args):
-					keys_to_pop.add(key)
-			for k in keys_to_pop:
-				kwargs.pop(k)
-
 
-			if all((kwargs.get(k) is None) for k in kwargs):
-				return self
+		# bind every argument given at once; already completed arguments,
+		# unknown names and None are ignored
+		bound = {key: val for key, val in kwargs.items()
+			if val is not None and key in self.args and key not in self._completed_args}
+		if not bound:
+			return self
 
-
-			# get the 'first' key in kwargs, remove the key/value
-			key = None
-			for key2 in kwargs:
-				if kwargs[key2] is not None:
-					key = key2
-					break
-			val = kwargs.pop(key)
-
-
-			if val is None:
-				return self
-
-			# add it to the completed args
-			new_completed_args = self._completed_args.copy()
-			new_completed_args[key] = val
-
-			# remove it from the args for the new predicate
-			new_args = self.args.copy()
-			new_args.pop(key)
-
-			# create a new prdicate with the same name, new completed args
-			# and new args, and pass the rest of the arguments to the call
-
-			info("E "+str(self))
-			info("F "+str(self.args))
-			info("G "+str(self._completed_args))
-			info("H "+str(kwargs))
-			next_pred = self.__class__(name=self.name,
-				args=new_args,
-				predicate=predicate,
-				prop_kwargs=self.prop_kwargs, # shouldn't change, right?
-				_completed_args=new_completed_args)
-			# If the new pred does not take any more arguments, it must be a prop
-			# or if there are still kwargs, we want to advance in the partial application
-			if len(new_args) == 0 or len(kwargs) > 0:
-				return next_pred(**kwargs,
-				axiom=axiom,
-				)
-			else:
-				return next_pred
+		new_completed_args = dict(self._completed_args, **bound)
+		new_args = {key: t for key, t in self.args.items() if key not in bound}
+
+		# create a new predicate with the same name, new completed args
+		# and new args
+		next_pred = self.__class__(name=self.name,
+			args=new_args,
+			predicate=predicate,
+			prop_kwargs=self.prop_kwargs, # shouldn't change, right?
+			_completed_args=new_completed_args)
+		# If the new pred does not take any more arguments, it must be a prop
+		if len(new_args) == 0:
+			return next_pred(axiom=axiom)
+		return next_pred
 
 class Membership(Predicate):
 	"""Defines the predicate _ ∈ _, where the left argument is 'x' and
@@ -358,6 +765,7 @@ class Quantified(Predicate):
 		else:
 			return f"{symb[self.quantifier]}_({self.predicate})"
 
+	@tracing.traced('predicate', name=lambda self, *args, **kwargs: type(self).__name__)
 	def __call__(self, *, axiom=False,
 		_class_name=None,
 		x=None, **kwargs):
@@ -381,8 +789,11 @@ class Quantified(Predicate):
 		if not(isinstance(self.predicate, Predicate)):
 			# has been completed
 			self.prop_kwargs['inner_prop'] = self.predicate
-			self.prop_kwargs['children'] = [v for k,v in self.prop_kwargs]
-			cls = type(self.__repr__(), (self._superclass,), self.prop_kwargs)
+			self.prop_kwargs['children'] = [v for k,v in self.prop_kwargs.items() if k != 'children']
+			inner = getattr(self.predicate, '_key', self.predicate)
+			cls = type(self.__repr__(), (self._superclass,),
+				dict(self.prop_kwargs, _leaf_key=('quantified', self.quantifier,
+					self._completed_args.get('x'), inner)))
 			if axiom:
 				cls.__new__ = lambda _cls: object.__new__(_cls)
 			return cls # subclass of Prop
@@ -440,8 +851,9 @@ class P_Implies(Predicate):
 		if cons_is_pred:
 			self.consequent = self.consequent(axiom=False, **kwargs)
 
-		if not (ante_is_pred or cons_is_pred):
-			self.prop_kwargs['children'] = [v for k,v in self.prop_kwargs.items()]
+		if not (isinstance(self.antecedent, Predicate) or isinstance(self.consequent, Predicate)):
+			self.prop_kwargs.update(antecedent=self.antecedent, consequent=self.consequent)
+			self.prop_kwargs['children'] = [v for k,v in self.prop_kwargs.items() if k != 'children']
 			cls = type(str(self), (Implies,),
 						self.prop_kwargs
 			)
@@ -464,7 +876,7 @@ class And_P(Predicate):
 				args.update(right_pred.args)
 		self.left_pred = left_pred # Predicate
 		self.right_pred = right_pred
-		super().__init__(name, args=args, _superclass = Implies,
+		super().__init__(name, args=args, _superclass = And,
 		prop_kwargs = {'left_prop': self.left_pred, 'right_prop': self.right_pred},
 			_completed_args=kwargs.get('_completed_args'))
 
@@ -485,8 +897,8 @@ class And_P(Predicate):
 		if (not(isinstance(self.left_pred, Predicate))
 			and not(isinstance(self.right_pred, Predicate))
 		):
-			self.prop_kwargs['children'] = [v for k,v in self.prop_kwargs.items()]
-			cls = type(str(self), (Implies,),
+			self.prop_kwargs['children'] = [v for k,v in self.prop_kwargs.items() if k != 'children']
+			cls = type(str(self), (And,),
 						self.prop_kwargs
 			)
 			if axiom:
@@ -602,42 +1014,86 @@ class Equal(OrderingOfReals):
 	def __init__(self, name, args=None, _completed_args=None, **kwargs):
 		super().__init__(name, args=args, symbol='eq', _completed_args=_completed_args)
 
+@tracing.rule
 def MembershipProof(xInA):
 	"""Given a proposition (x in A), check that x is in A and if so, produce a proof, 
 	else, throw an error.
 	I should probably call this style of proof 'Observational proof' or 'By construction'.
 	"""
 	assert xInA.x in xInA.set_, f"Element {xInA.x} not found in Set '{xInA.set_}'."
-	return _produce_a_proof(xInA)
+	return _proof_node('MembershipProof', (), xInA)
+
+@tracing.rule
+def MembershipProofs(props):
+	"""Given propositions (x in A), check them all and produce their proofs
+	(as MembershipProof does), checking the elements of each Set in one pass.
+	"""
+	props = list(props)
+	by_set = {}
+	for xInA in props:
+		by_set.setdefault(xInA.set_, []).append(xInA)
+	for set_, group in by_set.items():
+		xs = [xInA.x for xInA in group]
+		if isinstance(set_, SetMetaMeta):
+			found = set_.contains_many(xs)
+		else:
+			found = [x in set_ for x in xs]
+		for x, ok in zip(xs, found):
+			assert ok, f"Element {x} not found in Set '{set_}'."
+	return [_proof_node('MembershipProof', (), xInA) for xInA in props]
+
+def _subset_sets(A_sub_B):
+	"""(A, B) for the proposition (A ⊆ B), ie ∀x(x ∈ A -> x ∈ B)."""
+	inner = A_sub_B.inner_prop
+	return inner.antecedent.set_, inner.consequent.set_
+
+def _is_subset(A, B):
+	if isinstance(A, BitSetMeta) and isinstance(B, BitSetMeta) and A.domain is B.domain:
+		return A.issubset(B)
+	if not isinstance(A, (SetMeta, BitSetMeta)):
+		raise Exception(f"Cannot decide whether {A} ⊆ {B}: {A} is not a finite set.")
+	if isinstance(B, SetMetaMeta):
+		return all(B.contains_many(list(A)))
+	return all(x in B for x in A)
+
+@tracing.rule
+def SubsetProof(A_sub_B):
+	"""Given a proposition (A ⊆ B) where A is a finite set, check that every
+	element of A is in B and if so, produce a proof, else, throw an error.
+	Two BitSets over the same Domain are compared in one step.
+	"""
+	A, B = _subset_sets(A_sub_B)
+	assert _is_subset(A, B), f"Set '{A}' is not a subset of '{B}'."
+	return _proof_node('SubsetProof', (), A_sub_B)
 
+@tracing.rule
 def OrderingProof(x_lt_y):
 	"""
 	Given a proposition involving order such as (x < y) or (x > y), check that the
 	equality/inequality is correct and produce a proof in that case.
 	"""
-	x = x_lt_y.obj1
-	y = x_lt_y.obj2
-	try:
-		x_ = fractions.Fraction(x.name)
-		y_ = fractions.Fraction(y.name)
-	except ValueError:
+	x = x_lt_y.x
+	y = x_lt_y.y
+	x_, y_ = x.value, y.value
+	if x_ is None or y_ is None:
 		raise Exception(f'Either {x} or {y} is not a constant.')
 
 	check_relation = lambda symb: (
 		(symb == 'lt' and x_ < y_) or
-		(symb == 'le' and x_ <= y) or
+		(symb == 'le' and x_ <= y_) or
 		(symb == 'gt' and x_ > y_) or
-		(symb == 'ge' and x_ >= y) or
+		(symb == 'ge' and x_ >= y_) or
 		(symb == 'eq' and x_ == y_)
 	)
 	if check_relation(x_lt_y.order_symbol):
-		return _produce_a_proof(x_lt_y)
+		return _proof_node('OrderingProof', (), x_lt_y)
 	else:
 		raise Exception(f"Proposition {x_lt_y} cannot be proven True.")
 
 
 ####################
 # TODO
+@tracing.rule
 def ForAllModusPonens(ppforallx_Ax_imp_Bx, ppforall_x_Ax):
 	"""Given a proof of ∀x(Ax -> Bx) and a proof of ∀x(Ax) or ∃x(Ax),
 	produce a proof of ∀x(Bx) or ∃x(Bx)."""
@@ -654,7 +1110,7 @@ def ForAllModusPonens(ppforallx_Ax_imp_Bx, ppforall_x_Ax):
 	B = A_imp_B.consequent
 
 	# asserting that the consequent matches the result from Modus Ponens
-	assert str(Bx) == str(B(x,axiom=True)())
+	assert equal_type(Bx, B(x,axiom=True)())
 
 	# return the consequent with the appropriate quantifier
 	if ppforall_x_Ax.quantifier == "A":
@@ -667,19 +1123,22 @@ def ForAllModusPonens(ppforallx_Ax_imp_Bx, ppforall_x_Ax):
 
 
 
+@tracing.rule
 def UniversalResolve(ppforall_x_Ax, y: Object):
 	"""Given a proof of the proposition ( ∀x, A(x) ) and
 	a specific object y, produce a proof of the prop A(y).
 	"""
-	return _produce_a_proof(ppforall_x_Ax.predicate(y))
+	return _proof_node('UniversalResolve', (ppforall_x_Ax,), ppforall_x_Ax.predicate(y))
 
+@tracing.rule
 def ExistentialResolve(ppexists_x_Ax):
 	"""Given a proof of (∃x, A(x)), return the object (e_n) and a proof
 	of A(e_n).
 	"""
 	y = Object()
-	return y, _produce_a_proof(ppexists_x_Ax.predicate(y))
+	return y, _proof_node('ExistentialResolve', (ppexists_x_Ax,), ppexists_x_Ax.predicate(y))
 
+@tracing.rule
 def ExistentialProof(ppAy):
 	"""Given a proof of A(y), produce a proof of (∃x, A(x))"""
 	class ExistsxAx(Exists):
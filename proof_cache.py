@@ -0,0 +1,253 @@
+"""Persistent cache of proven theorems, kept in an sqlite file.
+
+A proof is stored under the fingerprint of its goal together with the
+axioms it uses, ie the axiom proofs at the leaves of the proof DAG.
+Fingerprints are structural hashes that are stable from one run to the
+next: atoms are identified by their module and name, Objects by their name
+and Set, and compound Props by their connective and parts.
+
+A proof loaded in a new process is built over new classes for its atoms.
+These are replaced by the atoms of the goal and axioms with the same
+fingerprint, and the proof is then checked (see checker.py): one that does
+not prove the goal from the axioms counts as a miss.
+
+Each axiom is also tracked by name, eg 'python_proofs.A_implies_B'. If the
+formula behind a name changes between runs, every cached proof that used
+that axiom is dropped. When the file grows past max_bytes, the least
+recently used proofs are evicted. The file is in incremental auto_vacuum
+mode, so the pages they free are given back and the file shrinks.
+"""
+import hashlib
+import sqlite3
+import time
+
+from propositional import Meta, ProofNode, _connective, _children
+from predicate import Object, Term
+from checker import ProofChecker
+import serialize
+import tracing
+
+
+def _stable(value):
+	"""A description of value that does not depend on ids or hash seeds."""
+	if isinstance(value, Meta):
+		return fingerprint(value)
+	if isinstance(value, Term):
+		return ('term', _stable(value.op), _stable(value.args), _stable(value.set_))
+	if isinstance(value, Object):
+		return ('obj', value.name, _stable(value.set_))
+	if isinstance(value, type):
+		return f"{value.__module__}.{value.__qualname__}"
+	if isinstance(value, (tuple, list)):
+		return tuple(_stable(v) for v in value)
+	if value is None or isinstance(value, (bool, int, float, str)):
+		return value
+	return repr(value)
+
+
+def fingerprint(P):
+	"""Structural fingerprint (hex digest) of the Prop P. Cached on the class."""
+	if '_fingerprint' in P.__dict__:
+		return P._fingerprint
+	stack = [P]
+	while stack:
+		Q = stack[-1]
+		if '_fingerprint' in Q.__dict__:
+			stack.pop()
+			continue
+		base = _connective(Q)
+		children = _children(Q)
+		if children:
+			pending = [c for c in children if '_fingerprint' not in c.__dict__]
+			if pending:
+				stack += pending
+				continue
+			desc = (base.__name__,) + tuple(c._fingerprint for c in children)
+		elif '_leaf_key' in Q.__dict__:
+			desc = ('atom', _stable(Q._leaf_key))
+		else:
+			desc = ('atom', Q.__module__, Q.__qualname__)
+		stack.pop()
+		Q._fingerprint = hashlib.sha1(repr(desc).encode()).hexdigest()
+	return P._fingerprint
+
+
+def axiom_name(pp):
+	"""The name an axiom proof is tracked by: where its Prop was defined, or
+	for formulas built with Implies.of (or axioms made from them, eg by
+	Not(A, is_true=True)) and predicate atoms, the formula itself."""
+	P = pp.__class__
+	if P._key is P or P._key in P.__bases__ or '_leaf_key' in P.__dict__:
+		return fingerprint(P)
+	return f"{P.__module__}.{P.__qualname__}"
+
+
+def axioms_used(proof):
+	"""The axiom proofs at the leaves of proof."""
+	found = {}
+	stack = [proof]
+	seen = set()
+	while stack:
+		pp = stack.pop()
+		if id(pp) in seen:
+			continue
+		seen.add(id(pp))
+		if type(pp) is ProofNode:
+			stack += pp.premises
+		else:
+			found[id(pp)] = pp
+	return list(found.values())
+
+
+def atoms(props):
+	"""{fingerprint: Prop} for the Props in props and their parts that are
+	not compound, eg atoms and predicate instances."""
+	found = {}
+	stack = list(props)
+	seen = set()
+	while stack:
+		P = stack.pop()
+		if id(P) in seen:
+			continue
+		seen.add(id(P))
+		children = _children(P)
+		if children:
+			stack += children
+		else:
+			found[fingerprint(P)] = P
+	return found
+
+
+class ProofCache:
+	"""A persistent cache of proofs in the sqlite database at path, whose file
+	is kept to at most max_bytes by evicting the least recently used proofs."""
+	def __init__(self, path, max_bytes=64 * 2 ** 20):
+		self.path = path
+		self.max_bytes = max_bytes
+		self.hits = 0
+		self.misses = 0
+		self.db = sqlite3.connect(path)
+		if self.db.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+			# only takes effect on an empty file, or after a VACUUM
+			self.db.execute('PRAGMA auto_vacuum = INCREMENTAL')
+			self.db.execute('VACUUM')
+		self.db.executescript('''
+			CREATE TABLE IF NOT EXISTS proofs (
+				id INTEGER PRIMARY KEY,
+				goal TEXT NOT NULL,
+				data BLOB NOT NULL,
+				size INTEGER NOT NULL,
+				last_used REAL NOT NULL
+			);
+			CREATE INDEX IF NOT EXISTS proofs_goal ON proofs (goal);
+			CREATE INDEX IF NOT EXISTS proofs_last_used ON proofs (last_used);
+			CREATE TABLE IF NOT EXISTS deps (
+				proof INTEGER NOT NULL REFERENCES proofs (id) ON DELETE CASCADE,
+				axiom TEXT NOT NULL,
+				fingerprint TEXT NOT NULL
+			);
+			CREATE INDEX IF NOT EXISTS deps_proof ON deps (proof);
+			CREATE INDEX IF NOT EXISTS deps_axiom ON deps (axiom);
+			CREATE TABLE IF NOT EXISTS axioms (
+				name TEXT PRIMARY KEY,
+				fingerprint TEXT NOT NULL
+			);
+		''')
+		self.db.execute('PRAGMA foreign_keys = ON')
+
+	def close(self):
+		self.db.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+
+	def sync_axioms(self, axioms):
+		"""Record the current formula of each axiom, dropping the cached proofs
+		that relied on an older formula with the same name."""
+		stored = dict(self.db.execute('SELECT name, fingerprint FROM axioms'))
+		with self.db:
+			for pp in axioms:
+				name, fp = axiom_name(pp), fingerprint(pp.__class__)
+				if stored.get(name) == fp:
+					continue
+				stored[name] = fp
+				self.db.execute('''DELETE FROM proofs WHERE id IN
+					(SELECT proof FROM deps WHERE axiom = ? AND fingerprint != ?)''', (name, fp))
+				self.db.execute('INSERT OR REPLACE INTO axioms VALUES (?, ?)', (name, fp))
+
+	def get(self, goal, axioms):
+		"""A cached proof of goal that only uses axioms in axioms, and checks,
+		or None."""
+		self.sync_axioms(axioms)
+		available = {fingerprint(pp.__class__) for pp in axioms}
+		rows = self.db.execute('SELECT id, data FROM proofs WHERE goal = ? ORDER BY last_used DESC',
+			(fingerprint(goal),)).fetchall()
+		known = None
+		for proof_id, data in rows:
+			deps = self.db.execute('SELECT fingerprint FROM deps WHERE proof = ?', (proof_id,))
+			if not all(fp in available for (fp,) in deps):
+				continue
+			if known is None:
+				known = atoms([goal] + [pp.__class__ for pp in axioms])
+			proof = serialize.loads(data, lambda P: known.get(fingerprint(P), P))
+			if proof.__class__._key is not goal._key or ProofChecker(axioms).check(proof) is not True:
+				continue
+			with self.db:
+				self.db.execute('UPDATE proofs SET last_used = ? WHERE id = ?',
+					(time.time(), proof_id))
+			self.hits += 1
+			tracing.count('proof_cache_hits')
+			return proof
+		self.misses += 1
+		tracing.count('proof_cache_misses')
+		return None
+
+	def put(self, goal, proof):
+		"""Store proof, a proof of goal."""
+		data = serialize.dumps(proof)
+		with self.db:
+			cursor = self.db.execute('INSERT INTO proofs (goal, data, size, last_used) VALUES (?, ?, ?, ?)',
+				(fingerprint(goal), data, len(data), time.time()))
+			proof_id = cursor.lastrowid
+			self.db.executemany('INSERT INTO deps VALUES (?, ?, ?)',
+				[(proof_id, axiom_name(pp), fingerprint(pp.__class__)) for pp in axioms_used(proof)])
+		self._evict()
+
+	def prove(self, goal, axioms, prover):
+		"""Return a cached proof of goal from axioms, or call
+		prover(axioms, goal) and cache what it returns."""
+		proof = self.get(goal, axioms)
+		if proof is None:
+			proof = prover(axioms, goal)
+			if proof is not None:
+				self.put(goal, proof)
+		return proof
+
+	def size(self):
+		"""The size of the database file, in bytes."""
+		page_count = self.db.execute('PRAGMA page_count').fetchone()[0]
+		return page_count * self.db.execute('PRAGMA page_size').fetchone()[0]
+
+	def _evict(self):
+		if self.size() <= self.max_bytes:
+			return
+		ids = [proof_id for (proof_id,) in
+			self.db.execute('SELECT id FROM proofs ORDER BY last_used').fetchall()]
+		for proof_id in ids:
+			with self.db:
+				self.db.execute('DELETE FROM proofs WHERE id = ?', (proof_id,))
+			# executescript steps the pragma to the end, which frees every free page
+			self.db.executescript('PRAGMA incremental_vacuum')
+			if self.size() <= self.max_bytes:
+				break
+
+	def stats(self):
+		"""Hits and misses, the number of proofs, the size of the file and of
+		the serialized proofs in it, in bytes."""
+		count, payload = self.db.execute(
+			'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM proofs').fetchone()
+		return {'hits': self.hits, 'misses': self.misses, 'proofs': count, 'bytes': self.size(),
+			'payload_bytes': payload}
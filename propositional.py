@@ -1,22 +1,48 @@
 # https://en.wikipedia.org/wiki/Propositional_calculus#Basic_and_derived_argument_forms
 # proofs are objects
 # others (Propositions ie (A or B), (C and D) etc, Prop) are classes
+import weakref
+
+import tracing
+
 "∈∃∀⊆×∧∨"
+# compound props (Implies, And, Or, Equiv) are rendered from their structure,
+# see render(). These are for atoms, picked by class name.
 reprs = {
-	"implies": (lambda cls: f"Implies({cls.antecedent}, {cls.consequent})"),
-	"and": (lambda cls: f"And({cls.left_prop}, {cls.right_prop})"),
 	"forall": (lambda cls: f"∀{cls.obj}, {cls.prop_about_obj}"),
 	"exists": (lambda cls: f"∃{cls.obj}, {cls.prop_about_obj}"),
-	"not": (lambda cls: f"Implies({cls.antecedent}, _False)"),
-	"or": (lambda cls: f"Or({cls.left_prop}, {cls.right_prop})"),
 }
 
 class Meta(type):
+	"""Metaclass of every Prop.
+	When a Prop class is created, Meta gives it two precomputed attributes:
+	_key: the canonical class with the same structure. Two Props are the
+		same formula exactly when their _key is the same object.
+	_hash: a structural hash, consistent with _key.
+	"""
+	def __init__(cls, name, bases, ns, **kwargs):
+		super().__init__(name, bases, ns, **kwargs)
+		if tracing._tracer is not None:
+			tracing._tracer.count('props_created')
+		if '_key' in ns:
+			# canonical class being built by _intern_prop, which fills these in
+			return
+		if '_leaf_key' in ns:
+			# atom built by a predicate: equal arguments give the same atom
+			cls._key = _interned.get(('atom', ns['_leaf_key']), lambda: cls)
+			cls._hash = hash(ns['_leaf_key'])
+			return
+		base = _connective(cls)
+		children = _children(cls)
+		if children:
+			cls._key = _intern_prop(base, *children)
+			cls._hash = cls._key._hash
+		else:
+			cls._key = cls
+			cls._hash = hash(cls)
+
 	def __repr__(cls):
-		for key in reprs:
-			if key in cls.__name__.lower():
-				return reprs[key](cls)
-		return cls.__name__
+		return render(cls)
 
 
 
@@ -24,6 +50,147 @@ def default_new(cls):
 	raise Exception(f"Proposition '{cls}' is not an axiom. Try making this proposition True in the class definition.")
 
 
+class InternTable:
+	"""Hash-consing table for compound propositions.
+	Maps (connective, left, right) to the one Prop class with that structure,
+	so building Not(A) a million times creates a single class.
+	Classes are held weakly: once no formula or proof refers to one, it is evicted.
+	"""
+	def __init__(self):
+		self._table = weakref.WeakValueDictionary()
+		self.hits = 0
+		self.misses = 0
+
+	def __len__(self):
+		return len(self._table)
+
+	def get(self, key, make):
+		"""Return the class stored under key, calling make() to create it on a miss."""
+		cls = self._table.get(key)
+		if cls is not None:
+			self.hits += 1
+			if tracing._tracer is not None:
+				tracing._tracer.count('intern_hits')
+			return cls
+		self.misses += 1
+		cls = make()
+		self._table[key] = cls
+		return cls
+
+	def find(self, key):
+		"""The class stored under key, or None. Never creates one."""
+		return self._table.get(key)
+
+	def stats(self):
+		return {'hits': self.hits, 'misses': self.misses, 'size': len(self._table)}
+
+	def clear(self):
+		self._table.clear()
+		self.hits = 0
+		self.misses = 0
+
+_interned = InternTable()
+
+def intern_stats():
+	"""Hit/miss counters and current size of the proposition table."""
+	return _interned.stats()
+
+def _connective(cls):
+	"""The base class (Prop, Implies, And...) that defines the children of cls."""
+	for klass in cls.__mro__:
+		if '_child_attrs' in klass.__dict__:
+			return klass
+
+def _children(P):
+	"""The sub-Props of P, eg (A, B) for (A -> B), if P is a compound formula
+	(or a subclass of one), else ()."""
+	children = tuple(getattr(P, attr) for attr in _connective(P)._child_attrs)
+	if children and all(isinstance(c, Meta) for c in children):
+		return children
+	return ()
+
+def _is_compound(P, base=None):
+	"""Whether P is a compound formula, whose connective is base if given."""
+	return bool(_children(P)) and (base is None or _connective(P) is base)
+
+def _intern_prop(base, left, right):
+	"""Return the canonical subclass of base whose children are (left, right)."""
+	left, right = left._key, right._key
+	key = (base, left, right)
+	return _interned.get(key, lambda: _make_canonical(base, left, right))
+
+def _find_prop(base, left, right):
+	"""The canonical subclass of base with children (left, right) if one
+	exists, else None. Useful to test membership without building formulas."""
+	return _interned.find((base, left._key, right._key))
+
+def _make_canonical(base, left, right):
+	left_attr, right_attr = base._child_attrs
+	cls = Meta(base.__name__, (base,), {
+		left_attr: left,
+		right_attr: right,
+		'_key': None,
+	})
+	cls._key = cls
+	cls._hash = hash((base.__name__, left._hash, right._hash))
+	return cls
+
+def _leaf_repr(cls):
+	for key in reprs:
+		if key in cls.__name__.lower():
+			return reprs[key](cls)
+	return cls.__name__
+
+def _render_parts(cls):
+	"""Yield the pieces of the rendering of cls, left to right.
+	Walks the formula with an explicit stack, so depth is not limited by
+	the recursion limit, and reuses the cached rendering of any sub-Prop."""
+	stack = [cls]
+	while stack:
+		item = stack.pop()
+		if isinstance(item, str):
+			yield item
+			continue
+		cached = item.__dict__.get('_rendered')
+		if cached is not None:
+			yield cached
+			continue
+		base = _connective(item)
+		children = _children(item)
+		if children:
+			left, right = children
+			stack += [")", right, ", ", left, f"{base.__name__}("]
+		else:
+			yield _leaf_repr(item)
+
+def render(cls):
+	"""Render the Prop cls as a string. The result is cached on the class."""
+	cached = cls.__dict__.get('_rendered')
+	if cached is None:
+		cached = ''.join(_render_parts(cls))
+		cls._rendered = cached
+	return cached
+
+def render_to(cls, out, chunk_size=1 << 16):
+	"""Write the rendering of the Prop cls to the file-like out, in chunks of
+	about chunk_size characters, without building the whole string."""
+	buf = []
+	size = 0
+	for part in _render_parts(cls):
+		buf.append(part)
+		size += len(part)
+		if size >= chunk_size:
+			out.write(''.join(buf))
+			buf = []
+			size = 0
+	if buf:
+		out.write(''.join(buf))
+
+def same_prop(A, B):
+	"""Whether the Props A and B are the same formula. O(1)."""
+	return A._key is B._key
+
+
 # (not X) is defined as (X -> _False)
 
 class Prop(metaclass=Meta):
@@ -31,24 +198,87 @@ class Prop(metaclass=Meta):
 	predicate = None # If the proposition was from a predicate, this is the predicate
 	children = [] # everything that makes up the prop ie objects and other props
 	# a basic prop will have only objects in its children
+	_child_attrs = () # names of the sub-Props of a compound prop, see Meta
 	def __new__(cls):
 		default_new(cls)
 	def __repr__(self):
 		"""If an object is created, it will be a proof."""
 		return f"Proof({self.__class__})"
 
+	def __reduce__(self):
+		return (_produce_a_proof, (self.__class__,))
+
 def _produce_a_proof(cls):
+	"""Create a proof (instance) of cls without touching cls.__new__,
+	so shared interned classes never become axioms by accident."""
 	if issubclass(cls, Prop):
-		# Need to copy the class, set andreset the new attr
-		type_A = cls
-		type_A.__new__ = lambda cls : object.__new__(cls)
-		obj = type_A()
-		cls.__new__ = default_new
-		return obj
+		return object.__new__(cls)
 	else:
 		pass
 		# cls was a predicate instead
 
+
+# Fields that older code reads off proofs built by a rule, eg proof_left
+# on a Conjunction. Anything else is looked up on the conclusion.
+_proof_fields = {
+	'Conjunction': {
+		'proof_left': lambda node: node.premises[0],
+		'proof_right': lambda node: node.premises[1],
+	},
+	'CommuteAnd': {
+		'proof_left': lambda node: node.premises[0].proof_right,
+		'proof_right': lambda node: node.premises[0].proof_left,
+	},
+	'EquivIntro': {
+		'proof_right_imp': lambda node: node.premises[0],
+		'proof_left_imp': lambda node: node.premises[1],
+		'right_imp': lambda node: node.premises[0].__class__,
+		'left_imp': lambda node: node.premises[1].__class__,
+	},
+}
+
+class ProofNode:
+	"""A proof step: rule applied to premises (proofs) gives conclusion (a Prop).
+	Proofs built by the rules are a DAG of these nodes. Axioms, ie instances
+	of Prop classes, are its leaves.
+
+	A node stands in for an instance of its conclusion: node.__class__ is the
+	conclusion, so isinstance(node, Implies) and node.antecedent work as before.
+	"""
+	__slots__ = ('rule', 'premises', 'conclusion', '__weakref__')
+
+	def __init__(self, rule, premises, conclusion):
+		self.rule = rule
+		self.premises = premises
+		self.conclusion = conclusion
+
+	@property
+	def __class__(self):
+		return self.conclusion
+
+	def __getattr__(self, name):
+		fields = _proof_fields.get(self.rule)
+		if fields is not None and name in fields:
+			return fields[name](self)
+		return getattr(self.conclusion, name)
+
+	def __repr__(self):
+		return self.conclusion.__repr__(self)
+
+_proof_nodes = weakref.WeakValueDictionary()
+
+def _proof_node(rule, premises, conclusion):
+	"""Return the node for (rule, premises, conclusion), shared with any
+	identical proof step that is still alive."""
+	key = (rule, premises, conclusion)
+	node = _proof_nodes.get(key)
+	if node is None:
+		node = ProofNode(rule, premises, conclusion)
+		_proof_nodes[key] = node
+	elif tracing._tracer is not None:
+		tracing._tracer.count('proof_node_hits')
+	return node
+
 # The contradiction
 class _False(Prop):
 	"""Element of Prop. The contradiction."""
@@ -60,6 +290,12 @@ class Implies(Prop, metaclass=Meta):
 	Given p1: Prop and p2: Prop, construct the proposition (p1 -> p2): Prop"""
 	antecedent = None # will be set by subclass ie the proposition
 	consequent = None # will be set by subclass ie the proposition
+	_child_attrs = ('antecedent', 'consequent')
+
+	@classmethod
+	def of(cls, A, B):
+		"""Given A: Prop and B: Prop, return the (shared) proposition (A -> B)."""
+		return _intern_prop(Implies, A, B)
 
 	def __repr__(self):
 		"""If an object is created, it will be a proof."""
@@ -72,24 +308,24 @@ class And(Prop):
 
 	left_prop = None
 	right_prop = None
+	_child_attrs = ('left_prop', 'right_prop')
+
+	@classmethod
+	def of(cls, A, B):
+		"""Given A: Prop and B: Prop, return the (shared) proposition (A and B)."""
+		return _intern_prop(And, A, B)
 
 	def __repr__(self):
 		"""If an object is created, it will be a proof."""
 		return f"ProofOfAnd({self.left_prop}, {self.right_prop})"
 
+@tracing.rule
 def Conjunction(ppa, ppb):
 	""" Given ppa which is a proof of A, and ppb which is
 	a proof of b, construct a proof of (A and B)
 	"""
-	class A_and_B(And):
-		left_prop = ppa.__class__
-		right_prop = ppb.__class__
-		proof_left = ppa
-		proof_right = ppb
-	
-		def __new__(cls):
-			return object.__new__(cls)
-	return A_and_B()
+	return _proof_node('Conjunction', (ppa, ppb),
+		And.of(ppa.__class__, ppb.__class__))
 
 class Or(Prop):
 	"""
@@ -98,22 +334,23 @@ class Or(Prop):
 
 	left_prop = None
 	right_prop = None
+	_child_attrs = ('left_prop', 'right_prop')
+
+	@classmethod
+	def of(cls, A, B):
+		"""Given A: Prop and B: Prop, return the (shared) proposition (A or B)."""
+		return _intern_prop(Or, A, B)
 
 	def __repr__(self):
 		"""If an object is created, it will be a proof."""
 		return f"ProofOfOr({self.left_prop}, {self.right_prop})"
 
 
+@tracing.rule
 def Disjunction(ppa, B):
 	""" Given ppa which is a proof of A, and B: Prop, construct a proof of (A or B).
 	"""
-	class A_or_B(Or):
-		left_prop = ppa.__class__
-		right_prop = B
-
-		def __new__(cls):
-			return object.__new__(cls)
-	return A_or_B()
+	return _proof_node('Disjunction', (ppa,), Or.of(ppa.__class__, B))
 
 
 def Not(A, is_true=False):
@@ -122,137 +359,118 @@ def Not(A, is_true=False):
 	If A is a negation, return the antecedent.
 
 	If is_true, then axiom (not A) exists (ie A is False). Otherwise, simply returns the contingent proposition.
+	The axiom is a subclass of the shared (A -> _False), with the same _key, so
+	the shared class itself never becomes an axiom. It is interned too: every
+	call gives the same axiom class while it is in use.
 	"""
 	if issubclass(A, Implies):
 		if A.consequent == _False:
 			return A.antecedent
 
-	class Not_A(Implies):
-		antecedent = A
-		consequent = _False
-
-		if is_true:
-			def __new__(cls):
-				return object.__new__(cls)
+	Not_A = Implies.of(A, _False)
+	if is_true:
+		return _interned.get(('axiom', Not_A), lambda: Meta(Not_A.__name__, (Not_A,), {
+			'_key': Not_A,
+			'_hash': Not_A._hash,
+			'__new__': lambda cls: object.__new__(cls),
+		}))
 	return Not_A
 
 class Equiv(Prop):
 	"""Subset of Prop. Given two Props A and B, produce a prop of the form A <-> B."""
 	left_prop = None
 	right_prop = None
+	_child_attrs = ('left_prop', 'right_prop')
+
+	@classmethod
+	def of(cls, A, B):
+		"""Given A: Prop and B: Prop, return the (shared) proposition (A <-> B)."""
+		return _intern_prop(Equiv, A, B)
 
 	# def __repr__(self):
 	# 	"""If an object is created, it will be a proof."""
 	# 	return f"ProofOfEquiv({self.left_prop}, {self.right_prop})"
 
+@tracing.rule
 def EquivIntro(ppa_imp_b, ppb_imp_a):
 	"""Given a proof of (A -> B) and one of (B -> A), produce a proof of 
 	A <-> B.
 	left_imp is the proposition (B -> A), while right_imp is (A -> B).
 	"""
-	class A_is_B(Equiv):
-		left_prop = ppa_imp_b.antecedent
-		right_prop = ppa_imp_b.consequent
-		left_imp = ppb_imp_a.__class__
-		right_imp = ppa_imp_b.__class__
-
-		proof_left_imp = ppb_imp_a
-		proof_right_imp = ppa_imp_b
-	
-		def __new__(cls):
-			return object.__new__(cls)
-	return A_is_B()
+	return _proof_node('EquivIntro', (ppa_imp_b, ppb_imp_a),
+		Equiv.of(ppa_imp_b.antecedent, ppa_imp_b.consequent))
 
 
+@tracing.rule
 def CommuteOr(ppa_or_b):
 	"""Given a proof of (A or B), construct a proof of (B or A)."""
 	assert isinstance(ppa_or_b, Or)
 
-	class B_or_A(Or):
-		left_prop = ppa_or_b.right_prop
-		right_prop = ppa_or_b.left_prop
-
-		def __new__(cls):
-			return object.__new__(cls)
-	return B_or_A()
+	return _proof_node('CommuteOr', (ppa_or_b,),
+		Or.of(ppa_or_b.right_prop, ppa_or_b.left_prop))
 
+@tracing.rule
 def CommuteAnd(ppa_and_b):
 	"""Given a proof of (A and B), construct a proof of (B and A)."""
-	class B_and_A(And):
-		left_prop = ppa_and_b.right_prop
-		right_prop = ppa_and_b.left_prop
-
-		proof_left = ppa_and_b.proof_right
-		proof_right = ppa_and_b.proof_left
-
-		def __new__(cls):
-			return object.__new__(cls)
-	return B_and_A()
+	return _proof_node('CommuteAnd', (ppa_and_b,),
+		And.of(ppa_and_b.right_prop, ppa_and_b.left_prop))
 
 
+@tracing.rule
 def ModusPonens(ppa_imp_b, ppa):
 	"""Given ppa_imp_b which is a proof of (A -> B) and ppa which is
 	a proof of A, generate a proof of B
 	"""
-	assert (f"ProofOfImplies({ppa_imp_b.antecedent}, {ppa_imp_b.consequent})" == str(ppa_imp_b)
+	assert (isinstance(ppa_imp_b, Implies)
 		and
-		str(ppa_imp_b.antecedent) == str(type(ppa))
+		ppa_imp_b.antecedent._key is ppa.__class__._key
 		)
-	return _produce_a_proof(ppa_imp_b.consequent)
+	return _proof_node('ModusPonens', (ppa_imp_b, ppa), ppa_imp_b.consequent)
 
+@tracing.rule
 def HypSyll(ppa_imp_b, ppb_imp_c):
 	"""Given ppa_imp_b, a proof of (A -> B) and ppb_imp_c, a proof of
 	(B -> C), construct a proof of (A -> C).
 	"""
-	assert str(ppa_imp_b.consequent) == str(ppb_imp_c.antecedent)
+	assert ppa_imp_b.consequent._key is ppb_imp_c.antecedent._key
 
-	class A_implies_C(Implies):
-		antecedent = ppa_imp_b.antecedent
-		consequent = ppb_imp_c.consequent
-	
-		def __new__(cls):
-			return object.__new__(cls)
-	return A_implies_C()
+	return _proof_node('HypSyll', (ppa_imp_b, ppb_imp_c),
+		Implies.of(ppa_imp_b.antecedent, ppb_imp_c.consequent))
 
+@tracing.rule
 def ModusTollens(ppa_imp_b, pp_not_b):
 	"""Given ppa_imp_b which is a proof of (A -> B) and pp_not_b which is
 	a proof of (not B), generate a proof of (not A)
 	"""
 	return HypSyll(ppa_imp_b, pp_not_b)
 
+@tracing.rule
 def Contradiction(ppa, pp_not_a):
 	"""Given a proof of A and a proof of (not A)(which is the same as A -> _False),
 	produce a proof of _False."""
 	return ModusPonens(pp_not_a, ppa)
 
+@tracing.rule
 def ImplicationToOr(ppa_imp_b):
 	"""Given a proof of (A -> B), construct a proof of (not A or B)"""
 	Not_A = Not(ppa_imp_b.antecedent)
-	class Not_A_or_B(Or):
-		left_prop = Not_A
-		right_prop = ppa_imp_b.consequent
-
-		def __new__(cls):
-			return object.__new__(cls)
-	return Not_A_or_B()
+	return _proof_node('ImplicationToOr', (ppa_imp_b,),
+		Or.of(Not_A, ppa_imp_b.consequent))
 
+@tracing.rule
 def OrToImplication(ppa_or_b):
 	"""Given a proof of (A or B), construct a proof of (not A -> B)."""
 	Not_A = Not(ppa_or_b.left_prop)
-	class Not_A_implies_B(Or):
-		antecedent = Not_A
-		consequent = ppa_or_b.right_prop
-
-		def __new__(cls):
-			return object.__new__(cls)
-	return Not_A_implies_B()
+	return _proof_node('OrToImplication', (ppa_or_b,),
+		Implies.of(Not_A, ppa_or_b.right_prop))
 
 
 
+@tracing.rule
 def Explosion(ppfalse, A):
 	"""Principle of explosion. Given a proof of _False, return a proof of A: Prop."""
-	assert str(ppfalse) == "ProofOf_False"
-	return _produce_a_proof(A)
+	assert ppfalse.__class__._key is _False
+	return _proof_node('Explosion', (ppfalse,), A)
 
 
 
@@ -261,6 +479,7 @@ def Explosion(ppfalse, A):
 
 
 def equal_type(pp1, pp2):
-	return pp1.__repr__() == pp2.__repr__()
+	"""Whether pp1 and pp2 are proofs of the same proposition."""
+	return pp1.__class__._key is pp2.__class__._key
 
 
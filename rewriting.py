@@ -0,0 +1,199 @@
+"""Normal forms of arithmetic terms.
+
+A term built from Objects with + and - (see Term) is a sum of atoms, with
+integer coefficients, plus a constant. Atoms are the Objects that are not
+constants, eg variables, and the function applications f(a), whose
+arguments are normalized in turn. The normal form lists the atoms with a
+positive coefficient, in a fixed order, then the constant, then the atoms
+with a negative coefficient:
+
+	(x + 0) - x       ->  0/1
+	f(c) - f(c)       ->  0/1
+	(y - x) + (x + 1) ->  y + 1/1
+
+Since terms are hash-consed, two terms are equal after normalization if
+their normal forms are the same Object. A Rewriter remembers the normal
+form of each term it normalized, so asking again costs one lookup.
+"""
+import fractions
+
+from propositional import _proof_node
+from predicate import Object, Term
+from memo import Memo
+from sets import Q
+import tracing
+
+_sums = ('+', '-')
+
+
+class Rewriter:
+	"""Normalizes terms, keeping the normal forms of at most maxsize terms."""
+	def __init__(self, maxsize=2 ** 16):
+		self.memo = Memo(maxsize, name='normal_form')
+
+	def linear_form(self, t, found=None):
+		"""({atom: coefficient}, constant) for the term t. Each distinct
+		subterm is visited once, however often it is shared. found maps
+		arguments of the function applications in t to their normal forms,
+		if known already."""
+		# parents of each sum reachable from t, so that a sum is expanded
+		# once all the multiples of it are known
+		parents = {t: 0}
+		stack = [t]
+		while stack:
+			u = stack.pop()
+			if isinstance(u, Term) and u.op in _sums:
+				for a in u.args:
+					if a in parents:
+						parents[a] += 1
+					else:
+						parents[a] = 1
+						stack.append(a)
+		multiple = {t: 1}
+		coefficients = {}
+		constant = fractions.Fraction(0)
+		ready = [t]
+		while ready:
+			u = ready.pop()
+			m = multiple.pop(u)
+			if isinstance(u, Term) and u.op in _sums:
+				left, right = u.args
+				for a, sign in ((left, 1), (right, 1 if u.op == '+' else -1)):
+					multiple[a] = multiple.get(a, 0) + sign * m
+					parents[a] -= 1
+					if parents[a] == 0:
+						ready.append(a)
+				continue
+			if m == 0:
+				continue
+			value = u.value
+			if value is not None:
+				constant += m * value
+				continue
+			atom = self._atom(u, found)
+			coefficients[atom] = coefficients.get(atom, 0) + m
+		return {a: k for a, k in coefficients.items() if k}, constant
+
+	def _atom(self, u, found=None):
+		if isinstance(u, Term):
+			# f(a), with a normalized
+			if found is not None:
+				return Term(u.op, tuple(found[a] for a in u.args), u.set_)
+			return Term(u.op, tuple(self.normalize(a) for a in u.args), u.set_)
+		return u
+
+	def _arguments(self, t):
+		"""The arguments of the function applications in the sum t."""
+		seen = set()
+		stack = [t]
+		while stack:
+			u = stack.pop()
+			if u in seen or not isinstance(u, Term):
+				continue
+			seen.add(u)
+			if u.op in _sums:
+				stack += u.args
+			else:
+				yield from u.args
+
+	def normalize(self, t):
+		"""The normal form of t."""
+		normal = self.memo.lookup(t)
+		if normal is not None:
+			return normal
+		# the arguments of f(...) are normalized before it, in post-order
+		# with a stack, so deep terms such as f(f(...f(x))) do not recurse
+		found = {}
+		stack = [t]
+		while stack:
+			u = stack[-1]
+			if u in found:
+				stack.pop()
+				continue
+			normal = self.memo.lookup(u) if u is not t else None
+			if normal is None:
+				pending = [a for a in self._arguments(u) if a not in found]
+				if pending:
+					stack += pending
+					continue
+				normal = self._normal_form(u, found)
+			found[u] = normal
+			stack.pop()
+		return found[t]
+
+	def _normal_form(self, t, found):
+		"""The normal form of t, given those of its arguments in found."""
+		if not isinstance(t, Term):
+			value = t.value
+			normal = t if value is None else Object.constant(value, set_=Q)
+		else:
+			normal = build(*self.linear_form(t, found))
+			self.memo.store(normal, normal)
+		self.memo.store(t, normal)
+		return normal
+
+	def equal(self, a, b):
+		"""Whether a and b are equal as sums."""
+		return self.normalize(a) is self.normalize(b)
+
+	def difference(self, a, b):
+		"""a - b if that is a constant after normalization (a Fraction), else None."""
+		return self.normalize(Term('-', (a, b), Q)).value
+
+
+def build(coefficients, constant):
+	"""The normal form of the sum of coefficient * atom and constant.
+	Constants are folded as Q.__add__ does, to Object.constant(value)."""
+	order = sorted(coefficients, key=lambda atom: atom._id)
+	positive = [a for a in order for _ in range(coefficients[a])]
+	negative = [a for a in order for _ in range(-coefficients[a])]
+	if positive:
+		t = positive[0]
+		for atom in positive[1:]:
+			t = Term('+', (t, atom), Q)
+		if constant > 0:
+			t = Term('+', (t, Object.constant(constant, set_=Q)), Q)
+		elif constant < 0:
+			t = Term('-', (t, Object.constant(-constant, set_=Q)), Q)
+	else:
+		t = Object.constant(constant, set_=Q)
+	for atom in negative:
+		t = Term('-', (t, atom), Q)
+	return t
+
+
+_rewriter = Rewriter()
+
+
+def normalize(t):
+	return _rewriter.normalize(t)
+
+
+def equal(a, b):
+	return _rewriter.equal(a, b)
+
+
+def linear_form(t):
+	return _rewriter.linear_form(t)
+
+
+_orders = {'lt': lambda d: d < 0, 'le': lambda d: d <= 0, 'gt': lambda d: d > 0,
+	'ge': lambda d: d >= 0, 'eq': lambda d: d == 0}
+
+
+def holds_by_normalization(x_lt_y):
+	"""Whether the ordering x_lt_y (eg x < y) holds because x - y normalizes
+	to a constant of the right sign."""
+	d = _rewriter.difference(x_lt_y.x, x_lt_y.y)
+	return d is not None and _orders[x_lt_y.order_symbol](d)
+
+
+@tracing.rule
+def NormalizationProof(x_lt_y):
+	"""Given an ordering such as (x < y) or (x = y), where x - y normalizes
+	to a constant, eg (x + 1 > x) or (f(c) - f(c) = 0), check it and
+	produce a proof, else, throw an error.
+	"""
+	if not holds_by_normalization(x_lt_y):
+		raise Exception(f"Proposition {x_lt_y} cannot be proven True by normalization.")
+	return _proof_node('NormalizationProof', (), x_lt_y)
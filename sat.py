@@ -0,0 +1,414 @@
+"""Propositional entailment by SAT solving.
+
+A set of axiom Props entails a goal exactly when (axioms and not goal) is
+unsatisfiable. Props are turned into clauses with the Tseitin encoding
+(one fresh variable per distinct subformula) and handed to a small
+conflict-driven clause-learning solver:
+- two watched literals per clause for unit propagation,
+- first-UIP conflict analysis with clause learning and backjumping,
+- VSIDS branching (bump variables seen in conflicts, decay the rest),
+  with phase saving,
+- restarts following the Luby sequence.
+
+Literals are non-zero ints: v is variable v being true, -v being false.
+"""
+from heapq import heappush, heappop, heapify
+
+from propositional import Implies, And, Or, _False, _connective, _children
+
+
+def _luby(i):
+	"""The i-th term (from 0) of the Luby sequence 1 1 2 1 1 2 4 ..."""
+	size, seq = 1, 0
+	while size < i + 1:
+		seq += 1
+		size = 2 * size + 1
+	while size - 1 != i:
+		size = (size - 1) >> 1
+		seq -= 1
+		i = i % size
+	return 1 << seq
+
+
+def _widx(lit):
+	"""Index of the watch list of lit."""
+	return 2 * lit if lit > 0 else -2 * lit + 1
+
+
+class Solver:
+	"""A CDCL SAT solver over clauses of int literals."""
+	restart_base = 100 # conflicts before the first restart
+	var_decay = 0.95
+	learnt_limit = 2000 # learnt clauses kept before the longest half is dropped
+
+	def __init__(self):
+		self.num_vars = 0
+		self.values = [0] # per variable: 1 true, -1 false, 0 unassigned
+		self.level = [0]
+		self.reason = [None] # clause that implied the variable, None for decisions
+		self.activity = [0.0]
+		self.phase = [False]
+		self.watches = [[], []] # per literal, see _widx
+		self.clauses = []
+		self.learnts = []
+		self.trail = []
+		self.trail_lim = [] # index into trail where each decision level starts
+		self.qhead = 0
+		self.heap = []
+		self.var_inc = 1.0
+		self.ok = True # False once the clauses are unsatisfiable at level 0
+		self.model = None
+		self.conflicts = 0
+		self.decisions = 0
+		self.propagations = 0
+
+	def new_var(self):
+		self.num_vars += 1
+		v = self.num_vars
+		self.values.append(0)
+		self.level.append(0)
+		self.reason.append(None)
+		self.activity.append(0.0)
+		self.phase.append(False)
+		self.watches += [[], []]
+		heappush(self.heap, (0.0, v))
+		return v
+
+	def _value(self, lit):
+		return self.values[lit] if lit > 0 else -self.values[-lit]
+
+	def _enqueue(self, lit, reason):
+		v = abs(lit)
+		self.values[v] = 1 if lit > 0 else -1
+		self.level[v] = len(self.trail_lim)
+		self.reason[v] = reason
+		self.trail.append(lit)
+
+	def add_clause(self, lits):
+		"""Add the clause (disjunction) lits. Returns False if the solver
+		became unsatisfiable."""
+		if not self.ok:
+			return False
+		self._cancel_until(0)
+		clause = []
+		for lit in set(lits):
+			if -lit in lits or self._value(lit) == 1:
+				return True # always satisfied
+			if self._value(lit) == 0:
+				clause.append(lit)
+		if not clause:
+			self.ok = False
+		elif len(clause) == 1:
+			self._enqueue(clause[0], None)
+			self.ok = self._propagate() is None
+		else:
+			self._attach(clause)
+			self.clauses.append(clause)
+		return self.ok
+
+	def _attach(self, clause):
+		self.watches[_widx(clause[0])].append(clause)
+		self.watches[_widx(clause[1])].append(clause)
+
+	def _propagate(self):
+		"""Unit propagation. Returns a conflicting clause, or None."""
+		values = self.values
+		watches = self.watches
+		trail = self.trail
+		while self.qhead < len(trail):
+			false_lit = -trail[self.qhead]
+			self.qhead += 1
+			self.propagations += 1
+			ws = watches[_widx(false_lit)]
+			kept = []
+			watches[_widx(false_lit)] = kept
+			n = len(ws)
+			i = 0
+			while i < n:
+				c = ws[i]
+				i += 1
+				if c[0] == false_lit:
+					c[0], c[1] = c[1], false_lit
+				first = c[0]
+				first_val = values[first] if first > 0 else -values[-first]
+				if first_val == 1:
+					kept.append(c)
+					continue
+				for k in range(2, len(c)):
+					lit = c[k]
+					if (values[lit] if lit > 0 else -values[-lit]) != -1:
+						c[1], c[k] = lit, false_lit
+						watches[_widx(lit)].append(c)
+						break
+				else:
+					kept.append(c)
+					if first_val == -1:
+						kept.extend(ws[i:])
+						self.qhead = len(trail)
+						return c
+					self._enqueue(first, c)
+		return None
+
+	def _bump(self, v):
+		self.activity[v] += self.var_inc
+		if self.activity[v] > 1e100:
+			self.activity = [a * 1e-100 for a in self.activity]
+			self.var_inc *= 1e-100
+			self._rebuild_heap()
+		elif self.values[v] == 0:
+			heappush(self.heap, (-self.activity[v], v))
+
+	def _rebuild_heap(self):
+		self.heap = [(-self.activity[v], v) for v in range(1, self.num_vars + 1)
+			if self.values[v] == 0]
+		heapify(self.heap)
+
+	def _analyze(self, confl):
+		"""First-UIP conflict analysis. Returns (learnt clause, backjump level);
+		the asserting literal is learnt[0]."""
+		level = self.level
+		seen = set()
+		learnt = [None]
+		counter = 0
+		p = None
+		index = len(self.trail) - 1
+		current = len(self.trail_lim)
+		clause = confl
+		while True:
+			for q in (clause if p is None else clause[1:]):
+				v = abs(q)
+				if v not in seen and level[v] > 0:
+					seen.add(v)
+					self._bump(v)
+					if level[v] >= current:
+						counter += 1
+					else:
+						learnt.append(q)
+			while abs(self.trail[index]) not in seen:
+				index -= 1
+			p = self.trail[index]
+			index -= 1
+			clause = self.reason[abs(p)]
+			seen.discard(abs(p))
+			counter -= 1
+			if counter == 0:
+				break
+		learnt[0] = -p
+
+		# drop literals implied by the rest of the clause
+		minimized = [learnt[0]]
+		for q in learnt[1:]:
+			r = self.reason[abs(q)]
+			if r is None or any(abs(x) not in seen and level[abs(x)] > 0 for x in r[1:]):
+				minimized.append(q)
+		learnt = minimized
+
+		if len(learnt) == 1:
+			return learnt, 0
+		best = max(range(1, len(learnt)), key=lambda i: level[abs(learnt[i])])
+		learnt[1], learnt[best] = learnt[best], learnt[1]
+		return learnt, level[abs(learnt[1])]
+
+	def _reduce_learnts(self):
+		"""Forget the longer half of the learnt clauses, except those that are
+		the reason for a current assignment."""
+		locked = {id(self.reason[abs(lit)]) for lit in self.trail}
+		self.learnts.sort(key=len)
+		half = len(self.learnts) // 2
+		self.learnts = self.learnts[:half] + [c for c in self.learnts[half:]
+			if id(c) in locked]
+		self.learnt_limit = int(self.learnt_limit * 1.1)
+		self.watches = [[] for _ in self.watches]
+		for clause in self.clauses:
+			self._attach(clause)
+		for clause in self.learnts:
+			self._attach(clause)
+
+	def _cancel_until(self, lvl):
+		if len(self.trail_lim) <= lvl:
+			return
+		start = self.trail_lim[lvl]
+		for lit in self.trail[start:]:
+			v = abs(lit)
+			self.phase[v] = lit > 0
+			self.values[v] = 0
+			self.reason[v] = None
+			heappush(self.heap, (-self.activity[v], v))
+		del self.trail[start:]
+		del self.trail_lim[lvl:]
+		self.qhead = len(self.trail)
+
+	def _pick_branch_var(self):
+		if len(self.heap) > 4 * self.num_vars + 64:
+			self._rebuild_heap()
+		while self.heap:
+			_, v = heappop(self.heap)
+			if self.values[v] == 0:
+				return v
+		return None
+
+	def _search(self, budget, assumptions):
+		"""Search until a result or budget conflicts. Returns True/False, or
+		None to restart."""
+		conflicts = 0
+		while True:
+			confl = self._propagate()
+			if confl is not None:
+				self.conflicts += 1
+				conflicts += 1
+				if not self.trail_lim:
+					self.ok = False
+					return False
+				learnt, back = self._analyze(confl)
+				self._cancel_until(back)
+				if len(learnt) == 1:
+					self._enqueue(learnt[0], None)
+				else:
+					self._attach(learnt)
+					self.learnts.append(learnt)
+					self._enqueue(learnt[0], learnt)
+				self.var_inc /= self.var_decay
+				if len(self.learnts) > self.learnt_limit + len(self.trail):
+					self._reduce_learnts()
+				continue
+
+			if conflicts >= budget:
+				self._cancel_until(0)
+				return None
+
+			lit = None
+			while len(self.trail_lim) < len(assumptions):
+				a = assumptions[len(self.trail_lim)]
+				val = self._value(a)
+				if val == 1:
+					self.trail_lim.append(len(self.trail)) # already true, empty level
+				elif val == -1:
+					return False # the assumptions contradict the clauses
+				else:
+					lit = a
+					break
+			if lit is None:
+				v = self._pick_branch_var()
+				if v is None:
+					self.model = list(self.values)
+					return True
+				self.decisions += 1
+				lit = v if self.phase[v] else -v
+			self.trail_lim.append(len(self.trail))
+			self._enqueue(lit, None)
+
+	def solve(self, assumptions=()):
+		"""Whether the clauses, together with the literals in assumptions, are
+		satisfiable. On success self.model holds the values of the variables."""
+		self.model = None
+		if not self.ok:
+			return False
+		assumptions = list(assumptions)
+		restarts = 0
+		while True:
+			result = self._search(self.restart_base * _luby(restarts), assumptions)
+			if result is not None:
+				break
+			restarts += 1
+		self._cancel_until(0)
+		return result
+
+
+class PropSolver:
+	"""Decides entailment from a set of axiom Props.
+
+	Axioms are encoded once; every goal is checked by solving under the
+	assumption (not goal), so clauses learnt for one goal help the next.
+	"""
+	def __init__(self, axioms=()):
+		self.solver = Solver()
+		self._lits = {} # _key of a subformula -> literal
+		self.atoms = {} # variable -> atomic Prop
+		for A in axioms:
+			self.add_axiom(A)
+
+	def literal(self, A):
+		"""The literal standing for the Prop A, adding Tseitin clauses for any
+		subformula not seen before."""
+		lits = self._lits
+		stack = [A]
+		while stack:
+			P = stack[-1]
+			if P._key in lits:
+				stack.pop()
+				continue
+			base = _connective(P)
+			children = _children(P)
+			if not children:
+				stack.pop()
+				v = self.solver.new_var()
+				if P._key is _False:
+					self.solver.add_clause([-v])
+				else:
+					self.atoms[v] = P
+				lits[P._key] = v
+				continue
+			pending = [c for c in children if c._key not in lits]
+			if pending:
+				stack += reversed(pending)
+				continue
+			stack.pop()
+			a, b = lits[children[0]._key], lits[children[1]._key]
+			if base is Implies and children[1]._key is _False:
+				lits[P._key] = -a # not A
+				continue
+			x = self.solver.new_var()
+			if base is And:
+				clauses = [[-x, a], [-x, b], [x, -a, -b]]
+			elif base is Or:
+				clauses = [[-x, a, b], [x, -a], [x, -b]]
+			elif base is Implies:
+				clauses = [[-x, -a, b], [x, a], [x, -b]]
+			else: # Equiv
+				clauses = [[-x, -a, b], [-x, a, -b], [x, a, b], [x, -a, -b]]
+			for clause in clauses:
+				self.solver.add_clause(clause)
+			lits[P._key] = x
+		return lits[A._key]
+
+	def add_axiom(self, A):
+		"""Assert the Prop A.
+		A conjunction is asserted conjunct by conjunct, and a disjunction as a
+		single clause of its disjuncts, so clause-shaped axioms need no
+		auxiliary variables."""
+		stack = [A]
+		while stack:
+			P = stack.pop()
+			if _connective(P) is And and P.left_prop is not None:
+				stack += [P.right_prop, P.left_prop]
+				continue
+			clause = []
+			disjuncts = [P]
+			while disjuncts:
+				D = disjuncts.pop()
+				if _connective(D) is Or and D.left_prop is not None:
+					disjuncts += [D.right_prop, D.left_prop]
+				else:
+					clause.append(self.literal(D))
+			if not self.solver.add_clause(clause):
+				return False
+		return self.solver.ok
+
+	def satisfiable(self, *props):
+		"""Whether the axioms and props can all be true at once."""
+		return self.solver.solve([self.literal(A) for A in props])
+
+	def entails(self, goal):
+		"""Whether the axioms entail goal, ie (axioms and not goal) is unsatisfiable."""
+		return not self.solver.solve([-self.literal(goal)])
+
+	def model(self):
+		"""After a satisfiable check: {atom: bool} for every atom seen so far.
+		After a failed entails(), this is a counterexample."""
+		values = self.solver.model
+		return {atom: values[v] == 1 for v, atom in self.atoms.items()}
+
+
+def entails(axioms, goal):
+	"""Whether the Props in axioms entail the Prop goal."""
+	return PropSolver(axioms).entails(goal)
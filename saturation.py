@@ -0,0 +1,200 @@
+"""Forward chaining: derive new facts from a set of axioms with the rules in
+propositional.py until the goal is proven or nothing new can be derived.
+
+The engine runs a given-clause loop. Facts (proofs) wait in a queue. Each
+one taken from the queue becomes active and is combined with the facts
+already active:
+- ModusPonens: A and (A -> B) give B
+- HypSyll: (A -> B) and (B -> C) give (A -> C)
+- Contradiction/Explosion: _False gives the goal
+- Conjunction, CommuteAnd, CommuteOr, Disjunction, EquivIntro and
+  ImplicationToOr, but only when their conclusion is a subformula of the
+  goal, since otherwise they would never stop producing new formulas. A
+  disjunction (A or B) in the goal also makes (B or A) relevant, so a proof
+  of B gives (B or A) and then (A or B) by CommuteOr.
+
+HypSyll is likewise restricted to conclusions whose antecedent is the
+antecedent of an implication inside the goal, so a knowledge base of n
+implications does not blow up into its n^2 transitive closure.
+
+Active implications are indexed by the _key of their antecedent and of their
+consequent, so each join is a dict lookup. A fact whose conclusion is
+already known is a duplicate and is dropped before it is queued.
+"""
+from collections import deque
+import time
+
+from propositional import (Implies, And, Or, Equiv, _False, _children, _is_compound, _find_prop,
+	Conjunction, Disjunction, CommuteAnd, CommuteOr, EquivIntro, ImplicationToOr,
+	ModusPonens, HypSyll, Explosion)
+
+
+def _subformula_props(A):
+	"""A and each of its distinct subformulas, once each. Empty if A is None."""
+	seen = set()
+	stack = [A] if A is not None else []
+	while stack:
+		P = stack.pop()
+		if P._key in seen:
+			continue
+		seen.add(P._key)
+		yield P
+		stack += _children(P)
+
+
+class Saturation:
+	"""Forward chaining from axioms (proofs) towards goal (a Prop, or None to
+	saturate).
+	max_facts bounds the number of distinct facts kept, active or queued, and
+	so the memory used: once it is reached, new facts other than a proof of
+	the goal are dropped, and the search may miss proofs it would otherwise
+	find (stats() counts them).
+	"""
+	def __init__(self, axioms, goal=None, max_facts=None):
+		self.goal = goal
+		self.max_facts = max_facts
+		self.known = {} # _key of a conclusion -> its proof, for every active fact
+		self.by_antecedent = {} # _key of A -> active proofs of (A -> _)
+		self.by_consequent = {} # _key of B -> active proofs of (_ -> B)
+		self.queue = deque()
+		self.queued = set() # _keys of the conclusions waiting in queue
+		self.relevant = set()
+		self.antecedents = set() # antecedents HypSyll may produce implications from
+		self.conj_by_child = {} # _key of X -> goal subformulas (X and _), (_ and X)
+		self.disj_by_child = {} # _key of X -> goal subformulas (X or _), (_ or X)
+		for P in _subformula_props(goal):
+			self.relevant.add(P._key)
+			if _is_compound(P, Implies):
+				self.antecedents.add(P.antecedent._key)
+			elif _is_compound(P, And):
+				self.conj_by_child.setdefault(P.left_prop._key, []).append(P)
+				if P.right_prop._key is not P.left_prop._key:
+					self.conj_by_child.setdefault(P.right_prop._key, []).append(P)
+			elif _is_compound(P, Or):
+				self.disj_by_child.setdefault(P.left_prop._key, []).append(P)
+				if P.right_prop._key is not P.left_prop._key:
+					self.disj_by_child.setdefault(P.right_prop._key, []).append(P)
+					# a proof of the right child gives (right or left), then CommuteOr
+					self.relevant.add(Or.of(P.right_prop, P.left_prop)._key)
+			elif _is_compound(P, Equiv):
+				# EquivIntro needs both implications
+				for X, Y in ((P.left_prop, P.right_prop), (P.right_prop, P.left_prop)):
+					self.relevant.add(Implies.of(X, Y)._key)
+					self.antecedents.add(X._key)
+		self.derivations = 0
+		self.dropped = 0 # facts not queued because max_facts was reached
+		self.seconds = 0.0
+		for pp in axioms:
+			self._push(pp)
+
+	def _is_relevant(self, base, A, B):
+		"""Whether the formula base(A, B) is a subformula of the goal."""
+		P = _find_prop(base, A, B)
+		return P is not None and P._key in self.relevant
+
+	def _push(self, pp):
+		key = pp.__class__._key
+		if key in self.known or key in self.queued:
+			return
+		if self.goal is not None and key is self.goal._key:
+			# the search is over: kept as known straight away, whatever max_facts
+			self.known[key] = pp
+			return
+		if self.max_facts is not None and len(self.known) + len(self.queue) >= self.max_facts:
+			self.dropped += 1
+			return
+		self.queued.add(key)
+		self.queue.append(pp)
+
+	def _derive(self, rule, *args):
+		self.derivations += 1
+		self._push(rule(*args))
+
+	def proof_of(self, A):
+		"""The proof of A found so far, or None."""
+		return self.known.get(A._key)
+
+	def run(self):
+		"""Run the given-clause loop. Returns the proof of the goal, or None if
+		the facts saturated (or max_facts was reached) without proving it."""
+		start = time.perf_counter()
+		goal_key = self.goal._key if self.goal is not None else None
+		try:
+			while self.queue:
+				if goal_key in self.known:
+					break
+				if self.max_facts is not None and len(self.known) >= self.max_facts:
+					break
+				given = self.queue.popleft()
+				self.queued.discard(given.__class__._key)
+				self._activate(given)
+		finally:
+			self.seconds += time.perf_counter() - start
+		return self.known.get(goal_key)
+
+	def _activate(self, given):
+		P = given.__class__
+		key = P._key
+		self.known[key] = given
+		known = self.known
+
+		# given as the minor premise of ModusPonens
+		for pp_imp in self.by_antecedent.get(key, ()):
+			self._derive(ModusPonens, pp_imp, given)
+
+		if key is _False and self.goal is not None:
+			self._derive(Explosion, given, self.goal)
+
+		if _is_compound(P, Implies):
+			A, B = P.antecedent._key, P.consequent._key
+			if A in known:
+				self._derive(ModusPonens, given, known[A])
+			if A in self.antecedents:
+				for pp in self.by_antecedent.get(B, ()):
+					self._derive(HypSyll, given, pp)
+			for pp in self.by_consequent.get(A, ()):
+				if pp.antecedent._key in self.antecedents:
+					self._derive(HypSyll, pp, given)
+			self.by_antecedent.setdefault(A, []).append(given)
+			self.by_consequent.setdefault(B, []).append(given)
+			converse = _find_prop(Implies, P.consequent, P.antecedent)
+			if converse is not None and converse._key in known:
+				converse = known[converse._key]
+				if self._is_relevant(Equiv, P.antecedent, P.consequent):
+					self._derive(EquivIntro, given, converse)
+				if self._is_relevant(Equiv, P.consequent, P.antecedent):
+					self._derive(EquivIntro, converse, given)
+			not_A = _find_prop(Implies, P.antecedent, _False)
+			if not_A is not None and self._is_relevant(Or, not_A, P.consequent):
+				self._derive(ImplicationToOr, given)
+
+		if _is_compound(P, And) and self._is_relevant(And, P.right_prop, P.left_prop):
+			self._derive(CommuteAnd, given)
+		if _is_compound(P, Or) and self._is_relevant(Or, P.right_prop, P.left_prop):
+			self._derive(CommuteOr, given)
+		for R in self.conj_by_child.get(key, ()):
+			left, right = R.left_prop._key, R.right_prop._key
+			if left is key and right in known:
+				self._derive(Conjunction, given, known[right])
+			elif right is key and left in known:
+				self._derive(Conjunction, known[left], given)
+		for R in self.disj_by_child.get(key, ()):
+			if R.left_prop._key is key:
+				self._derive(Disjunction, given, R.right_prop)
+			else:
+				self._derive(Disjunction, given, R.left_prop)
+
+	def stats(self):
+		return {
+			'facts': len(self.known),
+			'queued': len(self.queue),
+			'derivations': self.derivations,
+			'dropped': self.dropped,
+			'seconds': self.seconds,
+			'derivations_per_s': self.derivations / self.seconds if self.seconds else 0.0,
+		}
+
+
+def saturate(axioms, goal=None, max_facts=None):
+	"""Forward chain from the proofs in axioms. Returns a proof of goal or None."""
+	return Saturation(axioms, goal, max_facts).run()
@@ -0,0 +1,347 @@
+"""Serialization of Props, proofs, predicates, Objects and sets.
+
+Most of these are classes made on the fly (by Predicate.__call__, the rules,
+createSet...), so pickle cannot find them by name. Instead a value is
+flattened into a table of records, one per distinct object reachable from
+it, each referring to earlier records by index:
+
+	(tag, payload, refs)
+
+payload holds plain data (str, int, bool, None and tuples of these) and
+refs the indices of the records it is built from. Shared sub-objects are
+written once, so a proof DAG stays a DAG, and decoding is one pass over
+the table, however deep the proof.
+
+to_data/from_data convert to and from this table. dumps/loads add a
+compact binary encoding of it (marshal), for caches and for moving proofs
+between processes. Importing this module also makes these objects
+picklable, through the same format.
+
+Like pickle, loading is not safe on untrusted data: from_data and loads
+import the modules named in the records, and rebuild classes and instances
+with the attributes found there. Only load data you wrote yourself, eg a
+proof cache kept on a disk no one else writes to.
+"""
+import contextlib
+import copyreg
+import fractions
+import gc
+import importlib
+import marshal
+import os
+import types
+import weakref
+
+from propositional import (Meta, Prop, Implies, And, Or, Equiv, ProofNode, _connective,
+	_children, _is_compound, _proof_node, _produce_a_proof)
+from predicate import Object, Term, SetMetaMeta, SetMeta, BitSetMeta, ProdMeta, FuncMeta
+
+MAGIC = b'PYPV'
+VERSION = 1
+
+_connectives = {'Implies': Implies, 'And': And, 'Or': Or, 'Equiv': Equiv}
+# attributes that are recomputed when a class is rebuilt, or filled in later
+_skip_attrs = {'_key', '_hash', '_rendered', '_fingerprint', '_items', 'dict_', '_view',
+	'_axes_cache'}
+# classes rebuilt by name, so decoding the same atom twice gives one class
+_named_atoms = weakref.WeakValueDictionary()
+# slots of an Object kept besides its name and Set; _value and _level are
+# caches, recomputed on demand
+_object_extra = [k for k in Object.__slots__
+	if k not in ('_name', 'set_', '_id', '_value', '_level', '__weakref__')]
+# Objects and on-the-fly classes that were encoded by this process, by id,
+# so that decoding in the same process gives back the very same object
+_process_token = os.urandom(8).hex()
+_encoded = weakref.WeakValueDictionary()
+
+
+_NODE = ('node',) # description of a ProofNode being written
+
+
+@contextlib.contextmanager
+def _no_gc():
+	"""Pause the cyclic garbage collector: encoding and decoding make many
+	small tuples, that would set it off over and over for nothing."""
+	enabled = gc.isenabled()
+	gc.disable()
+	try:
+		yield
+	finally:
+		if enabled:
+			gc.enable()
+
+
+def _remember(obj):
+	_encoded[id(obj)] = obj
+	return (_process_token, id(obj))
+
+
+def _recall(local):
+	token, key = local
+	return _encoded.get(key) if token == _process_token else None
+
+
+def _global_name(obj):
+	"""(module, qualname) if obj can be imported back by name, else None."""
+	module = getattr(obj, '__module__', None)
+	qualname = getattr(obj, '__qualname__', None)
+	if module is None or qualname is None or '<locals>' in qualname:
+		return None
+	try:
+		found = _resolve(module, qualname)
+	except (ImportError, AttributeError):
+		return None
+	return (module, qualname) if found is obj else None
+
+
+def _resolve(module, qualname):
+	obj = importlib.import_module(module)
+	for part in qualname.split('.'):
+		obj = getattr(obj, part)
+	return obj
+
+
+def _is_axiom(cls):
+	return cls.__new__ is not Prop.__new__
+
+
+def _class_state(cls):
+	"""The attributes of cls worth keeping: data, not methods or dunders."""
+	return {k: v for k, v in cls.__dict__.items()
+		if not k.startswith('__') and k not in _skip_attrs
+		and not isinstance(v, (types.FunctionType, classmethod, staticmethod, property))}
+
+
+def _describe(obj):
+	"""(tag, payload, children, deferred) for obj. deferred lists the
+	contents (set items, function tables) written after obj itself, since
+	they may refer back to it."""
+	# most of a large proof is nodes
+	if type(obj) is ProofNode:
+		return 'node', obj.rule, (obj.conclusion,) + obj.premises, ()
+	if obj is None or isinstance(obj, (bool, int, float, str, bytes)):
+		return 'lit', obj, (), ()
+	if isinstance(obj, fractions.Fraction):
+		return 'frac', (obj.numerator, obj.denominator), (), ()
+	if isinstance(obj, tuple):
+		return 'tuple', None, obj, ()
+	if isinstance(obj, list):
+		return 'list', None, obj, ()
+	if isinstance(obj, (set, frozenset)):
+		return ('set' if isinstance(obj, set) else 'frozenset'), None, list(obj), ()
+	if isinstance(obj, dict):
+		return 'dict', None, [x for kv in obj.items() for x in kv], ()
+	if isinstance(obj, Meta):
+		name = _global_name(obj)
+		if name is None and obj._key is obj and _is_compound(obj):
+			return 'prop', _connective(obj).__name__, _children(obj), ()
+		# a named Prop, an atom, or a subclass of a formula (eg an axiom made
+		# by Not): rebuilt on its bases, so it keeps its name and axiom status
+		payload = (obj.__module__, obj.__qualname__, obj.__name__, _is_axiom(obj),
+			name is not None, _remember(obj))
+		return 'class', payload, (obj.__bases__, _class_state(obj)), ()
+	if isinstance(obj, (SetMetaMeta, ProdMeta, FuncMeta)):
+		name = _global_name(obj)
+		if name is not None:
+			return 'global', name, (), ()
+		deferred = []
+		if '_items' in obj.__dict__:
+			deferred.append(('_items', obj._items))
+		if 'dict_' in obj.__dict__:
+			deferred.append(('dict_', obj.dict_))
+		payload = (obj.__module__, obj.__qualname__, obj.__name__, False, False, _remember(obj))
+		return 'class', payload, (obj.__bases__, _class_state(obj)), deferred
+	if isinstance(obj, Term):
+		return 'term', None, (obj.op, obj.set_) + obj.args, ()
+	if isinstance(obj, Object):
+		extra = {k: getattr(obj, k) for k in _object_extra if hasattr(obj, k)}
+		return 'object', (obj.name, _remember(obj)), (obj.set_, extra), ()
+	if isinstance(obj, Prop):
+		return 'proof', None, (obj.__class__,), ()
+	name = _global_name(obj)
+	if name is not None:
+		return 'global', name, (), ()
+	if isinstance(obj, (type, types.FunctionType, types.BuiltinFunctionType)):
+		raise TypeError(f"Cannot serialize {obj!r}: it cannot be imported by name.")
+	return 'instance', None, (type(obj), vars(obj)), ()
+
+
+def to_data(value):
+	"""Flatten value into (VERSION, root index, records)."""
+	records = []
+	index = {} # id of an object -> its record
+	pending = {} # id -> description, for objects whose children are being written
+	# descriptions written: they keep the objects made for them (eg the extra
+	# slots of an Object) alive, so that an id is never reused by another
+	written = []
+	fills = [] # set and function contents, written once everything else is
+	stack = [value]
+	with _no_gc():
+		while stack or fills:
+			if not stack:
+				# contents of a set or function, written after the set itself and
+				# what refers to it, as they may refer to these too (eg f(a))
+				owner, attr, contents = fills[-1]
+				if id(contents) in index:
+					fills.pop()
+					records.append(('fill', attr, (index[id(owner)], index[id(contents)])))
+				else:
+					stack.append(contents)
+				continue
+			obj = stack.pop()
+			key = id(obj)
+			if key in index:
+				continue
+			description = pending.pop(key, None)
+			if description is None:
+				# first visit: write the children, then come back to obj
+				if type(obj) is ProofNode:
+					# most of a large proof, described without building anything
+					pending[key] = _NODE
+					stack.append(obj)
+					if id(obj.conclusion) not in index:
+						stack.append(obj.conclusion)
+					stack += [p for p in obj.premises if id(p) not in index]
+					continue
+				description = pending[key] = _describe(obj)
+				stack.append(obj)
+				stack += [c for c in description[2] if id(c) not in index]
+				continue
+			# children written, unless one of them is an object being written
+			try:
+				if description is _NODE:
+					records.append(('node', obj.rule, (index[id(obj.conclusion)],)
+						+ tuple([index[id(p)] for p in obj.premises])))
+					index[key] = len(records) - 1
+					continue
+				tag, payload, children, deferred = description
+				records.append((tag, payload, tuple([index[id(c)] for c in children])))
+			except KeyError:
+				raise ValueError(f"Cannot serialize a cycle through {obj!r}.") from None
+			written.append(description)
+			index[key] = len(records) - 1
+			for attr, contents in deferred:
+				fills.append((obj, attr, contents))
+	return (VERSION, index[id(value)], records)
+
+
+def _build_class(payload, bases, state):
+	module, qualname, name, axiom, is_global, local = payload
+	cls = _recall(local)
+	if cls is not None:
+		return cls
+	if is_global:
+		try:
+			return _resolve(module, qualname)
+		except (ImportError, AttributeError):
+			pass
+	named = isinstance(bases, tuple) and issubclass(type(bases[0]), Meta) \
+		and '_leaf_key' not in state and not _is_compound(bases[0])
+	if named:
+		cls = _named_atoms.get((module, qualname))
+		if cls is not None:
+			return cls
+	cls = type(name, bases, dict(state, __module__=module, __qualname__=qualname))
+	if axiom and isinstance(cls, Meta):
+		cls.__new__ = lambda _cls: object.__new__(_cls)
+	if named:
+		_named_atoms[(module, qualname)] = cls
+	return cls
+
+
+def _build_object(payload, args):
+	name, local = payload
+	obj = _recall(local)
+	if obj is not None:
+		return obj
+	set_, extra = args
+	obj = Object(name, set_=set_)
+	for k, v in extra.items():
+		setattr(obj, k, v)
+	return obj
+
+
+def _fill(attr, args):
+	owner, contents = args
+	if contents is getattr(owner, attr, None):
+		return # recalled from this process, nothing to fill
+	if attr == '_items':
+		owner._items = set(contents)
+	else:
+		owner.dict_ = owner._new_table()
+		for obj, image in contents.items():
+			owner.dict_.store(obj, image)
+
+
+def _build_instance(args):
+	cls, state = args
+	obj = cls.__new__(cls)
+	vars(obj).update(state)
+	return obj
+
+
+_builders = {
+	'lit': lambda payload, args: payload,
+	'frac': lambda payload, args: fractions.Fraction(*payload),
+	'tuple': lambda payload, args: tuple(args),
+	'list': lambda payload, args: list(args),
+	'set': lambda payload, args: set(args),
+	'frozenset': lambda payload, args: frozenset(args),
+	'dict': lambda payload, args: dict(zip(args[::2], args[1::2])),
+	'node': lambda payload, args: _proof_node(payload, tuple(args[1:]), args[0]),
+	'prop': lambda payload, args: _connectives[payload].of(*args),
+	'class': lambda payload, args: _build_class(payload, *args),
+	'global': lambda payload, args: _resolve(*payload),
+	'object': _build_object,
+	'term': lambda payload, args: Term(args[0], tuple(args[2:]), args[1]),
+	'proof': lambda payload, args: _produce_a_proof(args[0]),
+	'instance': lambda payload, args: _build_instance(args),
+	'fill': _fill,
+}
+
+
+def from_data(data, substitute=None):
+	"""Rebuild the value flattened by to_data.
+	substitute: a function given each Prop class rebuilt from a 'class'
+	record, eg an atom, returning the class to use in its place. A Prop
+	decoded in another process is a new class, so this is how the atoms of
+	a proof are matched with the atoms of the caller.
+	"""
+	version, root, records = data
+	if version != VERSION:
+		raise ValueError(f"Unsupported serialization version {version}.")
+	values = []
+	append = values.append
+	with _no_gc():
+		for tag, payload, refs in records:
+			if tag == 'node':
+				# not shared through _proof_node: the nodes of the table are
+				# distinct already, and registering them costs more than the rest
+				append(ProofNode(payload, tuple([values[r] for r in refs[1:]]), values[refs[0]]))
+				continue
+			value = _builders[tag](payload, [values[r] for r in refs])
+			if substitute is not None and tag == 'class' and isinstance(value, Meta):
+				value = substitute(value)
+			append(value)
+	return values[root]
+
+
+def dumps(value):
+	"""Binary encoding of value."""
+	return MAGIC + marshal.dumps(to_data(value))
+
+
+def loads(data, substitute=None):
+	"""Rebuild a value from dumps(value). See from_data for substitute."""
+	if data[:len(MAGIC)] != MAGIC:
+		raise ValueError("Not a pyprover serialization.")
+	return from_data(marshal.loads(data[len(MAGIC):]), substitute)
+
+
+def _reduce(obj):
+	return loads, (dumps(obj),)
+
+# copyreg looks up the exact type, so each metaclass is registered
+for _type in (Meta, SetMetaMeta, SetMeta, BitSetMeta, ProdMeta, FuncMeta, ProofNode, Object,
+		Term):
+	copyreg.pickle(_type, _reduce)
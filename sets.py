@@ -1,8 +1,8 @@
 from predicate import SetMetaMeta
-from predicate import Object
+from predicate import Object, Term
 from itertools import count
 from predicate import createSet, Func
-import fractions
+import operator
 from predicate import Membership, MembershipProof
 from predicate import Predicate
 
@@ -15,6 +15,47 @@ def _check_valid(name,symb):
 		rest = name
 	return rest.isdigit()
 
+# levels of the number tower N ⊆ Q ⊆ R
+_IN_N, _IN_Q, _IN_R, _OUTSIDE = 0, 1, 2, 3
+
+def _tower_level(item):
+	"""The first of N, Q and R that item is in (_IN_N, _IN_Q or _IN_R), or
+	_OUTSIDE. Computed once per Object; add() forgets it."""
+	try:
+		return item._level
+	except AttributeError:
+		pass
+	set_ = item.set_
+	# a term is in a set by its set_ only, its name is no numeral
+	name = '' if isinstance(item, Term) else item.name
+	if name.isdigit() or set_ is N or item in N._items:
+		level = _IN_N
+	elif _check_valid(name, '/') or set_ is Q or item in Q._items:
+		level = _IN_Q
+	elif _check_valid(name, '.') or set_ is R or item in R._items:
+		level = _IN_R
+	else:
+		level = _OUTSIDE
+	item._level = level
+	return level
+
+def _forget_level(item):
+	try:
+		del item._level
+	except AttributeError:
+		pass
+
+def _combine(set_, objs1, objs2, op, symbol):
+	constant = Object.constant
+	result = []
+	for a, b in zip(objs1, objs2):
+		x, y = a.value, b.value
+		if x is None or y is None:
+			result.append(Term(symbol, (a, b), set_=Q))
+		else:
+			result.append(constant(op(x, y), set_=set_))
+	return result
+
 class N(metaclass=SetMetaMeta):
 	_items = set()
 	def __new__(cls, name='0'):
@@ -24,10 +65,13 @@ class N(metaclass=SetMetaMeta):
 
 	@classmethod
 	def __contains__(cls, item):
-		return ((isinstance(item, Object) and item.name.isdigit())
-			or item.set_ == cls
-			or item in cls._items
-			)
+		return _tower_level(item) <= _IN_N
+
+	@classmethod
+	def contains_many(cls, items):
+		"""[item in N for item in items], in one pass."""
+		level = _tower_level
+		return [level(item) <= _IN_N for item in items]
 
 	@classmethod
 	def __iter__(cls):
@@ -39,6 +83,7 @@ class N(metaclass=SetMetaMeta):
 	def add(cls, item):
 		assert isinstance(item, Object), "Item not an Object"
 		cls._items.add(item)
+		_forget_level(item)
 
 	@classmethod
 	def __add__(cls, obj1, obj2):
@@ -48,6 +93,18 @@ class N(metaclass=SetMetaMeta):
 	def __sub__(cls, obj1, obj2):
 		return Q.__sub__(obj1, obj2)
 
+	@classmethod
+	def add_many(cls, objs1, objs2):
+		return Q.add_many(objs1, objs2)
+
+	@classmethod
+	def sub_many(cls, objs1, objs2):
+		return Q.sub_many(objs1, objs2)
+
+	@classmethod
+	def compare_many(cls, objs1, objs2):
+		return Q.compare_many(objs1, objs2)
+
 class Q(metaclass=SetMetaMeta):
 	_items = set()
 	def __new__(cls, name='0'):
@@ -61,10 +118,13 @@ class Q(metaclass=SetMetaMeta):
 
 	@classmethod
 	def __contains__(cls, item):
-		return ((isinstance(item, Object) and _check_valid(item.name, '/'))
-			or item.set_ == cls
-			or item in cls._items
-			or item in N)
+		return _tower_level(item) <= _IN_Q
+
+	@classmethod
+	def contains_many(cls, items):
+		"""[item in Q for item in items], in one pass."""
+		level = _tower_level
+		return [level(item) <= _IN_Q for item in items]
 
 	@classmethod
 	def __iter__(cls):
@@ -75,34 +135,45 @@ class Q(metaclass=SetMetaMeta):
 		"""Add/assert that an element is in Q"""
 		assert isinstance(item, Object), "Item not an Object"
 		cls._items.add(item)
+		_forget_level(item)
 
 	@classmethod
 	def __add__(cls, obj1, obj2):
 		"""Implementation for +"""
-		try:
-			num1 = fractions.Fraction(obj1.name)
-			num2 = fractions.Fraction(obj2.name)
-		except ValueError:
-			return Object(f"{obj1.name} + {obj2.name}",set_=Q)
-		tup = (num1 + num2).as_integer_ratio()
-		tup = map(str, tup)
-		return Object('/'.join(
-						tup	
-			), set_=cls)
+		num1, num2 = obj1.value, obj2.value
+		if num1 is None or num2 is None:
+			return Term('+', (obj1, obj2), set_=Q)
+		return Object.constant(num1 + num2, set_=cls)
 
 	@classmethod
 	def __sub__(cls, obj1, obj2):
-		"""Implementation for +"""
-		try:
-			num1 = fractions.Fraction(obj1.name)
-			num2 = fractions.Fraction(obj2.name)
-		except ValueError:
-			return Object(f"{obj1.name} - {obj2.name}",set_=Q)
-		tup = (num1 - num2).as_integer_ratio()
-		tup = map(str, tup)
-		return Object('/'.join(
-						tup	
-			), set_=cls)
+		"""Implementation for -"""
+		num1, num2 = obj1.value, obj2.value
+		if num1 is None or num2 is None:
+			return Term('-', (obj1, obj2), set_=Q)
+		return Object.constant(num1 - num2, set_=cls)
+
+	@classmethod
+	def add_many(cls, objs1, objs2):
+		"""[a + b for a, b in zip(objs1, objs2)], in one call."""
+		return _combine(cls, objs1, objs2, operator.add, '+')
+
+	@classmethod
+	def sub_many(cls, objs1, objs2):
+		"""[a - b for a, b in zip(objs1, objs2)], in one call."""
+		return _combine(cls, objs1, objs2, operator.sub, '-')
+
+	@classmethod
+	def compare_many(cls, objs1, objs2):
+		"""For each pair of constants (a, b) of objs1 and objs2, -1 if a < b,
+		0 if a = b and 1 if a > b."""
+		result = []
+		for a, b in zip(objs1, objs2):
+			x, y = a.value, b.value
+			if x is None or y is None:
+				raise ValueError(f"Either {a} or {b} is not a constant.")
+			result.append((x > y) - (x < y))
+		return result
 
 	@classmethod
 	def __lt__(cls, obj1, obj2):
@@ -129,10 +200,13 @@ class R(metaclass=SetMetaMeta):
 
 	@classmethod
 	def __contains__(cls, item):
-		return ((isinstance(item, Object) and _check_valid(item.name, '.'))
-			or item.set_ == cls
-			or item in cls._items
-			or item in Q)
+		return _tower_level(item) <= _IN_R
+
+	@classmethod
+	def contains_many(cls, items):
+		"""[item in R for item in items], in one pass."""
+		level = _tower_level
+		return [level(item) <= _IN_R for item in items]
 
 	@classmethod
 	def __iter__(cls):
@@ -142,6 +216,7 @@ class R(metaclass=SetMetaMeta):
 	def add(cls, item):
 		assert isinstance(item, Object), "Item not an Object"
 		cls._items.add(item)
+		_forget_level(item)
 
 	@classmethod
 	def __add__(cls, obj1, obj2):
@@ -151,6 +226,31 @@ class R(metaclass=SetMetaMeta):
 	def __sub__(cls, obj1, obj2):
 		return Q.__sub__(obj1, obj2)
 
+	@classmethod
+	def add_many(cls, objs1, objs2):
+		return Q.add_many(objs1, objs2)
+
+	@classmethod
+	def sub_many(cls, objs1, objs2):
+		return Q.sub_many(objs1, objs2)
+
+	@classmethod
+	def compare_many(cls, objs1, objs2):
+		return Q.compare_many(objs1, objs2)
+
+
+
+_tower_sets = {N: _IN_N, Q: _IN_Q, R: _IN_R}
+
+def contains_many(pairs):
+	"""[x in set_ for x, set_ in pairs], in one pass. Checks against N, Q and R
+	use the cached classification of x."""
+	level, tower_sets = _tower_level, _tower_sets
+	result = []
+	for x, set_ in pairs:
+		top = tower_sets.get(set_)
+		result.append(level(x) <= top if top is not None else x in set_)
+	return result
 
 
 if __name__ == '__main__':
@@ -0,0 +1,57 @@
+import random
+
+from propositional import Prop, Implies, And, Or, _produce_a_proof
+from backward_chaining import BackwardChainer
+from checker import ProofChecker
+
+
+def _graph(rng, n_atoms, n_rules, n_facts):
+	"""Random implications between atoms, with cycles, and atomic facts."""
+	atoms = [type(f"K{i}", (Prop,), {}) for i in range(n_atoms)]
+	rules = {(rng.randrange(n_atoms), rng.randrange(n_atoms)) for _ in range(n_rules)}
+	facts = set(rng.sample(range(n_atoms), n_facts))
+	axioms = [_produce_a_proof(Implies.of(atoms[a], atoms[b])) for a, b in sorted(rules)]
+	axioms += [_produce_a_proof(atoms[i]) for i in sorted(facts)]
+	return atoms, rules, facts, axioms
+
+
+def _reachable(rules, start):
+	"""The atoms reachable from start by one implication or more."""
+	seen, stack = set(), [b for a, b in rules if a == start]
+	while stack:
+		b = stack.pop()
+		if b not in seen:
+			seen.add(b)
+			stack += [c for a, c in rules if a == b]
+	return seen
+
+
+def test_matches_closure():
+	rng = random.Random(23)
+	for _ in range(20):
+		atoms, rules, facts, axioms = _graph(rng, 12, 18, 2)
+		derivable = set(facts).union(*(_reachable(rules, f) for f in facts))
+		chainer = BackwardChainer(axioms)
+		checker = ProofChecker(axioms)
+		# goals in a random order, so the tables carry over between them
+		goals = [(atoms[i], i in derivable) for i in range(len(atoms))]
+		goals += [(Implies.of(atoms[a], atoms[c]), c in _reachable(rules, a))
+			for a in range(len(atoms)) for c in range(len(atoms))]
+		rng.shuffle(goals)
+		for goal, expected in goals:
+			proof = chainer.prove(goal)
+			assert (proof is not None) == expected, goal
+			if proof is not None:
+				assert proof.__class__._key is goal._key
+				assert checker.check(proof) is True
+
+
+def test_connectives_are_split():
+	atoms, rules, facts, axioms = _graph(random.Random(2), 8, 10, 2)
+	chainer = BackwardChainer(axioms)
+	A, B = atoms[sorted(facts)[0]], atoms[sorted(facts)[1]]
+	missing = next(P for i, P in enumerate(atoms)
+		if i not in facts and not any(i in _reachable(rules, f) for f in facts))
+	assert chainer.prove(And.of(A, B)) is not None
+	assert chainer.prove(Or.of(missing, A)) is not None
+	assert chainer.prove(And.of(A, missing)) is None
@@ -0,0 +1,24 @@
+import copy
+import json
+
+import benchmarks
+
+
+def test_every_workload_runs():
+	results = benchmarks.run_suite(scale=0.01, repeat=1)
+	assert set(results['results']) == set(benchmarks.SUITE)
+	for row in results['results'].values():
+		assert row['size'] >= 1 and row['ops_per_s'] > 0 and row['peak_kb'] >= 0
+	json.dumps(results)
+
+
+def test_compare_flags_regressions():
+	baseline = {'results': {'fast': {'size': 10, 'ops_per_s': 100.0, 'peak_kb': 1000.0},
+		'slow': {'size': 10, 'ops_per_s': 100.0, 'peak_kb': 1000.0},
+		'big': {'size': 10, 'ops_per_s': 100.0, 'peak_kb': 1000.0}}}
+	results = copy.deepcopy(baseline)
+	results['results']['slow']['ops_per_s'] = 50.0
+	results['results']['big']['peak_kb'] = 5000.0
+	results['results']['new'] = {'size': 1, 'ops_per_s': 1.0, 'peak_kb': 1.0}
+	rows = {name: regressed for name, _, _, regressed in benchmarks.compare(results, baseline)}
+	assert rows == {'fast': False, 'slow': True, 'big': True}
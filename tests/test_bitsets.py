@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+from predicate import (Object, Set, BitSet, Domain, createSet, Subset, SubsetProof,
+	_is_subset)
+
+
+def _random_sets(rng, domain, objects, count):
+	sets, contents = [], []
+	for i in range(count):
+		members = {o for o in objects if rng.random() < 0.5}
+		S = createSet(f"B{i}", BitSet, domain=domain)
+		S.add_many([o for o in objects if o in members])
+		sets.append(S)
+		contents.append(members)
+	return sets, contents
+
+
+def test_algebra_matches_python_sets():
+	rng = random.Random(29)
+	objects = [Object(f"o{i}") for i in range(150)]
+	domain = Domain(objects[:40]) # the rest get their bits as they are added
+	sets, contents = _random_sets(rng, domain, objects, 6)
+	outside = Object('outside')
+	for S, s in zip(sets, contents):
+		assert set(S) == s and len(S) == len(s)
+		assert [o in S for o in objects] == [o in s for o in objects]
+		assert S.contains_many(objects + [outside]) == [o in s for o in objects] + [False]
+		for T, t in zip(sets, contents):
+			assert set(S | T) == s | t and set(S & T) == s & t and set(S - T) == s - t
+			assert S.issubset(T) == (s <= t)
+			assert (S & T).issubset(S)
+
+
+def test_subset_proofs():
+	rng = random.Random(31)
+	objects = [Object(f"p{i}") for i in range(60)]
+	domain = Domain(objects)
+	(S, T), (s, t) = _random_sets(rng, domain, objects, 2)
+	x = Object('x')
+	# a plain Set on one side is compared element by element
+	plain = createSet('Plain', Set)
+	for o in s | t:
+		plain.add(o)
+	for A, B, expected in [(S & T, S, True), (S, S | T, True), (S, T, s <= t), (S, plain, True),
+			(plain, S, s | t <= s)]:
+		assert _is_subset(A, B) == expected
+		claim = Subset('sub')(A, B)(x=x)
+		if expected:
+			assert SubsetProof(claim).__class__ is claim
+		else:
+			with pytest.raises(AssertionError):
+				SubsetProof(claim)
+
@@ -0,0 +1,71 @@
+from propositional import (Prop, Implies, And, Or, ModusPonens, HypSyll, Conjunction,
+	CommuteAnd, _proof_node, _produce_a_proof)
+from predicate import Object, ForAll, LessThan, createSet
+from sets import Q
+from checker import ProofChecker, check
+
+
+def _atoms(n):
+	return [type(f"C{i}", (Prop,), {}) for i in range(n)]
+
+
+def test_accepts_proofs_built_by_the_rules():
+	A, B, C = _atoms(3)
+	ab = _produce_a_proof(Implies.of(A, B))
+	bc = _produce_a_proof(Implies.of(B, C))
+	a = _produce_a_proof(A)
+	axioms = [ab, bc, a]
+	assert check(ModusPonens(HypSyll(ab, bc), a), axioms) is True
+	assert check(CommuteAnd(Conjunction(a, ab)), axioms) is True
+
+
+def test_rejects_a_wrong_conclusion():
+	A, B, C = _atoms(3)
+	ab = _produce_a_proof(Implies.of(A, B))
+	bc = _produce_a_proof(Implies.of(B, C))
+	a = _produce_a_proof(A)
+	axioms = [ab, bc, a]
+	forged = [
+		_proof_node('ModusPonens', (ab, a), C),
+		_proof_node('HypSyll', (ab, bc), Implies.of(C, A)),
+		_proof_node('Conjunction', (a, ab), And.of(A, A)),
+		_proof_node('CommuteAnd', (Conjunction(a, ab),), And.of(A, Implies.of(A, B))),
+		_proof_node('Disjunction', (a,), Or.of(B, A)),
+	]
+	for proof in forged:
+		assert check(proof, axioms) is not True, proof.rule
+
+
+def test_rejects_a_missing_axiom_and_what_depends_on_it():
+	A, B = _atoms(2)
+	ab = _produce_a_proof(Implies.of(A, B))
+	a = _produce_a_proof(A)
+	checker = ProofChecker([ab])
+	assert checker.check(ModusPonens(ab, a)).startswith('depends on')
+	checker.add_axiom(a)
+	assert checker.recheck() == 2
+	assert checker.check(ModusPonens(ab, a)) is True
+
+
+def test_rejects_resolve_rules():
+	A = createSet('A')
+	x = Object('x', set_=A)
+	forall = ForAll('all', predicate=LessThan('lt'))(x=x, y=Object('1', set_=Q))
+	pp = _produce_a_proof(forall)
+	wrong = _produce_a_proof(type('Anything', (Prop,), {}))
+	for rule in ('UniversalResolve', 'ExistentialResolve'):
+		assert check(_proof_node(rule, (pp,), wrong.__class__), [pp]) is not True
+
+
+def test_invalidate_rechecks_only_dependents():
+	atoms = _atoms(6)
+	axioms = [_produce_a_proof(Implies.of(atoms[i], atoms[i + 1])) for i in range(5)]
+	lemmas = [axioms[0]]
+	for pp in axioms[1:]:
+		lemmas.append(HypSyll(lemmas[-1], pp))
+	checker = ProofChecker(axioms)
+	assert all(checker.check(lemma) is True for lemma in lemmas)
+	checker.remove_axiom(axioms[4])
+	assert checker.recheck() == 2
+	assert checker.check(lemmas[-1]) is not True
+	assert checker.check(lemmas[-2]) is True
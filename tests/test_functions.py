@@ -0,0 +1,66 @@
+import gc
+import random
+import weakref
+
+import pytest
+
+from predicate import Object, Term, Set, Func, createSet
+from sets import Q
+
+
+def _domain(n):
+	S = createSet('D', Set)
+	objects = [Object(f"d{i}") for i in range(n)]
+	for o in objects:
+		S.add(o)
+	return S, objects
+
+
+def test_map_matches_applying_one_by_one():
+	rng = random.Random(61)
+	S, objects = _domain(50)
+	f = createSet('f', Func, domain=S, range_=Q)
+	g = createSet('g', Func, domain=S, range_=Q)
+	inputs = [rng.choice(objects) for _ in range(300)]
+	mapped = f.map(inputs)
+	assert mapped == [f(o) for o in inputs] == [Term(f, (o,), Q) for o in inputs]
+	assert [g(o) for o in inputs] == g.map(inputs)
+	assert f.cache_info()['size'] == len(set(inputs))
+	with pytest.raises(AssertionError):
+		f.map([Object('outside')])
+
+
+def test_bounded_table_keeps_images_in_use():
+	S, objects = _domain(100)
+	f = createSet('f', Func, domain=S, range_=Q, cache_size=10)
+	kept = [f(o) for o in objects]
+	info = f.cache_info()
+	assert info['size'] == 10 and info['evictions'] == 90
+	# evicted, but still in use: the very same Object comes back
+	assert [f(o) for o in objects] == kept and all(a is b for a, b in zip(f.map(objects), kept))
+
+
+def test_definitions():
+	calls = []
+	def square(v):
+		calls.append(v)
+		return Object.constant(v.value * v.value, set_=Q)
+	numbers = [Object(f"{i}/1", set_=Q) for i in range(-5, 6)]
+	f = createSet('f', Func, domain=Q, range_=Q, definition=square)
+	assert [y.value for y in f.map(numbers)] == [x.value ** 2 for x in numbers]
+	cached = createSet('c', Func, domain=Q, range_=Q, definition=square, cache_definition=True)
+	calls.clear()
+	assert cached.map(numbers + numbers) == f.map(numbers) * 2
+	assert len(calls) == 2 * len(numbers) # once each through cached, once each through f
+	assert [cached(x) for x in numbers] == f.map(numbers)
+
+
+def test_images_past_cache_size_are_freed():
+	S, objects = _domain(100)
+	image = createSet('image', Set)
+	f = createSet('f', Func, domain=S, range_=image, cache_size=10)
+	refs = [weakref.ref(f(o)) for o in objects]
+	assert all(f(o) in image for o in objects[-10:]) and Object('y') not in image
+	gc.collect()
+	alive = sum(r() is not None for r in refs)
+	assert alive <= 10
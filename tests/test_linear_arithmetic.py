@@ -0,0 +1,115 @@
+import random
+from fractions import Fraction
+
+from predicate import Object, LessThan, GreaterThan, LessOrEq, GreaterOrEq, Equal
+from sets import Q, R
+from rewriting import linear_form
+from linear_arithmetic import LinearSolver, LinearArithmetic, decide, entails, _ordering, _rows
+from checker import check
+
+x, y, z, w = (Object(name, set_=R) for name in 'xyzw')
+one = Object('1', set_=Q)
+_orderings = [LessThan, GreaterThan, LessOrEq, Equal]
+_holds = {'lt': lambda d: d < 0, 'le': lambda d: d <= 0, 'gt': lambda d: d > 0,
+	'ge': lambda d: d >= 0, 'eq': lambda d: d == 0}
+
+
+def _random_facts(rng, count):
+	def term():
+		t = Object(str(rng.randrange(0, 5)), set_=Q)
+		for atom in rng.sample([x, y, z, w], rng.randrange(1, 4)):
+			t = t + atom if rng.random() < 0.5 else t - atom
+		return t
+	return [rng.choice(_orderings)('o')(x=term(), y=term()) for _ in range(count)]
+
+
+def _value(t, model):
+	coefficients, constant = linear_form(t)
+	return constant + sum(k * model.get(atom, 0) for atom, k in coefficients.items())
+
+
+def _satisfied(fact, model):
+	return _holds[fact.order_symbol](_value(fact.x, model) - _value(fact.y, model))
+
+
+def _check_certificate(certificate):
+	"""Whether the facts times their multipliers add up to a false ordering."""
+	total = {}
+	constant = Fraction(0)
+	strict = False
+	for fact, m in certificate:
+		coefficients, k, symbol = _ordering(fact)
+		if symbol in ('gt', 'ge'):
+			coefficients, k = {a: -c for a, c in coefficients.items()}, -k
+		if symbol != 'eq' and m <= 0:
+			return False
+		strict = strict or symbol in ('lt', 'gt')
+		for atom, c in coefficients.items():
+			total[atom] = total.get(atom, 0) + m * c
+		constant += m * k
+	return not any(total.values()) and (constant > 0 or (strict and constant == 0))
+
+
+def test_against_models_and_certificates():
+	rng = random.Random(0)
+	for _ in range(300):
+		facts = _random_facts(rng, rng.randrange(1, 7))
+		solver = LinearSolver(facts)
+		if solver.satisfiable():
+			model = solver.model()
+			assert all(_satisfied(fact, model) for fact in facts)
+		else:
+			assert _check_certificate(solver.certificate)
+			assert not LinearSolver(solver.conflict).satisfiable()
+
+
+def test_incremental_agrees_with_batch():
+	rng = random.Random(1)
+	for _ in range(100):
+		solver = LinearSolver()
+		stack = [[]]
+		for _ in range(12):
+			action = rng.random()
+			if action < 0.25:
+				solver.push()
+				stack.append([])
+			elif action < 0.45 and len(stack) > 1:
+				solver.pop()
+				stack.pop()
+			else:
+				fact = _random_facts(rng, 1)[0]
+				solver.add(fact)
+				stack[-1].append(fact)
+			facts = [fact for frame in stack for fact in frame]
+			rows = [row for i, fact in enumerate(facts)
+				for row in _rows(*_ordering(fact), {i: Fraction(1)})]
+			assert solver.satisfiable() == decide(rows)[0]
+
+
+def test_entails_and_prove():
+	x_lt_y = LessThan('l')(x=x, y=y, axiom=True)
+	y_lt_z = LessThan('l')(x=y, y=z + one, axiom=True)
+	solver = LinearSolver([x_lt_y, y_lt_z, LessThan('l')(x=w, y=x)])
+	goal = LessThan('l')(x=x - z, y=one)
+	assert solver.entails(goal)
+	assert solver.conflict == [x_lt_y, y_lt_z]
+	negation = GreaterOrEq('g')(x=x - z, y=one)
+	assert _check_certificate(solver.certificate + [(negation, solver.goal_multiplier)])
+	chain = LinearSolver([LessThan('l')(x=x, y=y), LessThan('l')(x=y, y=z)])
+	assert chain.entails(LessThan('l')(x=x, y=z))
+	assert [m for _, m in chain.certificate] == [1, 1] and chain.goal_multiplier == 1
+	assert not solver.entails(LessThan('l')(x=x, y=z))
+	model = solver.model()
+	assert _satisfied(x_lt_y, model) and _satisfied(y_lt_z, model)
+	proof = LinearArithmetic(goal, x_lt_y(), y_lt_z())
+	assert check(proof) is True
+	assert entails([x_lt_y], LessThan('l')(x=x, y=y + one))
+	assert not entails([x_lt_y], LessThan('l')(x=y, y=x))
+
+
+def test_conflict_leaves_out_unused_facts():
+	cycle = [LessThan('l')(x=x, y=y), LessThan('l')(x=y, y=z), LessThan('l')(x=z, y=x)]
+	solver = LinearSolver([Equal('e')(x=w, y=x)] + cycle + [LessThan('l')(x=w, y=y)])
+	assert not solver.satisfiable()
+	assert solver.conflict == cycle
+	assert _check_certificate(solver.certificate)
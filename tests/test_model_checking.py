@@ -0,0 +1,134 @@
+import random
+
+import pytest
+
+from propositional import Implies, And, Or, _connective, _is_compound
+from predicate import (Object, Term, Func, Set, createSet, ForAll, Exists, Membership,
+	LessThan, GreaterThan, LessOrEq, Equal)
+from sets import Q
+from model_checking import ModelChecker, _kind
+
+
+def _numbers(name, values):
+	S = createSet(name, Set)
+	for v in values:
+		S.add(Object(f"{v}/1", set_=Q))
+	return S
+
+
+A = _numbers('A', range(8))
+B = _numbers('B', range(-3, 3))
+Evens = _numbers('Evens', range(-10, 60, 2))
+_f = []
+f = createSet('f', Func, domain=Q, range_=Q, definition=lambda v: Term(_f[0], (v,), Q)
+	if v.value is None else Object.constant(v.value * v.value - 3, set_=Q))
+_f.append(f)
+x, z = Object('x', set_=A), Object('z', set_=A)
+y = Object('y', set_=B)
+
+
+def _object(t, env):
+	"""The constant t stands for, evaluated naively."""
+	if t in env:
+		return env[t]
+	if not isinstance(t, Term):
+		return t
+	args = [_object(a, env) for a in t.args]
+	if not isinstance(t.op, str):
+		return t.op(*args)
+	a, b = (u.value for u in args)
+	return Object.constant(a + b if t.op == '+' else a - b, set_=Q)
+
+
+def _truth(P, env):
+	"""P evaluated by enumerating the domains, element by element."""
+	if _is_compound(P):
+		base = _connective(P)
+		left, right = (_truth(getattr(P, attr), env) for attr in base._child_attrs)
+		return {Implies: not left or right, And: left and right, Or: left or right}[base]
+	kind = _kind(P)
+	if kind == 'quantified':
+		results = (_truth(P.inner_prop, {**env, P.x: e}) for e in P.x.set_)
+		return all(results) if P.quantifier == 'A' else any(results)
+	if kind == 'membership':
+		return _object(P.x, env) in P.set_
+	a, b = _object(P.x, env).value, _object(P.y, env).value
+	return {'lt': a < b, 'le': a <= b, 'gt': a > b, 'eq': a == b}[P.order_symbol]
+
+
+def _random_term(rng, variables):
+	t = rng.choice(variables)
+	if rng.random() < 0.3:
+		t = f(t)
+	if rng.random() < 0.5:
+		t = Term(rng.choice('+-'), (t, rng.choice(variables + [Object('1', set_=Q)])), Q)
+	if rng.random() < 0.5:
+		t = Term('+', (t, Object(str(rng.randrange(-4, 5)), set_=Q)), Q)
+	return t
+
+
+def _random_atom(rng, variables):
+	if rng.random() < 0.25:
+		return Membership('in')(x=_random_term(rng, variables), set_=rng.choice([A, Evens]))
+	ordering = rng.choice([LessThan, GreaterThan, LessOrEq, Equal])
+	return ordering('o')(x=_random_term(rng, variables), y=_random_term(rng, variables))
+
+
+def _random_formula(rng):
+	variables = rng.sample([x, y, z], rng.randrange(1, 4))
+	P = _random_atom(rng, variables)
+	for _ in range(rng.randrange(0, 3)):
+		P = rng.choice([Implies.of, And.of, Or.of])(P, _random_atom(rng, variables))
+	for var in reversed(variables):
+		P = rng.choice([ForAll, Exists])('q', predicate=P)(x=var)
+	return P
+
+
+def _follow(P, assignment):
+	"""The Prop the assignment is about, and the variables it binds."""
+	bound = {}
+	while _kind(P) == 'quantified' and P.x in assignment:
+		bound[P.x] = assignment[P.x]
+		P = P.inner_prop
+	return P, bound
+
+
+def test_against_enumeration():
+	rng = random.Random(0)
+	for _ in range(300):
+		P = _random_formula(rng)
+		for chunk in (3, 4096):
+			holds, assignment = ModelChecker(chunk=chunk).check(P)
+			assert holds == _truth(P, {}), P
+			if assignment is not None:
+				inner, env = _follow(P, assignment)
+				assert _truth(inner, env) == holds
+
+
+def test_nested_quantifiers_are_vectorized():
+	one = Object('1', set_=Q)
+	exists = Exists('e', predicate=LessThan('l')(x=f(x), y=Term('+', (f(z), one), Q)))(x=z)
+	checker = ModelChecker()
+	assert checker.vectorized(exists, x)
+	assert checker.check(ForAll('a', predicate=exists)(x=x)) == (True, None)
+
+
+def test_domains_override_set():
+	P = Exists('e', predicate=GreaterThan('g')(x=x, y=Object('9', set_=Q)))(x=x)
+	assert ModelChecker().check(P) == (False, None)
+	holds, assignment = ModelChecker({x: list(Evens)}).check(P)
+	assert holds and assignment[x].value > 9
+
+
+
+def test_ordering_over_objects_that_are_not_numbers():
+	Mixed = _numbers('Mixed', range(4))
+	for name in 'ab':
+		Mixed.add(Object(name))
+	w = Object('w', set_=Mixed)
+	small = LessThan('l')(x=Term('+', (w, f(w)), Q), y=Object('100', set_=Q))
+	P = ForAll('a', predicate=Implies.of(Membership('in')(x=w, set_=A), small))(x=w)
+	# chunks of one element: the ordering is only evaluated on numbers
+	assert ModelChecker(chunk=1).check(P) == (True, None)
+	with pytest.raises(ValueError):
+		ModelChecker().check(P)
@@ -0,0 +1,33 @@
+import gc
+import weakref
+
+import pytest
+
+from predicate import Object
+from sets import Q, R
+
+
+def test_numerals_are_interned_and_names_are_not():
+	for name in ['5', '-3/4', '1.5', '0.']:
+		assert Object(name, set_=Q) is Object(name, set_=Q)
+		assert Object(name, set_=Q) is not Object(name, set_=R)
+	assert Object('x') is not Object('x')
+	assert not hasattr(Object('x'), '__dict__')
+	with pytest.raises(AttributeError):
+		Object('x').anything = 1
+
+
+def test_interning_can_be_turned_off():
+	class Fresh(Object):
+		__slots__ = ()
+		intern_constants = False
+	assert Fresh('5', set_=Q) is not Fresh('5', set_=Q)
+	assert Fresh('5', set_=Q).value == 5
+
+
+def test_unused_constants_are_dropped():
+	ref = weakref.ref(Object('123456789/2', set_=Q))
+	gc.collect()
+	assert ref() is None
+	kept = Object('987654321/2', set_=Q)
+	assert Object('987654321/2', set_=Q) is kept
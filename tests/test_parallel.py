@@ -0,0 +1,43 @@
+import multiprocessing
+import random
+
+from predicate import Object, Set, createSet, ForAll, Exists, LessThan, GreaterThan
+from sets import N, Q
+from model_checking import ModelChecker
+import parallel
+
+from test_model_checking import _random_formula, _truth, _follow
+
+
+def test_against_enumeration():
+	rng = random.Random(1)
+	for _ in range(20):
+		P = _random_formula(rng)
+		# chunk=2 splits even the small domains into shards
+		holds, assignment = parallel.check(P, workers=2, chunk=2)
+		assert holds == _truth(P, {}), P
+		if assignment is not None:
+			inner, env = _follow(P, assignment)
+			assert _truth(inner, env) == holds
+
+
+def test_spawned_workers_find_the_witness():
+	S = createSet('S', Set)
+	for i in range(2000):
+		S.add(Object(f"{i}/1", set_=Q))
+	x = Object('x', set_=S)
+	context = multiprocessing.get_context('spawn')
+	P = Exists('e', predicate=GreaterThan('g')(x=x, y=Object('1500', set_=Q)))(x=x)
+	holds, assignment = parallel.check(P, workers=2, chunk=256, context=context)
+	assert holds and assignment[x].value > 1500 and assignment[x] in S
+	P = ForAll('a', predicate=LessThan('l')(x=x, y=Object('2000', set_=Q)))(x=x)
+	assert parallel.check(P, workers=2, chunk=256, context=context) == (True, None)
+	assert ModelChecker().check(P) == (True, None)
+
+
+def test_limit_cuts_an_infinite_domain():
+	n = Object('n', set_=N)
+	P = Exists('e', predicate=GreaterThan('g')(x=n, y=Object('700', set_=Q)))(x=n)
+	holds, assignment = parallel.check(P, workers=2, chunk=64, limit=1000)
+	assert holds and assignment[n].value > 700
+	assert parallel.check(P, workers=2, chunk=64, limit=500) == (False, None)
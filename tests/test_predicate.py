@@ -0,0 +1,32 @@
+import random
+
+from predicate import (Object, Set, createSet, LessThan, GreaterThan, LessOrEq, Equal,
+	Membership)
+from sets import Q
+
+
+def test_binding_at_once_or_one_by_one_gives_one_atom():
+	rng = random.Random(71)
+	objects = [Object(f"{i}/1", set_=Q) for i in range(5)] + [Object('v', set_=Q)]
+	for _ in range(200):
+		ordering = rng.choice([LessThan, GreaterThan, LessOrEq, Equal])
+		a, b, c = (rng.choice(objects) for _ in range(3))
+		P = ordering('o')(x=a, y=b)
+		assert ordering('o')(x=a)(y=b)._key is P._key
+		assert ordering('o')(y=b)(x=a)._key is P._key
+		# a partial predicate is not changed by completing it
+		partial = ordering('o')(x=a)
+		assert partial(y=c)._key is ordering('o')(x=a, y=c)._key
+		assert partial(y=b)._key is P._key
+		assert (ordering('o')(x=a, y=c)._key is P._key) == (c is b)
+		assert P.x is a and P.y is b
+
+
+def test_membership_binding():
+	S, T = createSet('S', Set), createSet('T', Set)
+	a, b = Object('a', set_=S), Object('b', set_=S)
+	P = Membership('in')(x=a, set_=S)
+	assert Membership('in')(x=a)(set_=S)._key is P._key
+	assert Membership('in')(set_=S)(x=a)._key is P._key
+	assert Membership('in')(x=b, set_=S)._key is not P._key
+	assert Membership('in')(x=a, set_=T)._key is not P._key
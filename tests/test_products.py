@@ -0,0 +1,42 @@
+import itertools
+import random
+
+from predicate import Object, Set, BitSet, Domain, Prod, createSet
+
+
+def _set(name, prefix, n):
+	S = createSet(name, Set)
+	for i in range(n):
+		S.add(Object(f"{prefix}{i}"))
+	return S
+
+
+def _check(P, expected):
+	"""P against the list of its elements made by itertools.product."""
+	assert len(P) == len(expected) and list(P) == expected
+	assert [P[i] for i in range(len(P))] == expected and P[-1] == expected[-1]
+	assert all(P.index(t) == i and t in P for i, t in enumerate(expected))
+	for start, stop in [(0, len(P)), (1, 5), (len(P) - 2, len(P) + 3), (3, 2)]:
+		assert list(P.iter_range(start, stop)) == expected[start:stop]
+
+
+def test_products_match_itertools():
+	A, B = _set('PA', 'a', 4), _set('PB', 'b', 3)
+	D = Domain()
+	C = createSet('PC', BitSet, domain=D)
+	C.add_many([Object(f"c{i}") for i in range(2)])
+	AB = createSet('AB', Prod, sets=[A, B])
+	_check(AB, list(itertools.product(A, B)))
+	nested = createSet('ABC', Prod, sets=[AB, C])
+	_check(nested, list(itertools.product(list(AB), C)))
+	assert (Object('a0'), next(iter(B))) not in AB
+	assert AB.contains_many([next(iter(AB)), (1, 2)]) == [True, False]
+
+
+def test_products_follow_their_sets():
+	rng = random.Random(37)
+	A, B = _set('QA', 'a', 2), _set('QB', 'b', 2)
+	P = createSet('QAB', Prod, sets=[A, B])
+	for i in range(5):
+		rng.choice([A, B]).add(Object(f"n{i}"))
+		_check(P, list(itertools.product(A, B)))
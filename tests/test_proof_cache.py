@@ -0,0 +1,87 @@
+import subprocess
+import sys
+import textwrap
+
+from propositional import Prop, Implies, HypSyll, _produce_a_proof
+from proof_cache import ProofCache
+from saturation import Saturation
+from checker import ProofChecker
+
+_script = textwrap.dedent('''
+	import sys
+	sys.path.insert(0, {root!r})
+	from propositional import Prop, Implies, _produce_a_proof
+	from predicate import Object, Membership, createSet
+	from proof_cache import ProofCache
+	from saturation import Saturation
+	from checker import ProofChecker
+
+	atoms = [type(f"B{{i}}", (Prop,), {{}}) for i in range(6)]
+	x = Object('x')
+	S = createSet('S')
+	member = Membership('in')(x=x, set_=S)
+	axioms = [_produce_a_proof(Implies.of(atoms[i], atoms[i + 1])) for i in range(5)]
+	axioms += [_produce_a_proof(member), _produce_a_proof(Implies.of(member, atoms[0]))]
+	prover = lambda axioms, goal: Saturation(axioms, goal).run()
+	with ProofCache({path!r}) as cache:
+		proof = cache.prove(atoms[-1], axioms, prover)
+		print(proof.__class__._key is atoms[-1]._key, ProofChecker(axioms).check(proof),
+			cache.stats()['hits'])
+''')
+
+
+def _chain(n):
+	atoms = [type(f"B{i}", (Prop,), {}) for i in range(n + 1)]
+	axioms = [_produce_a_proof(Implies.of(atoms[i], atoms[i + 1])) for i in range(n)]
+	axioms.append(_produce_a_proof(atoms[0]))
+	return atoms, axioms
+
+
+def test_hit_in_a_new_process_proves_the_goal(tmp_path):
+	script = _script.format(root=sys.path[0], path=str(tmp_path / 'proofs.db'))
+	runs = [subprocess.run([sys.executable, '-c', script], capture_output=True, text=True,
+		check=True).stdout.split() for _ in range(2)]
+	assert runs[0] == ['True', 'True', '0']
+	assert runs[1] == ['True', 'True', '1']
+
+
+def test_hit_in_the_same_process(tmp_path):
+	atoms, axioms = _chain(10)
+	prover = lambda axioms, goal: Saturation(axioms, goal).run()
+	with ProofCache(str(tmp_path / 'proofs.db')) as cache:
+		cache.prove(atoms[-1], axioms, prover)
+		proof = cache.get(atoms[-1], axioms)
+		assert proof.__class__._key is atoms[-1]._key
+		assert ProofChecker(axioms).check(proof) is True
+		assert cache.stats()['hits'] == 1
+
+
+def test_proof_of_another_goal_is_a_miss(tmp_path):
+	atoms, axioms = _chain(3)
+	proof = HypSyll(axioms[0], axioms[1])
+	with ProofCache(str(tmp_path / 'proofs.db')) as cache:
+		cache.put(atoms[3], proof)
+		assert cache.get(atoms[3], axioms) is None
+		assert cache.stats()['misses'] == 1
+
+
+def test_missing_axiom_is_a_miss(tmp_path):
+	atoms, axioms = _chain(3)
+	prover = lambda axioms, goal: Saturation(axioms, goal).run()
+	with ProofCache(str(tmp_path / 'proofs.db')) as cache:
+		cache.prove(atoms[-1], axioms, prover)
+		assert cache.get(atoms[-1], axioms[1:]) is None
+
+
+def test_file_stays_under_max_bytes(tmp_path):
+	atoms, axioms = _chain(40)
+	prover = lambda axioms, goal: Saturation(axioms, goal).run()
+	path = tmp_path / 'proofs.db'
+	with ProofCache(str(path), max_bytes=64 * 2 ** 10) as cache:
+		for _ in range(20):
+			for A in atoms[1:]:
+				cache.put(A, prover(axioms, A))
+		assert 0 < cache.stats()['proofs'] < 20 * 40
+		stats = cache.stats()
+		assert path.stat().st_size == stats['bytes'] <= 64 * 2 ** 10
+		assert 0 < stats['payload_bytes'] < stats['bytes']
@@ -0,0 +1,44 @@
+import gc
+import weakref
+
+from propositional import (Prop, Implies, And, ProofNode, HypSyll, Conjunction, CommuteAnd,
+	ModusPonens, _produce_a_proof)
+
+
+def _chain(n):
+	atoms = [type(f"N{i}", (Prop,), {}) for i in range(n + 1)]
+	return atoms, [_produce_a_proof(Implies.of(atoms[i], atoms[i + 1])) for i in range(n)]
+
+
+def test_nodes_stand_in_for_instances():
+	atoms, axioms = _chain(50)
+	proof = axioms[0]
+	for i, axiom in enumerate(axioms[1:], 1):
+		proof = HypSyll(proof, axiom)
+		assert type(proof) is ProofNode and isinstance(proof, Implies)
+		assert proof.__class__._key is Implies.of(atoms[0], atoms[i + 1])._key
+		assert proof.antecedent is atoms[0] and proof.consequent is atoms[i + 1]
+	assert ModusPonens(proof, _produce_a_proof(atoms[0])).__class__ is atoms[-1]
+
+
+def test_equal_steps_are_shared():
+	atoms, axioms = _chain(3)
+	first = HypSyll(axioms[0], axioms[1])
+	assert HypSyll(axioms[0], axioms[1]) is first
+	assert HypSyll(first, axioms[2]).premises == (first, axioms[2])
+	kept = [HypSyll(first, axioms[2]) for _ in range(100)]
+	assert all(k is kept[0] for k in kept)
+	node = weakref.ref(kept[0])
+	del kept
+	gc.collect()
+	assert node() is None
+
+
+def test_rule_fields():
+	A, B = type('NA', (Prop,), {}), type('NB', (Prop,), {})
+	a, b = _produce_a_proof(A), _produce_a_proof(B)
+	both = Conjunction(a, b)
+	assert isinstance(both, And) and both.proof_left is a and both.proof_right is b
+	swapped = CommuteAnd(both)
+	assert swapped.__class__._key is And.of(B, A)._key
+	assert swapped.proof_left is b and swapped.proof_right is a
@@ -0,0 +1,122 @@
+import gc
+import io
+import random
+
+import pytest
+
+from propositional import (Prop, Implies, And, Or, Equiv, Not, ModusPonens, HypSyll, same_prop,
+	_False, _produce_a_proof, intern_stats, render, render_to)
+
+
+def test_not_axiom_leaves_the_shared_negation_contingent():
+	A = type('A', (Prop,), {})
+	contingent = Not(A)
+	axiom = Not(A, is_true=True)
+	assert same_prop(axiom, contingent)
+	assert isinstance(axiom(), Implies)
+	with pytest.raises(Exception):
+		contingent()
+
+
+def test_not_axiom_does_not_outlive_its_class():
+	A = type('A', (Prop,), {})
+	Not(A, is_true=True)()
+	gc.collect()
+	with pytest.raises(Exception):
+		Not(A)()
+
+
+def test_not_axiom_is_interned():
+	A = type('A', (Prop,), {})
+	axiom = Not(A, is_true=True)
+	size = intern_stats()['size']
+	assert all(Not(A, is_true=True) is axiom for _ in range(100))
+	assert intern_stats()['size'] == size
+
+
+def test_not_axiom_in_rules():
+	A = type('A', (Prop,), {})
+	pp_not_a = Not(A, is_true=True)()
+	assert ModusPonens(pp_not_a, _produce_a_proof(A)).__class__ is _False
+
+
+_atoms = [type(f"P{i}", (Prop,), {}) for i in range(3)]
+_connectives = [Implies, And, Or, Equiv]
+
+
+def _random_structure(rng, depth):
+	"""A formula as nested tuples (connective, left, right), or an atom."""
+	if depth == 0 or rng.random() < 0.3:
+		return rng.choice(_atoms)
+	return (rng.choice(_connectives), _random_structure(rng, depth - 1),
+		_random_structure(rng, depth - 1))
+
+
+def _build(s, through_class=False):
+	if not isinstance(s, tuple):
+		return s
+	base, left, right = s
+	left, right = _build(left, through_class), _build(right, through_class)
+	if not through_class:
+		return base.of(left, right)
+	# a subclass written out by hand, as the examples do
+	left_attr, right_attr = base._child_attrs
+	return type('Written', (base,), {left_attr: left, right_attr: right})
+
+
+def test_equal_formulas_share_one_class():
+	rng = random.Random(43)
+	for _ in range(300):
+		s = _random_structure(rng, 4)
+		P = _build(s)
+		assert _build(s) is P
+		assert _build(s, through_class=True)._key is P._key
+	stats = intern_stats()
+	assert stats['hits'] > 0 and stats['size'] > 0
+
+
+def test_keys_compare_structure():
+	rng = random.Random(47)
+	structures = [_random_structure(rng, 3) for _ in range(200)]
+	for s, t in zip(structures, structures[1:] + structures[:1]):
+		assert (_build(s)._key is _build(t)._key) == (s == t)
+		assert (_build(s)._hash == _build(t)._hash) or s != t
+
+
+def test_rules_tell_atoms_with_the_same_name_apart():
+	A, A_again, B = type('A', (Prop,), {}), type('A', (Prop,), {}), type('B', (Prop,), {})
+	assert repr(A) == repr(A_again) and not same_prop(A, A_again)
+	a_to_b = _produce_a_proof(Implies.of(A, B))
+	assert ModusPonens(a_to_b, _produce_a_proof(A)).__class__ is B
+	with pytest.raises(Exception):
+		ModusPonens(a_to_b, _produce_a_proof(A_again))
+	b_to_a = _produce_a_proof(Implies.of(B, A_again))
+	with pytest.raises(Exception):
+		HypSyll(b_to_a, a_to_b)
+	assert HypSyll(a_to_b, _produce_a_proof(Implies.of(B, A))).__class__._key \
+		is Implies.of(A, A)._key
+
+
+def _naive_render(s):
+	if not isinstance(s, tuple):
+		return s.__name__
+	base, left, right = s
+	return f"{base.__name__}({_naive_render(left)}, {_naive_render(right)})"
+
+
+def test_render_matches_recursive_rendering():
+	rng = random.Random(53)
+	for _ in range(200):
+		s = _random_structure(rng, 5)
+		assert render(_build(s)) == repr(_build(s)) == _naive_render(s)
+
+
+def test_render_deep_formulas():
+	P = _atoms[0]
+	for i in range(20000):
+		P = Implies.of(_atoms[i % 3], P) if i % 2 else And.of(P, _atoms[i % 3])
+	text = render(P)
+	assert text.startswith('Implies(P1, And(') and text.count('(') == 20000
+	out = io.StringIO()
+	render_to(P, out, chunk_size=100)
+	assert out.getvalue() == text
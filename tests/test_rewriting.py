@@ -0,0 +1,64 @@
+import fractions
+import random
+
+import pytest
+
+from predicate import Object, Term, Func, createSet, LessThan, GreaterThan, Equal
+from sets import Q
+from rewriting import Rewriter, NormalizationProof, holds_by_normalization
+
+F = fractions.Fraction
+f = createSet('f', Func, domain=Q, range_=Q)
+x, y, z = (Object(name, set_=Q) for name in 'xyz')
+
+
+def _random_term(rng, depth):
+	if depth == 0 or rng.random() < 0.25:
+		if rng.random() < 0.3:
+			return Object(str(rng.randrange(-3, 4)), set_=Q)
+		return rng.choice([x, y, z])
+	if rng.random() < 0.15:
+		return f(_random_term(rng, depth - 1))
+	return Term(rng.choice('+-'), (_random_term(rng, depth - 1), _random_term(rng, depth - 1)), Q)
+
+
+def _evaluate(t, env):
+	"""t with the variables given values in env, and f a random function,
+	depending on env['seed']."""
+	if not isinstance(t, Term):
+		return t.value if t.value is not None else env[t]
+	args = [_evaluate(a, env) for a in t.args]
+	if t.op == '+':
+		return args[0] + args[1]
+	if t.op == '-':
+		return args[0] - args[1]
+	return F(random.Random(hash((args[0], env['seed']))).randrange(10 ** 9))
+
+
+def test_normal_forms_keep_the_value():
+	rng = random.Random(41)
+	rewriter = Rewriter()
+	envs = [{x: F(rng.randrange(-10 ** 6, 10 ** 6), rng.randrange(1, 100)), y: F(rng.random()),
+		z: F(rng.randrange(10 ** 9)), 'seed': i} for i in range(3)]
+	terms = [_random_term(rng, 4) for _ in range(400)]
+	for t in terms:
+		normal = rewriter.normalize(t)
+		assert all(_evaluate(normal, env) == _evaluate(t, env) for env in envs), t
+		assert rewriter.normalize(normal) is normal
+		assert rewriter.equal(t, Term('-', (Term('+', (f(t), t), Q), f(normal)), Q))
+		assert not rewriter.equal(t, Term('-', (t, z), Q))
+	for a, b in zip(terms, terms[1:] + [Term('+', (terms[0], Object('0', set_=Q)), Q)]):
+		# at random points, sums that differ as polynomials differ in value
+		same = all(_evaluate(a, env) == _evaluate(b, env) for env in envs)
+		assert rewriter.equal(a, b) == same
+
+
+def test_normalization_proofs():
+	one = Object('1', set_=Q)
+	t = Term('-', (Term('+', (y, one), Q), x), Q)
+	assert NormalizationProof(GreaterThan('g')(x=Term('+', (t, x), Q), y=y)) is not None
+	assert NormalizationProof(Equal('e')(x=Term('-', (f(x), f(Term('+', (x, Object('0', set_=Q)),
+		Q))), Q), y=Object('0', set_=Q))) is not None
+	assert not holds_by_normalization(LessThan('l')(x=x, y=y))
+	with pytest.raises(Exception):
+		NormalizationProof(LessThan('l')(x=Term('+', (x, one), Q), y=x))
@@ -0,0 +1,76 @@
+import itertools
+import random
+
+from propositional import Prop, Implies, And, Or, Equiv, _False, _connective
+from sat import Solver, PropSolver, entails
+
+_atoms = [type(f"S{i}", (Prop,), {}) for i in range(6)]
+_connectives = [Implies, And, Or, Equiv]
+
+
+def _random_prop(rng, depth):
+	if depth == 0 or rng.random() < 0.3:
+		return _False if rng.random() < 0.05 else rng.choice(_atoms)
+	return rng.choice(_connectives).of(_random_prop(rng, depth - 1), _random_prop(rng, depth - 1))
+
+
+def _value(P, assignment):
+	if P._key is _False:
+		return False
+	if P in _atoms:
+		return assignment[P._key]
+	base = _connective(P)
+	a, b = (_value(getattr(P, attr), assignment) for attr in base._child_attrs)
+	return {Implies: not a or b, And: a and b, Or: a or b, Equiv: a == b}[base]
+
+
+def _assignments():
+	for values in itertools.product([False, True], repeat=len(_atoms)):
+		yield dict(zip([A._key for A in _atoms], values))
+
+
+def test_clauses_match_enumeration():
+	rng = random.Random(11)
+	for _ in range(200):
+		n = rng.randrange(1, 9)
+		clauses = [[rng.choice([1, -1]) * rng.randrange(1, n + 1) for _ in range(3)]
+			for _ in range(rng.randrange(1, 5 * n))]
+		solver = Solver()
+		for _ in range(n):
+			solver.new_var()
+		for clause in clauses:
+			solver.add_clause(clause)
+		expected = any(all(any(values[abs(l) - 1] == (l > 0) for l in c) for c in clauses)
+			for values in itertools.product([False, True], repeat=n))
+		assert solver.solve() == expected
+		if expected:
+			assert all(any(solver.model[abs(l)] == (1 if l > 0 else -1) for l in c)
+				for c in clauses)
+
+
+def test_entailment_matches_enumeration():
+	rng = random.Random(13)
+	for _ in range(150):
+		axioms = [_random_prop(rng, 3) for _ in range(rng.randrange(0, 4))]
+		solver = PropSolver(axioms)
+		# several goals on one solver, so learnt clauses carry over
+		for _ in range(3):
+			goal = _random_prop(rng, 3)
+			expected = all(_value(goal, a) for a in _assignments()
+				if all(_value(A, a) for A in axioms))
+			assert solver.entails(goal) == expected
+			assert entails(axioms, goal) == expected
+			if not expected:
+				model = solver.model()
+				assignment = {A._key: model.get(A, False) for A in _atoms}
+				assert all(_value(A, assignment) for A in axioms)
+				assert not _value(goal, assignment)
+
+
+def test_satisfiable_matches_enumeration():
+	rng = random.Random(17)
+	for _ in range(150):
+		props = [_random_prop(rng, 3) for _ in range(rng.randrange(1, 5))]
+		expected = any(all(_value(P, a) for P in props) for a in _assignments())
+		assert PropSolver().satisfiable(*props) == expected
+		assert PropSolver(props).satisfiable() == expected
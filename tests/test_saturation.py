@@ -0,0 +1,75 @@
+import random
+
+from propositional import Prop, Implies, Or, _produce_a_proof
+from saturation import Saturation
+from checker import ProofChecker
+
+
+def _horn(rng, n_atoms, n_rules, n_facts):
+	atoms = [type(f"H{i}", (Prop,), {}) for i in range(n_atoms)]
+	rules = {(rng.randrange(n_atoms), rng.randrange(n_atoms)) for _ in range(n_rules)}
+	facts = set(rng.sample(range(n_atoms), n_facts))
+	axioms = [_produce_a_proof(Implies.of(atoms[a], atoms[b])) for a, b in sorted(rules)]
+	axioms += [_produce_a_proof(atoms[i]) for i in sorted(facts)]
+	return atoms, rules, facts, axioms
+
+
+def _closure(rules, facts):
+	"""The atoms derivable by ModusPonens, by iterating to a fixpoint."""
+	derived = set(facts)
+	while True:
+		new = {b for a, b in rules if a in derived} - derived
+		if not new:
+			return derived
+		derived |= new
+
+
+def test_proves_exactly_the_consequences():
+	rng = random.Random(7)
+	for _ in range(20):
+		atoms, rules, facts, axioms = _horn(rng, 15, 20, 3)
+		derivable = _closure(rules, facts)
+		for i, A in enumerate(atoms):
+			proof = Saturation(axioms, A).run()
+			assert (proof is not None) == (i in derivable)
+			if proof is not None:
+				assert proof.__class__._key is A._key
+				assert ProofChecker(axioms).check(proof) is True
+
+
+class _Watched(Saturation):
+	"""Records the most facts kept at once, active or queued."""
+	most = 0
+
+	def _push(self, pp):
+		super()._push(pp)
+		self.most = max(self.most, len(self.known) + len(self.queue))
+
+
+def test_max_facts_bounds_the_queue_too():
+	rng = random.Random(3)
+	atoms, rules, facts, axioms = _horn(rng, 300, 3000, 30)
+	free = _Watched(axioms)
+	free.run()
+	assert free.most > 100
+	bounded = _Watched(axioms, max_facts=100)
+	bounded.run()
+	assert bounded.most <= 100
+	assert bounded.stats()['dropped'] > 0
+
+
+def test_goal_is_kept_past_max_facts():
+	atoms = [type(f"G{i}", (Prop,), {}) for i in range(4)]
+	axioms = [_produce_a_proof(atoms[0])]
+	axioms += [_produce_a_proof(Implies.of(atoms[0], A)) for A in atoms[1:]]
+	proof = Saturation(axioms, atoms[-1], max_facts=len(axioms)).run()
+	assert proof is not None and proof.__class__._key is atoms[-1]._key
+
+
+def test_goal_proven_from_its_right_disjunct():
+	A, B, C = (type(f"D{i}", (Prop,), {}) for i in range(3))
+	axioms = [_produce_a_proof(C), _produce_a_proof(Implies.of(C, B))]
+	goal = Or.of(A, B)
+	proof = Saturation(axioms, goal).run()
+	assert proof is not None and proof.__class__._key is goal._key
+	assert ProofChecker(axioms).check(proof) is True
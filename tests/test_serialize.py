@@ -0,0 +1,133 @@
+import pickle
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from propositional import Prop, Implies, Not, HypSyll, ProofNode, _produce_a_proof
+from predicate import Object, Term, Func, Set, createSet
+from sets import Q
+from checker import ProofChecker
+import serialize
+
+_script = textwrap.dedent('''
+	import sys
+	sys.path.insert(0, {root!r})
+	from propositional import Prop, Implies, HypSyll, _produce_a_proof
+	from predicate import Object, Set, createSet
+	import serialize
+
+	atoms = [type(f"C{{i}}", (Prop,), {{}}) for i in range(5)]
+	axioms = [_produce_a_proof(Implies.of(atoms[i], atoms[i + 1])) for i in range(4)]
+	proof = axioms[0]
+	for axiom in axioms[1:]:
+		proof = HypSyll(proof, axiom)
+	S = createSet('S', Set)
+	a, b = Object('a', set_=S), Object('b', set_=S)
+	S.add(a)
+	S.add(b)
+	with open({path!r}, 'wb') as f:
+		f.write(serialize.dumps((proof, S, [a, b])))
+''')
+
+
+def _chain(n, name='A'):
+	atoms = [type(f"{name}{i}", (Prop,), {}) for i in range(n + 1)]
+	axioms = [_produce_a_proof(Implies.of(atoms[i], atoms[i + 1])) for i in range(n)]
+	proof = axioms[0]
+	for axiom in axioms[1:]:
+		proof = HypSyll(proof, axiom)
+	return atoms, axioms, proof
+
+
+def _nodes(proof):
+	"""The distinct nodes of proof, by id."""
+	seen, stack = {}, [proof]
+	while stack:
+		node = stack.pop()
+		if id(node) not in seen:
+			seen[id(node)] = node
+			stack += node.premises if type(node) is ProofNode else ()
+	return seen
+
+
+def test_same_process_round_trip_gives_the_same_proof():
+	atoms, axioms, proof = _chain(20)
+	copy = serialize.loads(serialize.dumps(proof))
+	assert copy.__class__._key is proof.__class__._key
+	assert ProofChecker(axioms).check(copy) is True
+
+
+def test_deep_proof_keeps_its_sharing():
+	atoms, axioms, proof = _chain(3)
+	for i in range(5000):
+		proof = HypSyll(proof, _produce_a_proof(Implies.of(atoms[-1], atoms[-1])))
+	copy = serialize.loads(serialize.dumps(proof))
+	assert len(_nodes(copy)) == len(_nodes(proof))
+	assert ProofChecker().check(copy) is True
+
+
+def test_round_trip_in_another_process(tmp_path):
+	path = str(tmp_path / 'proof.bin')
+	subprocess.run([sys.executable, '-c', _script.format(root=sys.path[0], path=path)],
+		check=True)
+	with open(path, 'rb') as f:
+		proof, S, (a, b) = serialize.loads(f.read())
+	C = proof.__class__
+	assert C.antecedent.__name__ == 'C0' and C.consequent.__name__ == 'C4'
+	assert ProofChecker().check(proof) is True
+	# a checker given this process's axioms must not accept the foreign atoms
+	atoms, axioms, _ = _chain(4, 'C')
+	assert ProofChecker(axioms).check(proof) is not True
+	assert a.set_ is S and b.set_ is S
+	assert {o.name for o in S} == {'a', 'b'}
+	assert a in S and b in S
+
+
+def test_substitute_matches_atoms_of_the_caller(tmp_path):
+	path = str(tmp_path / 'proof.bin')
+	subprocess.run([sys.executable, '-c', _script.format(root=sys.path[0], path=path)],
+		check=True)
+	atoms, axioms, _ = _chain(4, 'C')
+	by_name = {P.__name__: P for P in atoms}
+	with open(path, 'rb') as f:
+		proof, S, objects = serialize.loads(f.read(), lambda P: by_name.get(P.__name__, P))
+	assert proof.__class__._key is Implies.of(atoms[0], atoms[-1])._key
+	assert ProofChecker(axioms).check(proof) is True
+
+
+def test_objects_sets_and_terms():
+	T = createSet('T', Set)
+	items = [Object(f"{v}/1", set_=Q) for v in range(4)]
+	for o in items:
+		T.add(o)
+	g = createSet('g', Func, domain=Q, range_=Q,
+		definition=lambda v: Object.constant(v.value + 1, set_=Q))
+	t = Term('+', (items[1], items[2]), Q)
+	value = {'set': T, 'term': t, 'image': g(items[0]), 'q': Object.constant(3, set_=Q)}
+	copy = pickle.loads(pickle.dumps(value))
+	assert copy['set'] is T and copy['term'] is t
+	assert copy['image'].value == 1 and copy['q'].value == 3
+
+
+def test_cycle_is_an_error():
+	cycle = []
+	cycle.append((cycle,))
+	with pytest.raises(ValueError):
+		serialize.dumps(cycle)
+
+
+def test_not_a_serialization():
+	with pytest.raises(ValueError):
+		serialize.loads(b'not pyprover')
+
+
+def test_pickle_keeps_named_props_and_axioms():
+	import python_proofs
+	A = type('A', (Prop,), {})
+	for P in (python_proofs.A_implies_B, Not(A, is_true=True)):
+		copy = pickle.loads(pickle.dumps(P))
+		assert copy is P
+		assert isinstance(copy(), Implies)
+		assert serialize.loads(serialize.dumps(P)) is P
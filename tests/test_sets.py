@@ -0,0 +1,83 @@
+import fractions
+import random
+
+from predicate import Object, Term
+from sets import N, Q, R, _check_valid, _forget_level
+
+
+def _random_constants(rng, n):
+	return [Object(f"{rng.randrange(-50, 50)}/{rng.randrange(1, 30)}", set_=Q) for _ in range(n)]
+
+
+def test_arithmetic_matches_fractions():
+	rng = random.Random(1)
+	left, right = _random_constants(rng, 300), _random_constants(rng, 300)
+	for a, b in zip(left, right):
+		x, y = fractions.Fraction(a.name), fractions.Fraction(b.name)
+		total, difference = a + b, a - b
+		assert total.value == x + y and difference.value == x - y
+		assert fractions.Fraction(total.name) == x + y
+		assert total is Object(f"{(x + y).numerator}/{(x + y).denominator}", set_=Q)
+	assert [c.value for c in Q.add_many(left, right)] == [a.value + b.value
+		for a, b in zip(left, right)]
+	assert Q.compare_many(left, right) == [(a.value > b.value) - (a.value < b.value)
+		for a, b in zip(left, right)]
+
+
+def test_constants_are_keyed_on_their_value():
+	half = Object.constant(fractions.Fraction(1, 2), set_=Q)
+	assert Object('1/2', set_=Q) is half
+	assert Object.constant(fractions.Fraction(2, 4), set_=Q) is half
+	# names not written as n/d keep their own Object
+	assert Object('2/4', set_=Q) is not half and Object('2/4', set_=Q).value == half.value
+	assert Object('0.5', set_=Q) is not half
+	assert Object.constant(3, set_=Q) is not Object('3', set_=Q)
+
+
+def test_names_are_built_when_asked_for():
+	total = Object('1/3', set_=Q) + Object('1/6', set_=Q)
+	assert not hasattr(total, '_name')
+	assert total.name == '1/2' and repr(total) == '1/2'
+	assert total in Q
+
+
+def test_terms_for_non_constants():
+	x = Object('x', set_=Q)
+	t = x + Object('1/1', set_=Q)
+	assert isinstance(t, Term) and t is x + Object('1/1', set_=Q)
+	assert t.name == 'x + 1/1' and t.value is None
+	assert N.add_many([x], [x])[0] is x + x
+
+
+def _naive_in(S, item):
+	"""Membership in N, Q or R as it was decided before it was cached."""
+	name = '' if isinstance(item, Term) else item.name
+	if S is N:
+		return name.isdigit() or item.set_ is N or item in N._items
+	symbol, smaller = ('/', N) if S is Q else ('.', Q)
+	return (_check_valid(name, symbol) or item.set_ is S or item in S._items
+		or _naive_in(smaller, item))
+
+
+def test_membership_matches_the_uncached_rules():
+	rng = random.Random(59)
+	names = ['7', '12/5', '-3/4', '2.5', '0.', 'x', 'y', '1/0x', '']
+	items = [Object(rng.choice(names), set_=rng.choice([None, N, Q, R])) for _ in range(200)]
+	items += [Term('+', (items[0], items[1]), Q)]
+	added = []
+	try:
+		for step in range(4):
+			for S in (N, Q, R):
+				expected = [_naive_in(S, item) for item in items]
+				assert [item in S for item in items] == expected
+				assert S.contains_many(items) == expected
+			# adding to a set must not leave stale cached answers
+			for item in rng.sample(items, 10):
+				S = rng.choice([N, Q, R])
+				if item not in S._items:
+					S.add(item)
+					added.append((S, item))
+	finally:
+		for S, item in added:
+			S._items.discard(item)
+			_forget_level(item)
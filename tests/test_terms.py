@@ -0,0 +1,69 @@
+import gc
+import random
+
+from predicate import Object, Term, Func, createSet, _terms
+from sets import Q, R
+from rewriting import Rewriter
+
+x, y = Object('x', set_=Q), Object('y', set_=Q)
+f = createSet('f', Func, domain=Q, range_=Q)
+
+
+def _random_structure(rng, depth):
+	"""A term as nested tuples (op, args...), or a leaf."""
+	if depth == 0 or rng.random() < 0.3:
+		return rng.choice([x, y, 'c'])
+	if rng.random() < 0.2:
+		return (f, _random_structure(rng, depth - 1))
+	return (rng.choice('+-'), _random_structure(rng, depth - 1), _random_structure(rng, depth - 1))
+
+
+def _build(s):
+	if s == 'c':
+		return Object('-1/2', set_=Q)
+	if not isinstance(s, tuple):
+		return s
+	args = tuple(_build(a) for a in s[1:])
+	return f(args[0]) if s[0] is f else Term(s[0], args, Q)
+
+
+def test_equal_terms_are_one_object():
+	rng = random.Random(67)
+	structures = [_random_structure(rng, 4) for _ in range(300)]
+	for s, t in zip(structures, structures[1:] + structures[:1]):
+		a = _build(s)
+		assert _build(s) is a
+		assert (_build(t) is a) == (s == t)
+
+
+def test_set_is_part_of_the_key():
+	assert Term('+', (x, y), Q) is not Term('+', (x, y), R)
+	assert Term('+', (x, y), Q) is not Term('+', (y, x), Q)
+
+
+def test_terms_are_dropped_when_unused():
+	before = len(_terms)
+	kept = [Term('+', (x, Object(f"{i}/1", set_=Q)), Q) for i in range(1000)]
+	assert len(_terms) >= before + 1000
+	del kept
+	gc.collect()
+	assert len(_terms) < before + 1000
+
+
+def test_deep_terms_render():
+	t = x
+	for i in range(20000):
+		t = Term('+' if i % 2 else '-', (t, y), Q)
+	assert t.name.startswith('x - y + y - y') and t.name.count('y') == 20000
+
+
+def test_deep_applications_normalize():
+	t = x
+	for _ in range(20000):
+		t = f(Term('+', (t, Object('0', set_=Q)), Q))
+	normal = Rewriter().normalize(Term('-', (Term('+', (t, x), Q), x), Q))
+	# the sums inside are folded level by level: f(f(...f(x)))
+	u = x
+	for _ in range(20000):
+		u = f(u)
+	assert normal is u
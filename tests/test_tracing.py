@@ -0,0 +1,44 @@
+import json
+
+import tracing
+from propositional import Prop, Implies, _produce_a_proof
+from predicate import Object, Set, createSet, LessThan, Membership, MembershipProof
+from sets import Q
+from saturation import Saturation
+
+
+def _chain(n):
+	atoms = [type(f"R{i}", (Prop,), {}) for i in range(n + 1)]
+	axioms = [_produce_a_proof(Implies.of(atoms[i], atoms[i + 1])) for i in range(n)]
+	return atoms, axioms + [_produce_a_proof(atoms[0])]
+
+
+def test_stats_count_every_rule_call():
+	atoms, axioms = _chain(200)
+	engine = Saturation(axioms, atoms[-1])
+	with tracing.trace(tracing.Stats()) as stats:
+		assert engine.run() is not None
+	assert stats.calls('rule') == {'ModusPonens': engine.derivations}
+	assert tracing._tracer is None
+	# nothing is recorded once the with statement is over
+	Saturation(axioms, atoms[-1]).run()
+	assert stats.calls('rule') == {'ModusPonens': engine.derivations}
+
+
+def test_predicates_and_counters():
+	S = createSet('S', Set)
+	a = Object('a', set_=S)
+	S.add(a)
+	with tracing.trace(tracing.Stats(), tracing.ChromeTrace()) as stats:
+		for i in range(10):
+			LessThan('l')(x=Object(f"{i}/1", set_=Q), y=Object('10/1', set_=Q))
+		MembershipProof(Membership('in')(x=a, set_=S))
+		tracing.count('custom', 3)
+		chrome = tracing._tracer.sinks[1]
+	assert stats.calls('predicate').get('LessThan', 0) >= 10
+	assert stats.calls('rule') == {'MembershipProof': 1}
+	assert stats.counters['custom'] == 3
+	events = json.loads(chrome.to_json())['traceEvents']
+	assert sum(e['ph'] == 'X' and e['name'] == 'MembershipProof' for e in events) == 1
+	assert any(e['ph'] == 'C' and e['args'] == {'custom': 3} for e in events)
+	assert 'MembershipProof' in stats.report()
@@ -0,0 +1,51 @@
+import itertools
+import random
+
+from propositional import Prop, Implies, And, Or, Equiv, _False, _connective
+from truth_tables import compile_prop, find_counterexample, is_tautology
+
+_atoms = [type(f"T{i}", (Prop,), {}) for i in range(5)]
+_connectives = [Implies, And, Or, Equiv]
+
+
+def _random_prop(rng, depth):
+	if depth == 0 or rng.random() < 0.25:
+		return _False if rng.random() < 0.05 else rng.choice(_atoms)
+	return rng.choice(_connectives).of(_random_prop(rng, depth - 1), _random_prop(rng, depth - 1))
+
+
+def _value(P, assignment):
+	"""P under assignment ({_key of an atom: bool}), evaluated recursively."""
+	if P._key is _False:
+		return False
+	if P in _atoms:
+		return assignment[P._key]
+	base = _connective(P)
+	a, b = (_value(getattr(P, attr), assignment) for attr in base._child_attrs)
+	return {Implies: not a or b, And: a and b, Or: a or b, Equiv: a == b}[base]
+
+
+def _tautology(P, atoms):
+	return all(_value(P, dict(zip([A._key for A in atoms], values)))
+		for values in itertools.product([False, True], repeat=len(atoms)))
+
+
+def test_matches_enumeration():
+	rng = random.Random(5)
+	for _ in range(500):
+		P = rng.choice([_random_prop(rng, 4), Or.of(_random_prop(rng, 3),
+			Implies.of(_random_prop(rng, 3), _False))])
+		atoms, _ = compile_prop(P)
+		expected = _tautology(P, atoms)
+		for batch_bits in (1, 2, 16):
+			assert is_tautology(P, batch_bits) == expected
+			counterexample = find_counterexample(P, batch_bits)
+			if counterexample is not None:
+				assert not _value(P, {A._key: v for A, v in counterexample.items()})
+
+
+def test_known_tautologies():
+	A, B = _atoms[:2]
+	assert is_tautology(Or.of(A, Implies.of(A, _False)))
+	assert is_tautology(Implies.of(And.of(A, B), Equiv.of(A, B)))
+	assert not is_tautology(Implies.of(Or.of(A, B), A))
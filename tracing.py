@@ -0,0 +1,180 @@
+"""Tracing and profiling hooks.
+
+Inference rules are wrapped with @rule and predicates with @traced. While
+no tracer is enabled, the wrapper checks one global and calls straight
+through. Counters such as
+Prop classes created and cache hits are likewise only reported when
+_tracer is set.
+
+A Tracer sends what it sees to its sinks:
+- Stats keeps counters, and the calls and time spent per rule and per
+  predicate kind, in memory;
+- ChromeTrace records every call as an event of the Chrome trace format,
+  which chrome://tracing, Perfetto and speedscope show as a flame graph.
+
+	with tracing.trace(Stats()) as stats:
+		prove(axioms, goal)
+	print(stats.report())
+"""
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+
+_tracer = None # the enabled Tracer, or None
+
+
+class Tracer:
+	"""Times the calls made through @traced functions and passes them, and
+	the counters, on to sinks."""
+	def __init__(self, sinks):
+		self.sinks = list(sinks)
+		self._open = threading.local()
+
+	def count(self, name, n=1):
+		for sink in self.sinks:
+			sink.count(name, n)
+
+	def call(self, kind, name, fn, args, kwargs):
+		open_ = getattr(self._open, 'labels', None)
+		if open_ is None:
+			open_ = self._open.labels = set()
+		label = (kind, name)
+		if label in open_:
+			# recursive call, already timed by the outer one
+			return fn(*args, **kwargs)
+		open_.add(label)
+		start = time.perf_counter()
+		try:
+			return fn(*args, **kwargs)
+		finally:
+			duration = time.perf_counter() - start
+			open_.discard(label)
+			for sink in self.sinks:
+				sink.span(kind, name, start, duration)
+
+
+def traced(kind, name=None):
+	"""Decorator timing calls of the function as kind ('rule', 'predicate'...).
+	name is the label for the calls, by default the function's name, or a
+	function of the call's arguments giving it."""
+	def decorate(fn):
+		label = fn.__name__ if name is None else name
+
+		@functools.wraps(fn)
+		def wrapper(*args, **kwargs):
+			tracer = _tracer
+			if tracer is None:
+				return fn(*args, **kwargs)
+			call_name = label(*args, **kwargs) if callable(label) else label
+			return tracer.call(kind, call_name, fn, args, kwargs)
+		return wrapper
+	return decorate
+
+
+def rule(fn):
+	"""@traced('rule'), for the inference rules. These take positional
+	arguments only, so the wrapper is cheaper."""
+	name = fn.__name__
+
+	@functools.wraps(fn)
+	def wrapper(*args):
+		tracer = _tracer
+		if tracer is None:
+			return fn(*args)
+		return tracer.call('rule', name, fn, args, {})
+	return wrapper
+
+
+def count(name, n=1):
+	"""Add n to the counter name, if tracing is enabled."""
+	if _tracer is not None:
+		_tracer.count(name, n)
+
+
+def enable(*sinks):
+	"""Start tracing into sinks. Returns the Tracer."""
+	global _tracer
+	_tracer = Tracer(sinks)
+	return _tracer
+
+
+def disable():
+	global _tracer
+	_tracer = None
+
+
+@contextlib.contextmanager
+def trace(*sinks):
+	"""Trace the body of the with statement into sinks. Gives the first sink."""
+	global _tracer
+	previous = _tracer
+	_tracer = Tracer(sinks)
+	try:
+		yield sinks[0] if sinks else None
+	finally:
+		_tracer = previous
+
+
+class Stats:
+	"""In-memory sink: counters, and the number of calls and total and
+	longest time per (kind, name)."""
+	def __init__(self):
+		self.counters = {}
+		self.timings = {} # (kind, name) -> [calls, total seconds, max seconds]
+
+	def count(self, name, n):
+		self.counters[name] = self.counters.get(name, 0) + n
+
+	def span(self, kind, name, start, duration):
+		row = self.timings.get((kind, name))
+		if row is None:
+			self.timings[(kind, name)] = [1, duration, duration]
+		else:
+			row[0] += 1
+			row[1] += duration
+			if duration > row[2]:
+				row[2] = duration
+
+	def calls(self, kind=None):
+		"""Number of calls by name, for one kind or all of them."""
+		return {name: row[0] for (k, name), row in self.timings.items()
+			if kind is None or k == kind}
+
+	def report(self):
+		"""A table of the timings, most total time first, then the counters."""
+		lines = [f"{'kind':<10} {'name':<28} {'calls':>9} {'total ms':>10} {'mean us':>9} {'max us':>9}"]
+		for (kind, name), (calls, total, longest) in sorted(self.timings.items(),
+				key=lambda item: -item[1][1]):
+			lines.append(f"{kind:<10} {str(name):<28} {calls:>9} {total * 1e3:>10.2f}"
+				f" {total / calls * 1e6:>9.2f} {longest * 1e6:>9.2f}")
+		for name, value in sorted(self.counters.items()):
+			lines.append(f"{name:<39} {value:>9}")
+		return '\n'.join(lines)
+
+
+class ChromeTrace:
+	"""Sink recording events in the Chrome trace event format.
+	Counters are sampled whenever they change."""
+	def __init__(self):
+		self.events = []
+		self.counters = {}
+		self._pid = os.getpid()
+
+	def count(self, name, n):
+		value = self.counters[name] = self.counters.get(name, 0) + n
+		self.events.append({'name': name, 'ph': 'C', 'ts': time.perf_counter() * 1e6,
+			'pid': self._pid, 'args': {name: value}})
+
+	def span(self, kind, name, start, duration):
+		self.events.append({'name': str(name), 'cat': kind, 'ph': 'X', 'ts': start * 1e6,
+			'dur': duration * 1e6, 'pid': self._pid, 'tid': threading.get_ident()})
+
+	def to_json(self):
+		return json.dumps({'traceEvents': self.events, 'displayTimeUnit': 'ms'})
+
+	def dump(self, path):
+		with open(path, 'w') as f:
+			f.write(self.to_json())
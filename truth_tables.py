@@ -0,0 +1,106 @@
+"""Decide whether a propositional Prop (built from And, Or, Implies, Equiv,
+Not and _False) is a tautology by checking every assignment of its atoms.
+
+The formula is compiled once into a straight-line program. Each batch of
+2^batch_bits assignments is evaluated in a single pass, with one bit per
+assignment packed into a Python int, so And/Or/Implies over the whole
+batch are single bitwise operations.
+"""
+from propositional import Implies, And, Or, Equiv, _False, _connective, _children
+
+_ops = {Implies: 'implies', And: 'and', Or: 'or', Equiv: 'equiv'}
+
+
+def compile_prop(A):
+	"""Compile the Prop A into (atoms, program).
+	atoms is the list of atomic Props of A. program is a list of
+	instructions (op, a, b), where a and b index earlier instructions, or the
+	atom for op 'atom'. The last instruction computes A. Shared subformulas
+	are computed once.
+	"""
+	atoms = []
+	program = []
+	slot = {} # _key of a subformula -> index of its instruction
+	stack = [A]
+	while stack:
+		P = stack[-1]
+		key = P._key
+		if key in slot:
+			stack.pop()
+			continue
+		base = _connective(P)
+		children = _children(P)
+		if not children:
+			stack.pop()
+			if key is _False:
+				program.append(('false', None, None))
+			else:
+				program.append(('atom', len(atoms), None))
+				atoms.append(P)
+			slot[key] = len(program) - 1
+			continue
+		pending = [c for c in children if c._key not in slot]
+		if pending:
+			stack += reversed(pending)
+			continue
+		stack.pop()
+		left, right = children
+		program.append((_ops[base], slot[left._key], slot[right._key]))
+		slot[key] = len(program) - 1
+	return atoms, program
+
+
+def _atom_pattern(i, width):
+	"""Bits 0..width-1 where bit j is set iff bit i of j is set."""
+	step = 1 << i
+	pattern = ((1 << step) - 1) << step
+	size = step << 1
+	while size < width:
+		pattern |= pattern << size
+		size <<= 1
+	return pattern & ((1 << width) - 1)
+
+
+def _run(program, atom_values, full):
+	values = []
+	for op, a, b in program:
+		if op == 'atom':
+			values.append(atom_values[a])
+		elif op == 'false':
+			values.append(0)
+		elif op == 'and':
+			values.append(values[a] & values[b])
+		elif op == 'or':
+			values.append(values[a] | values[b])
+		elif op == 'implies':
+			values.append((full ^ values[a]) | values[b])
+		else: # equiv
+			values.append(full ^ values[a] ^ values[b])
+	return values[-1]
+
+
+def find_counterexample(A, batch_bits=16):
+	"""Return an assignment {atom: bool} under which the Prop A is false,
+	or None if A is a tautology.
+	Assignments are checked 2^batch_bits at a time, so memory stays bounded
+	however many atoms A has.
+	"""
+	atoms, program = compile_prop(A)
+	n = len(atoms)
+	b = min(n, batch_bits)
+	width = 1 << b
+	full = (1 << width) - 1
+	low = [_atom_pattern(i, width) for i in range(b)]
+	for batch in range(1 << (n - b)):
+		# atoms past the first b are constant within a batch
+		high = [full if (batch >> j) & 1 else 0 for j in range(n - b)]
+		falsified = full ^ _run(program, low + high, full)
+		if falsified:
+			index = (batch << b) | ((falsified & -falsified).bit_length() - 1)
+			return {atom: bool((index >> i) & 1) for i, atom in enumerate(atoms)}
+	return None
+
+
+def is_tautology(A, batch_bits=16):
+	"""Whether the Prop A is true under every assignment of its atoms."""
+	return find_counterexample(A, batch_bits) is None